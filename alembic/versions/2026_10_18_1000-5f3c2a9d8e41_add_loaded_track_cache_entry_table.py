@@ -0,0 +1,45 @@
+"""add `loaded_track_cache_entry` table
+
+Revision ID: 5f3c2a9d8e41
+Revises: a8dcd5cbb2b6
+Create Date: 2026-10-18 10:00:12.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f3c2a9d8e41"
+down_revision: Union[str, None] = "a8dcd5cbb2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "loaded_track_cache_entry",
+        sa.Column("track_id", sa.String(), nullable=False),
+        sa.Column(
+            "loaded_track", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("track_id", name=op.f("pk_loaded_track_cache_entry")),
+    )
+    with op.batch_alter_table("loaded_track_cache_entry", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_loaded_track_cache_entry_expires_at"),
+            ["expires_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("loaded_track_cache_entry", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_loaded_track_cache_entry_expires_at"))
+
+    op.drop_table("loaded_track_cache_entry")
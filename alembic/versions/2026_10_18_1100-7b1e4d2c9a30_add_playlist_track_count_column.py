@@ -0,0 +1,42 @@
+"""add `track_count` column to `playlist`
+
+Revision ID: 7b1e4d2c9a30
+Revises: 5f3c2a9d8e41
+Create Date: 2026-10-18 11:00:41.207315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b1e4d2c9a30"
+down_revision: Union[str, None] = "5f3c2a9d8e41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("track_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+    op.execute(
+        """
+        UPDATE playlist
+        SET track_count = (
+            SELECT count(*)
+            FROM playlist_track
+            WHERE playlist_track.playlist_id = playlist.id
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.drop_column("track_count")
@@ -0,0 +1,30 @@
+"""add `(created_at, id)` index to `playlist`
+
+Revision ID: c4d8f1a67e25
+Revises: 7b1e4d2c9a30
+Create Date: 2026-10-18 12:00:08.613470
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4d8f1a67e25"
+down_revision: Union[str, None] = "7b1e4d2c9a30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_playlist_created_at_id", ["created_at", "id"], unique=False
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.drop_index("ix_playlist_created_at_id")
@@ -0,0 +1,59 @@
+"""add `position` column to `playlist_track`
+
+Revision ID: 9e2a6b5d1f07
+Revises: c4d8f1a67e25
+Create Date: 2026-10-18 13:00:41.207318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2a6b5d1f07"
+down_revision: Union[str, None] = "c4d8f1a67e25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("playlist_track", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("position", sa.BigInteger(), nullable=False, server_default="0")
+        )
+
+    # keeps the order tracks were read in before (by track id), leaving gaps of
+    # `TRACK_POSITIONS_GAP` between them
+    op.execute(
+        """
+        UPDATE playlist_track
+        SET position = numbered.new_position
+        FROM (
+            SELECT
+                playlist_id,
+                track_id,
+                row_number() OVER (
+                    PARTITION BY playlist_id ORDER BY track_id
+                ) * 65536 AS new_position
+            FROM playlist_track
+        ) AS numbered
+        WHERE playlist_track.playlist_id = numbered.playlist_id
+            AND playlist_track.track_id = numbered.track_id
+        """
+    )
+
+    with op.batch_alter_table("playlist_track", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_playlist_track_playlist_id_position",
+            ["playlist_id", "position"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("playlist_track", schema=None) as batch_op:
+        batch_op.drop_index("ix_playlist_track_playlist_id_position")
+        batch_op.drop_column("position")
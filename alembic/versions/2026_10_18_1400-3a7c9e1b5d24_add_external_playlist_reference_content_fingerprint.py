@@ -0,0 +1,31 @@
+"""add `content_fingerprint` column to `external_playlist_reference`
+
+Revision ID: 3a7c9e1b5d24
+Revises: 9e2a6b5d1f07
+Create Date: 2026-10-18 14:00:17.552903
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3a7c9e1b5d24"
+down_revision: Union[str, None] = "9e2a6b5d1f07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("content_fingerprint", sa.String(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.drop_column("content_fingerprint")
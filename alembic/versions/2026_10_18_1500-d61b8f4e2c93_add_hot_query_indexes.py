@@ -0,0 +1,60 @@
+"""add indexes for playlists feed filters and external playlists sync
+
+Revision ID: d61b8f4e2c93
+Revises: 3a7c9e1b5d24
+Create Date: 2026-10-18 15:00:52.184377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d61b8f4e2c93"
+down_revision: Union[str, None] = "3a7c9e1b5d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("playlist_track", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_playlist_track_track_id_playlist_id",
+            ["track_id", "playlist_id"],
+            unique=False,
+        )
+
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_playlist_owner_user_id_created_at_id",
+            ["owner_user_id", "created_at", "id"],
+            unique=False,
+        )
+
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_external_playlist_reference_parent_playlist_id"),
+            ["parent_playlist_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            batch_op.f("ix_external_playlist_reference_last_sync_at"),
+            ["last_sync_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_external_playlist_reference_last_sync_at"))
+        batch_op.drop_index(
+            batch_op.f("ix_external_playlist_reference_parent_playlist_id")
+        )
+
+    with op.batch_alter_table("playlist", schema=None) as batch_op:
+        batch_op.drop_index("ix_playlist_owner_user_id_created_at_id")
+
+    with op.batch_alter_table("playlist_track", schema=None) as batch_op:
+        batch_op.drop_index("ix_playlist_track_track_id_playlist_id")
@@ -0,0 +1,55 @@
+"""add `last_sync_attempt_at` and `last_sync_error` columns to
+`external_playlist_reference`
+
+Revision ID: 7f3b2d9a4c61
+Revises: d61b8f4e2c93
+Create Date: 2026-10-18 16:00:27.530418
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3b2d9a4c61"
+down_revision: Union[str, None] = "d61b8f4e2c93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("last_sync_attempt_at", sa.DateTime(), nullable=True)
+        )
+        batch_op.add_column(sa.Column("last_sync_error", sa.String(), nullable=True))
+
+    op.execute(
+        "UPDATE external_playlist_reference SET last_sync_attempt_at = last_sync_at"
+    )
+
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.alter_column("last_sync_attempt_at", nullable=False)
+        batch_op.drop_index(batch_op.f("ix_external_playlist_reference_last_sync_at"))
+        batch_op.create_index(
+            batch_op.f("ix_external_playlist_reference_last_sync_attempt_at"),
+            ["last_sync_attempt_at"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("external_playlist_reference", schema=None) as batch_op:
+        batch_op.drop_index(
+            batch_op.f("ix_external_playlist_reference_last_sync_attempt_at")
+        )
+        batch_op.create_index(
+            batch_op.f("ix_external_playlist_reference_last_sync_at"),
+            ["last_sync_at"],
+            unique=False,
+        )
+        batch_op.drop_column("last_sync_error")
+        batch_op.drop_column("last_sync_attempt_at")
@@ -1,3 +1,3 @@
 uv run alembic upgrade head
 
-uv run python -m windchimes.api.main
+uv run python -m windchimes.api
@@ -0,0 +1,21 @@
+"""Starts the API server: `python -m windchimes.api`
+
+Worker processes (see `YtDlpExtractionPool`) import the main module of the app
+process on start, unless it's a package `__main__` module like this one. So the
+app is imported here instead of being run as `windchimes.api.main`, and workers
+don't load the whole app
+"""
+
+import uvicorn
+
+from windchimes.api.main import app
+from windchimes.core.config import app_config
+
+
+uvicorn.run(
+    app,
+    port=app_config.api.port,
+    host="0.0.0.0",
+    proxy_headers=True,
+    forwarded_allow_ips="*",
+)
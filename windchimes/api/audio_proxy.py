@@ -1,20 +1,193 @@
 import logging
 import urllib.parse
+from email.utils import parsedate
+from typing import Mapping, Optional
 
-from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import StreamingResponse
 import httpx
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 
+from windchimes.api.lifespan import get_lifespan_state
+from windchimes.common.utils.signed_urls import get_signed_url_expiration_timestamp
 from windchimes.common.utils.user_agent import WINDOWS_CHROME_USER_AGENT
 from windchimes.core.config import app_config
+from windchimes.core.stores.hls_disk_cache import (
+    HlsDiskCache,
+    HlsSegmentCacheWriter,
+    get_youtube_cdn_resource_cache_key,
+)
 
 
 audio_proxy_router = APIRouter(prefix="/audio")
 
 
+_SEGMENT_STREAMING_CHUNK_SIZE_BYTES = 64 * 1024
+
+_FORWARDED_REQUEST_HEADERS = ["Range", "If-Range", "If-None-Match", "If-Modified-Since"]
+"""Client headers passed to Youtube CDN, so it can answer with partial content
+(seeking) or `304 Not Modified` (browser cache reuse)
+"""
+
+_FORWARDED_SEGMENT_RESPONSE_HEADERS = [
+    "Content-Length",
+    "Content-Range",
+    "Content-Encoding",
+    "Accept-Ranges",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+]
+
+
 logger = logging.getLogger(__name__)
 
 
+def _pick_headers(headers: Mapping[str, str], header_names: list[str]):
+    return {
+        header_name: headers[header_name]
+        for header_name in header_names
+        if header_name in headers
+    }
+
+
+async def _stream_response_body(
+    response: httpx.Response, cache_writer: Optional[HlsSegmentCacheWriter] = None
+):
+    """Streams upstream response body by bounded chunks and closes the response
+    when done, including when the client disconnects in the middle
+
+    Args:
+        cache_writer: if passed, the body is also written to the cache. It's
+            committed only when the whole body is received. Cache write errors
+            don't interrupt the stream, the body just isn't cached then
+    """
+
+    is_body_complete = False
+
+    try:
+        # raw bytes are streamed, so `Content-Length` and `Content-Range` headers
+        # from upstream stay valid even if the body is compressed
+        async for chunk in response.aiter_raw(_SEGMENT_STREAMING_CHUNK_SIZE_BYTES):
+            if cache_writer is not None:
+                try:
+                    await cache_writer.write(chunk)
+                except OSError as error:
+                    logger.warning("Failed to cache HLS segment: %s", error)
+                    await _discard_cache_writer(cache_writer)
+                    cache_writer = None
+
+            yield chunk
+
+        expected_size_bytes = response.headers.get("Content-Length")
+        is_body_complete = cache_writer is not None and (
+            expected_size_bytes is None
+            or str(cache_writer.size_bytes) == expected_size_bytes
+        )
+    finally:
+        await response.aclose()
+
+        if cache_writer is not None:
+            if is_body_complete:
+                try:
+                    await cache_writer.commit()
+                except OSError as error:
+                    logger.warning("Failed to cache HLS segment: %s", error)
+                    await _discard_cache_writer(cache_writer)
+            else:
+                await _discard_cache_writer(cache_writer)
+
+
+async def _discard_cache_writer(cache_writer: HlsSegmentCacheWriter):
+    try:
+        await cache_writer.discard()
+    except OSError as error:
+        logger.warning("Failed to remove partially cached HLS segment: %s", error)
+
+
+def _get_proxied_urls(m3u8_data_with_proxied_urls: str):
+    """Extracts original urls from a manifest rewritten by the proxy"""
+
+    return [
+        proxied_url
+        for m3u8_line in m3u8_data_with_proxied_urls.splitlines()
+        if m3u8_line != "" and not m3u8_line.startswith("#")
+        for proxied_url in urllib.parse.parse_qs(
+            urllib.parse.urlparse(m3u8_line).query
+        ).get("url", [])
+    ]
+
+
+def _is_not_modified(
+    request_headers: Mapping[str, str], response_headers: Mapping[str, str]
+):
+    """Checks conditional request validators against the cached file ones,
+    `If-None-Match` takes precedence over `If-Modified-Since` (RFC 9110)
+    """
+
+    if_none_match = request_headers.get("if-none-match")
+
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+
+        etag = response_headers["etag"].removeprefix("W/")
+
+        return etag in (
+            request_etag.strip().removeprefix("W/")
+            for request_etag in if_none_match.split(",")
+        )
+
+    if_modified_since = request_headers.get("if-modified-since")
+
+    if if_modified_since is None:
+        return False
+
+    # both dates are in GMT, so parsed tuples can be compared directly
+    if_modified_since_date = parsedate(if_modified_since)
+    last_modified_date = parsedate(response_headers["last-modified"])
+
+    return (
+        if_modified_since_date is not None
+        and last_modified_date is not None
+        and last_modified_date <= if_modified_since_date
+    )
+
+
+async def _get_cached_resource(
+    hls_disk_cache: HlsDiskCache, cache_key: str, request_headers: Mapping[str, str]
+) -> Optional[Response]:
+    segment_file = await hls_disk_cache.get_segment_file(cache_key)
+
+    if segment_file is not None:
+        segment_file_path, segment_file_stat = segment_file
+
+        # handles range requests itself, but not conditional ones. The file is
+        # not opened until the response is sent
+        file_response = FileResponse(
+            segment_file_path,
+            stat_result=segment_file_stat,
+            media_type="application/octet-stream",
+        )
+
+        if _is_not_modified(request_headers, file_response.headers):
+            return Response(
+                status_code=304,
+                headers={
+                    "etag": file_response.headers["etag"],
+                    "last-modified": file_response.headers["last-modified"],
+                },
+            )
+
+        return file_response
+
+    manifest = await hls_disk_cache.get_manifest(cache_key)
+
+    if manifest is not None:
+        return Response(content=manifest, media_type="application/vnd.apple.mpegurl")
+
+    return None
+
+
 @audio_proxy_router.get("/")
 async def fetch_audio_as_proxy(url: str, request: Request):
     """
@@ -28,7 +201,13 @@ async def fetch_audio_as_proxy(url: str, request: Request):
     https://api.windchimes.com/youtube-hls-audio?url=https%3A//youtube.com/seg.ts
     (pseudo-example)
 
-    If segment (seg.ts) file is passed, it just fetches it and streams it back
+    If segment (seg.ts) file is passed, it just fetches it and streams it back.
+    Range and conditional requests are supported for segments: the headers are
+    forwarded to Youtube CDN and its `206` and `304` responses are passed through
+
+    Both resources are cached on disk if `HlsDiskCache` is enabled, cached
+    segments answer conditional requests with `304` themselves. Upcoming
+    segments of requested manifests are prefetched into it in the background
     """
 
     parsed_url = urllib.parse.urlparse(url)
@@ -41,57 +220,150 @@ async def fetch_audio_as_proxy(url: str, request: Request):
             detail="Url must point to Youtube CDN (googlevideo.com)",
         )
 
-    async with httpx.AsyncClient(proxy=app_config.proxy.url) as client:
-        logger.info("Fetching HLS resource: %s. Proxy: %s", url, app_config.proxy.url)
-
-        async with client.stream(
-            url=url,
-            method="GET",
-            headers={
-                "Accept": "*/*",
-                "Accept-language": "en-US,en;q=0.9",
-                "User-Agent": WINDOWS_CHROME_USER_AGENT,
-            },
-            follow_redirects=True,
-        ) as response:
-            if response.is_error:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Youtube CDN returned an error: {response.text}",
+    lifespan_state = get_lifespan_state(request)
+    client = lifespan_state.http_clients.youtube_cdn
+    hls_disk_cache = lifespan_state.hls_disk_cache
+    hls_segments_prefetcher = lifespan_state.hls_segments_prefetcher
+
+    cache_key = (
+        get_youtube_cdn_resource_cache_key(url) if hls_disk_cache is not None else None
+    )
+
+    if hls_disk_cache is not None and cache_key is not None:
+        if hls_segments_prefetcher is not None:
+            hls_segments_prefetcher.on_segment_requested(cache_key)
+            await hls_segments_prefetcher.wait_for_prefetch(cache_key)
+
+        cached_resource_response = await _get_cached_resource(
+            hls_disk_cache, cache_key, request.headers
+        )
+
+        if cached_resource_response is not None:
+            logger.info("Serving HLS resource from disk cache: %s", url)
+
+            if (
+                hls_segments_prefetcher is not None
+                and cached_resource_response.media_type
+                == "application/vnd.apple.mpegurl"
+            ):
+                hls_segments_prefetcher.register_manifest(
+                    cache_key,
+                    _get_proxied_urls(bytes(cached_resource_response.body).decode()),
                 )
 
-            content_type = response.headers.get("Content-Type")
+            return cached_resource_response
 
-            logger.info(
-                "Fetched HLS resource, content type: %s with code %s",
-                content_type,
-                response.status_code,
-            )
+    logger.info("Fetching HLS resource: %s. Proxy: %s", url, app_config.proxy.url)
 
+    upstream_request = client.build_request(
+        url=url,
+        method="GET",
+        headers={
+            "Accept": "*/*",
+            "Accept-language": "en-US,en;q=0.9",
+            "User-Agent": WINDOWS_CHROME_USER_AGENT,
+            **_pick_headers(request.headers, _FORWARDED_REQUEST_HEADERS),
+        },
+    )
+    response = await client.send(upstream_request, stream=True, follow_redirects=True)
+
+    # ownership of the upstream response goes to StreamingResponse for segments,
+    # in other cases it's closed here
+    is_response_streamed = False
+
+    try:
+        if response.is_error:
             await response.aread()
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Youtube CDN returned an error: {response.text}",
+            )
 
-            if "application/vnd.apple.mpegurl" in content_type:
-                m3u8_data_with_proxied_urls = "\n".join(
-                    [
-                        (
-                            str(request.url.include_query_params(url=m3u8_line))
-                            if not m3u8_line.startswith("#")
-                            else m3u8_line
-                        )
-                        for m3u8_line in response.text.splitlines()
-                    ]
-                )
+        if response.status_code == 304:
+            return Response(
+                status_code=304,
+                headers=_pick_headers(
+                    response.headers, _FORWARDED_SEGMENT_RESPONSE_HEADERS
+                ),
+            )
 
-                return Response(
-                    content=m3u8_data_with_proxied_urls,
-                    media_type="application/vnd.apple.mpegurl",
-                )
-            elif "application/octet-stream" in content_type:
-                return StreamingResponse(
-                    response.aiter_bytes(),
-                    media_type=content_type,
-                )
-            else:
+        content_type = response.headers.get("Content-Type", "")
+
+        logger.info(
+            "Fetched HLS resource, content type: %s with code %s",
+            content_type,
+            response.status_code,
+        )
+
+        if "application/vnd.apple.mpegurl" in content_type:
+            if response.status_code == 206:
                 raise HTTPException(
-                    status_code=500, detail=f"Unexpected content type: {content_type}"
+                    status_code=416,
+                    detail="Range requests are supported only for segments",
+                )
+
+            # only playlists are read fully, as their urls need to be rewritten
+            await response.aread()
+
+            m3u8_data_with_proxied_urls = "\n".join(
+                [
+                    (
+                        str(request.url.include_query_params(url=m3u8_line))
+                        if not m3u8_line.startswith("#")
+                        else m3u8_line
+                    )
+                    for m3u8_line in response.text.splitlines()
+                ]
+            )
+
+            if hls_disk_cache is not None and cache_key is not None:
+                await hls_disk_cache.save_manifest(
+                    cache_key,
+                    m3u8_data_with_proxied_urls,
+                    get_signed_url_expiration_timestamp(url),
                 )
+
+                if hls_segments_prefetcher is not None:
+                    hls_segments_prefetcher.register_manifest(
+                        cache_key, _get_proxied_urls(m3u8_data_with_proxied_urls)
+                    )
+
+            return Response(
+                content=m3u8_data_with_proxied_urls,
+                media_type="application/vnd.apple.mpegurl",
+            )
+        elif "application/octet-stream" in content_type:
+            # chunks are read from upstream only after the previous ones are sent,
+            # so a slow client slows down the download instead of filling memory
+            is_response_streamed = True
+
+            # only full uncompressed bodies are cached, they are served as files
+            is_cacheable = (
+                response.status_code == 200
+                and "Content-Encoding" not in response.headers
+            )
+
+            return StreamingResponse(
+                _stream_response_body(
+                    response,
+                    (
+                        hls_disk_cache.open_segment_writer(cache_key)
+                        if hls_disk_cache is not None
+                        and cache_key is not None
+                        and is_cacheable
+                        else None
+                    ),
+                ),
+                status_code=response.status_code,
+                media_type=content_type,
+                headers=_pick_headers(
+                    response.headers, _FORWARDED_SEGMENT_RESPONSE_HEADERS
+                ),
+            )
+        else:
+            raise HTTPException(
+                status_code=500, detail=f"Unexpected content type: {content_type}"
+            )
+    finally:
+        if not is_response_streamed:
+            await response.aclose()
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel, HttpUrl
 
 
@@ -5,3 +7,6 @@ class ApiSettings(BaseModel):
     cors_allowed_origins: list[str]
     public_base_url: HttpUrl
     port: int = 8000
+
+    metrics_token: Optional[str] = None
+    """Bearer token required by `/metrics`. The endpoint is disabled if not set"""
@@ -1,6 +1,6 @@
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import cast
+from typing import Any, Optional, cast
 
 from auth0.authentication.async_token_verifier import (
     AsyncAsymmetricSignatureVerifier,
@@ -8,20 +8,124 @@ from auth0.authentication.async_token_verifier import (
 )
 from fastapi import FastAPI, Request
 
+from windchimes.common.api_clients.http_clients import ExternalApiHttpClients
+from windchimes.common.api_clients.soundcloud import SoundcloudApiClient
+from windchimes.common.api_clients.youtube_data_api.quota_ledger import (
+    YoutubeQuotaLedger,
+    YoutubeQuotaPriority,
+)
+from windchimes.common.api_clients.youtube_data_api.youtube_data_api_client import (
+    YoutubeDataApiClient,
+)
+from windchimes.common.api_clients.youtube_internal_api.yt_dlp_extraction_pool import (
+    YtDlpExtractionPool,
+)
+from windchimes.common.api_clients.youtube_internal_api.youtube_internal_api_client import (
+    YoutubeInternalApiClient,
+)
+from windchimes.common.utils.single_flight import SingleFlight
 from windchimes.core.config import app_config
 from windchimes.core.database import database
+from windchimes.core.models.platform import Platform
 from windchimes.core.regular_tasks.scheduler import scheduler
+from windchimes.core.services.external_platform_import.tracks_auto_sync import (
+    TracksAutoSyncService,
+)
+from windchimes.core.services.external_platform_import.tracks_import import (
+    TracksImportService,
+)
+from windchimes.core.services.external_platform_import.tracks_sync import (
+    TracksSyncService,
+)
+from windchimes.core.services.external_platforms.platform_aggregator import (
+    PlatformAggregatorService,
+)
+from windchimes.core.services.external_platforms.soundcloud import (
+    SoundcloudService,
+)
+from windchimes.core.services.external_platforms.youtube_service import (
+    YoutubeService,
+)
+from windchimes.core.services.hls_segments_prefetcher import HlsSegmentsPrefetcher
+from windchimes.core.stores.audio_file_urls_cache import AudioFileUrlsCache
+from windchimes.core.stores.hls_disk_cache import HlsDiskCache
+from windchimes.core.stores.loaded_tracks_cache import (
+    DatabaseLoadedTracksCacheBackend,
+    InMemoryLoadedTracksCacheBackend,
+    LoadedTracksCache,
+    LoadedTracksCacheBackend,
+)
+from windchimes.core.stores.soundcloud_api_client_id_store import (
+    get_soundcloud_api_client_id,
+)
 
 
 @dataclass()
 class LifespanState:
     token_verifier: AsyncTokenVerifier
+    http_clients: ExternalApiHttpClients
+    yt_dlp_extraction_pool: YtDlpExtractionPool
+    youtube_quota_ledger: YoutubeQuotaLedger
+    platform_calls_single_flight: SingleFlight[Any]
+    loaded_tracks_cache: Optional[LoadedTracksCache]
+    audio_file_urls_cache: Optional[AudioFileUrlsCache]
+    hls_disk_cache: Optional[HlsDiskCache]
+    hls_segments_prefetcher: Optional[HlsSegmentsPrefetcher]
+
+
+def _create_loaded_tracks_cache():
+    cache_settings = app_config.loaded_tracks_cache
+
+    backend: LoadedTracksCacheBackend
+
+    if cache_settings.backend == "DISABLED":
+        return None
+    elif cache_settings.backend == "DATABASE":
+        backend = DatabaseLoadedTracksCacheBackend(database)
+        scheduler.add_job(backend.delete_expired_entries, "interval", hours=1)
+    else:
+        backend = InMemoryLoadedTracksCacheBackend(cache_settings.max_memory_bytes)
+
+    return LoadedTracksCache(
+        backend,
+        ttls_seconds={
+            Platform.SOUNDCLOUD: cache_settings.soundcloud_ttl_seconds,
+            Platform.YOUTUBE: cache_settings.youtube_ttl_seconds,
+        },
+        not_available_track_ttl_seconds=cache_settings.not_available_track_ttl_seconds,
+    )
+
+
+async def _create_hls_disk_cache():
+    cache_settings = app_config.hls_disk_cache
+
+    if not cache_settings.enabled:
+        return None
+
+    hls_disk_cache = HlsDiskCache(
+        directory=cache_settings.directory,
+        max_size_bytes=cache_settings.max_size_bytes,
+        manifest_max_ttl_seconds=cache_settings.manifest_max_ttl_seconds,
+        expiration_margin_seconds=cache_settings.manifest_expiration_margin_seconds,
+    )
+    await hls_disk_cache.prepare()
+
+    return hls_disk_cache
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     scheduler.start()
 
+    await database.warm_up_pool()
+
+    if app_config.database.pool_metrics_log_interval_seconds is not None:
+        scheduler.add_job(
+            database.log_pool_metrics,
+            "interval",
+            seconds=app_config.database.pool_metrics_log_interval_seconds,
+        )
+
     AUTH0_BASE_URL = "https://" + app_config.auth0.domain
     KEYS_URL = AUTH0_BASE_URL + "/.well-known/jwks.json"
     signature_verifier = AsyncAsymmetricSignatureVerifier(KEYS_URL)
@@ -31,11 +135,199 @@ async def lifespan(_: FastAPI):
         audience=app_config.auth0.frontend_client_id,
     )
 
-    state = LifespanState(token_verifier=token_verifier)
+    http_clients = ExternalApiHttpClients.create(
+        connections_limit_per_host=app_config.http_clients.connections_limit_per_host,
+        keepalive_timeout_seconds=app_config.http_clients.keepalive_timeout_seconds,
+        youtube_cdn_max_connections=(
+            app_config.http_clients.youtube_cdn_max_connections
+        ),
+        youtube_cdn_pool_timeout_seconds=(
+            app_config.http_clients.youtube_cdn_pool_timeout_seconds
+        ),
+        proxy=app_config.proxy.url,
+    )
+
+    yt_dlp_extraction_pool = YtDlpExtractionPool(
+        max_workers=app_config.yt_dlp.max_workers,
+        max_queued_jobs=app_config.yt_dlp.max_queued_jobs,
+        job_timeout_seconds=app_config.yt_dlp.job_timeout_seconds,
+    )
+    yt_dlp_extraction_pool.start()
+
+    youtube_data_api_settings = app_config.youtube_data_api
+
+    youtube_quota_ledger = YoutubeQuotaLedger(
+        daily_quota_units=youtube_data_api_settings.daily_quota_units,
+        background_min_remaining_units=(
+            youtube_data_api_settings.background_min_remaining_quota_units
+        ),
+        cache_only_min_remaining_units=(
+            youtube_data_api_settings.cache_only_min_remaining_quota_units
+        ),
+        exhausted_cooldown_seconds=(
+            youtube_data_api_settings.quota_exhausted_cooldown_seconds
+        ),
+    )
+
+    if youtube_data_api_settings.quota_metrics_log_interval_seconds is not None:
+        scheduler.add_job(
+            youtube_quota_ledger.log_metrics,
+            "interval",
+            seconds=youtube_data_api_settings.quota_metrics_log_interval_seconds,
+        )
+
+    audio_file_urls_cache = (
+        AudioFileUrlsCache(
+            default_ttl_seconds=app_config.audio_file_urls_cache.default_ttl_seconds,
+            expiration_margin_seconds=(
+                app_config.audio_file_urls_cache.expiration_margin_seconds
+            ),
+            max_entries=app_config.audio_file_urls_cache.max_entries,
+        )
+        if app_config.audio_file_urls_cache.enabled
+        else None
+    )
+
+    hls_disk_cache = await _create_hls_disk_cache()
+
+    hls_segments_prefetcher = (
+        HlsSegmentsPrefetcher(
+            http_clients.youtube_cdn,
+            hls_disk_cache,
+            segments_count=app_config.hls_prefetch.segments_count,
+            max_concurrent_requests_per_stream=(
+                app_config.hls_prefetch.max_concurrent_requests_per_stream
+            ),
+            listener_idle_timeout_seconds=(
+                app_config.hls_prefetch.listener_idle_timeout_seconds
+            ),
+        )
+        if hls_disk_cache is not None and app_config.hls_prefetch.enabled
+        else None
+    )
+
+    state = LifespanState(
+        token_verifier=token_verifier,
+        http_clients=http_clients,
+        yt_dlp_extraction_pool=yt_dlp_extraction_pool,
+        youtube_quota_ledger=youtube_quota_ledger,
+        platform_calls_single_flight=SingleFlight(),
+        loaded_tracks_cache=_create_loaded_tracks_cache(),
+        audio_file_urls_cache=audio_file_urls_cache,
+        hls_disk_cache=hls_disk_cache,
+        hls_segments_prefetcher=hls_segments_prefetcher,
+    )
+
+    tracks_auto_sync_job = (
+        scheduler.add_job(
+            _create_tracks_auto_sync_service(state).sync_stale_playlists,
+            "interval",
+            seconds=app_config.tracks_auto_sync.interval_seconds,
+            max_instances=1,
+            coalesce=True,
+        )
+        if app_config.tracks_auto_sync.enabled
+        else None
+    )
+
     yield vars(state)
 
+    if tracks_auto_sync_job is not None:
+        tracks_auto_sync_job.remove()
+
+    if hls_segments_prefetcher is not None:
+        hls_segments_prefetcher.close()
+
+    yt_dlp_extraction_pool.close()
+    await http_clients.close()
     await database.close()
 
 
+def create_platform_aggregator_service(
+    lifespan_state: LifespanState,
+    youtube_max_playlist_pages: Optional[int] = None,
+    youtube_quota_priority: YoutubeQuotaPriority = YoutubeQuotaPriority.INTERACTIVE,
+):
+    """
+    Args:
+        youtube_max_playlist_pages: defaults to the limit for user requests
+    """
+
+    http_clients = lifespan_state.http_clients
+
+    soundcloud_service = SoundcloudService(
+        SoundcloudApiClient(
+            get_soundcloud_api_client_id(),
+            http_clients.soundcloud_api,
+            app_config.soundcloud_api.max_concurrent_tracks_requests,
+        )
+    )
+
+    youtube_data_api_client = YoutubeDataApiClient(
+        app_config.youtube_data_api.key,
+        http_clients.youtube_data_api,
+        lifespan_state.youtube_quota_ledger,
+        youtube_quota_priority,
+    )
+    youtube_internal_api_client = YoutubeInternalApiClient(
+        http_clients.youtube_internal_api,
+        lifespan_state.yt_dlp_extraction_pool,
+        app_config.proxy.url,
+    )
+    youtube_service = YoutubeService(
+        youtube_data_api_client,
+        youtube_internal_api_client,
+        max_playlist_pages=(
+            youtube_max_playlist_pages or app_config.youtube_data_api.max_playlist_pages
+        ),
+    )
+
+    return PlatformAggregatorService(
+        soundcloud_service,
+        youtube_service,
+        load_tracks_timeouts_seconds={
+            Platform.SOUNDCLOUD: app_config.soundcloud_api.load_tracks_timeout_seconds,
+            Platform.YOUTUBE: app_config.youtube_data_api.load_tracks_timeout_seconds,
+        },
+        loaded_tracks_cache=lifespan_state.loaded_tracks_cache,
+        single_flight=lifespan_state.platform_calls_single_flight,
+    )
+
+
+def _create_tracks_auto_sync_service(lifespan_state: LifespanState):
+    auto_sync_settings = app_config.tracks_auto_sync
+
+    def create_tracks_sync_service():
+        platform_aggregator_service = create_platform_aggregator_service(
+            lifespan_state,
+            youtube_max_playlist_pages=(
+                app_config.youtube_data_api.max_linked_playlist_pages
+            ),
+            youtube_quota_priority=YoutubeQuotaPriority.BACKGROUND,
+        )
+
+        return TracksSyncService(
+            database,
+            platform_aggregator_service,
+            TracksImportService(database, platform_aggregator_service),
+        )
+
+    return TracksAutoSyncService(
+        database,
+        create_tracks_sync_service,
+        stale_after_seconds=auto_sync_settings.stale_after_seconds,
+        batch_size=auto_sync_settings.batch_size,
+        max_concurrent_syncs=auto_sync_settings.max_concurrent_syncs,
+        min_seconds_between_platform_syncs={
+            Platform.SOUNDCLOUD: (
+                auto_sync_settings.min_seconds_between_soundcloud_syncs
+            ),
+            Platform.YOUTUBE: auto_sync_settings.min_seconds_between_youtube_syncs,
+        },
+        max_jitter_seconds=auto_sync_settings.max_jitter_seconds,
+        youtube_quota_ledger=lifespan_state.youtube_quota_ledger,
+    )
+
+
 def get_lifespan_state(request: Request) -> LifespanState:
     return cast(LifespanState, request.state)
@@ -0,0 +1,37 @@
+from dataclasses import asdict
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request
+
+from windchimes.api.lifespan import get_lifespan_state
+from windchimes.core.config import app_config
+from windchimes.core.database import database
+
+
+metrics_router = APIRouter(prefix="/metrics")
+
+
+@metrics_router.get("")
+async def get_metrics(request: Request):
+    """Internal metrics of the process, for monitoring"""
+
+    metrics_token = app_config.api.metrics_token
+
+    if metrics_token is None:
+        raise HTTPException(status_code=404)
+
+    if not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {metrics_token}"
+    ):
+        raise HTTPException(status_code=401)
+
+    lifespan_state = get_lifespan_state(request)
+    database_pool_metrics = database.get_pool_metrics()
+
+    return {
+        "yt_dlp_extraction_pool": asdict(lifespan_state.yt_dlp_extraction_pool.metrics),
+        "youtube_quota": asdict(lifespan_state.youtube_quota_ledger.get_metrics()),
+        "database_pool": (
+            asdict(database_pool_metrics) if database_pool_metrics is not None else None
+        ),
+    }
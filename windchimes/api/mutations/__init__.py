@@ -12,6 +12,7 @@ from windchimes.api.mutations.playlists.playlist_picture_mutations import (
 from windchimes.api.mutations.playlists.playlist_tracks import (
     delete_track_from_playlists_mutation,
     add_tracks_to_playlists_mutation,
+    move_playlist_tracks_mutation,
 )
 from windchimes.api.mutations.external_platform_import.tracks_import import (
     import_external_playlist_tracks_mutation,
@@ -31,6 +32,7 @@ class Mutation:
 
     add_tracks_to_playlists = add_tracks_to_playlists_mutation
     delete_track_from_playlists = delete_track_from_playlists_mutation
+    move_playlist_tracks = move_playlist_tracks_mutation
 
     update_playlist_picture = update_playlist_picture_mutation
     delete_playlist_picture = delete_playlist_picture_mutation
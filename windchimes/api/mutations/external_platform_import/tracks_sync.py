@@ -132,9 +132,17 @@ disable_playlist_sync_mutation = strawberry.mutation(
 )
 
 
+@strawberry.type
+class PlaylistTracksDiffGraphQL:
+    added_tracks_ids: list[str]
+    removed_tracks_ids: list[str]
+    moved_tracks_ids: list[str]
+
+
 @strawberry.type
 class TracksSyncResult:
     updated_track_references: list[TrackReferenceToReadGraphQL]
+    diff: PlaylistTracksDiffGraphQL
 
 
 async def _sync_playlist_tracks_with_external_playlist(
@@ -164,15 +172,16 @@ async def _sync_playlist_tracks_with_external_playlist(
         return ForbiddenErrorGraphQL()
 
     try:
-        updated_track_list = await tracks_sync_service.sync_playlist_tracks(
-            access_check_result.loaded_playlists[0]
+        sync_result = await tracks_sync_service.sync_playlist_tracks(
+            access_check_result.loaded_playlists[0].id
         )
 
         return TracksSyncResult(
             updated_track_references=[
                 TrackReferenceToReadGraphQL(**track_reference.model_dump())
-                for track_reference in updated_track_list
-            ]
+                for track_reference in sync_result.track_references
+            ],
+            diff=PlaylistTracksDiffGraphQL(**sync_result.diff.model_dump()),
         )
     except (ExternalPlaylistNotFoundError, ExternalPlaylistNotLinkedError):
         return ExternalPlaylistNotAvailableErrorGraphQL()
@@ -180,8 +189,8 @@ async def _sync_playlist_tracks_with_external_playlist(
 
 sync_playlist_tracks_with_external_playlist_mutation = strawberry.mutation(
     resolver=_sync_playlist_tracks_with_external_playlist,
-    description="Replaces playlist tracks with tracks from external playlist linked "
+    description="Makes playlist tracks match tracks of external playlist linked "
     + "to it via `set_playlist_for_tracks_sync_mutation` mutation. Returns list "
-    + "of updated playlist tracks",
+    + "of updated playlist tracks and the changes that were applied",
     extensions=[AuthorizedOnlyExtension()],
 )
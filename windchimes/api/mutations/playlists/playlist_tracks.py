@@ -1,10 +1,16 @@
+from typing import Optional
+
 from pydantic import ValidationError
 import strawberry
 
 from windchimes.core.services.playlists import (
+    PlaylistTracksToMove,
     TrackToDeleteFromPlaylists,
     TracksToAddToPlaylistsWrapper,
 )
+from windchimes.core.services.playlists.track_positions import (
+    PlaylistTrackNotFoundError,
+)
 from windchimes.api.mutations.playlists import TrackToAddGraphQL
 from windchimes.api.reusable_schemas.errors import (
     ForbiddenErrorGraphQL,
@@ -121,3 +127,59 @@ delete_track_from_playlists_mutation = strawberry.mutation(
         Ids of the playlists from which the track was deleted
     """,
 )
+
+
+async def _move_playlist_tracks(
+    info: GraphQLRequestInfo,
+    playlist_id: int,
+    tracks_ids: list[str],
+    after_track_id: Optional[str] = None,
+) -> None | ValidationErrorGraphQL | GraphQLApiError:
+    playlists_access_management_service = info.context[
+        "playlists_access_management_service"
+    ]
+    playlists_service = info.context["playlists_service"]
+
+    try:
+        tracks_to_move = PlaylistTracksToMove.model_validate(
+            {
+                "playlist_id": playlist_id,
+                "tracks_ids": tracks_ids,
+                "after_track_id": after_track_id,
+            }
+        )
+    except ValidationError as error:
+        return ValidationErrorGraphQL.create_from_pydantic_validation_error(error)
+
+    access_check_result = (
+        await playlists_access_management_service.check_if_user_owns_the_playlists(
+            [playlist_id]
+        )
+    )
+    if not access_check_result.user_owns_all_playlists:
+        return ForbiddenErrorGraphQL(
+            explanation="You don't have access to the playlist you want to "
+            + "reorder tracks in",
+            technical_explanation="You don't have access to the playlist you want "
+            + "to reorder tracks in",
+        )
+
+    try:
+        await playlists_service.move_tracks(tracks_to_move)
+    except PlaylistTrackNotFoundError as error:
+        return GraphQLApiError(
+            name="playlist-track-not-found",
+            explanation="Some of the tracks are not in the playlist",
+            technical_explanation=str(error),
+        )
+
+
+move_playlist_tracks_mutation = strawberry.mutation(
+    resolver=_move_playlist_tracks,
+    extensions=[AuthorizedOnlyExtension()],
+    description="""
+    Moves tracks right after `after_track_id` track, keeping the order of
+    `tracks_ids`. If `after_track_id` is not specified, the tracks are moved to
+    the beginning of the playlist
+    """,
+)
@@ -2,7 +2,10 @@ from typing import Optional, Sequence
 
 import strawberry
 
-from windchimes.api.reusable_schemas.errors import GraphQLApiError
+from windchimes.api.reusable_schemas.errors import (
+    GraphQLApiError,
+    ValidationErrorGraphQL,
+)
 from windchimes.api.reusable_schemas.playlists import (
     ExternalPlaylistReferenceGraphQL,
     PlaylistDetailedGraphQL,
@@ -13,6 +16,9 @@ from windchimes.api.reusable_schemas.track_reference import (
 from windchimes.api.utils.graphql import (
     GraphQLRequestInfo,
 )
+from windchimes.core.constants.external_api_usage_limits import (
+    MAXIMUM_TRACKS_TO_LOAD_PER_REQUEST,
+)
 
 
 @strawberry.type
@@ -49,7 +55,13 @@ async def _get_one_playlist(
     playlist_id: int,
     tracks_to_load_ids: Optional[list[str]] = None,
     load_first_tracks: bool = False,
-) -> Optional[PlaylistDetailedWithLoadedTracksGraphQL] | GraphQLApiError:
+    track_references_offset: int = 0,
+    track_references_limit: Optional[int] = None,
+) -> (
+    Optional[PlaylistDetailedWithLoadedTracksGraphQL]
+    | ValidationErrorGraphQL
+    | GraphQLApiError
+):
     tracks_service = info.context["tracks_service"]
     playlists_service = info.context["playlists_service"]
     playlists_access_management_service = info.context[
@@ -57,7 +69,19 @@ async def _get_one_playlist(
     ]
     platform_aggregator_service = info.context["platform_aggregator_service"]
 
-    playlist = await playlists_service.get_playlist_detailed(playlist_id)
+    if track_references_offset < 0:
+        return ValidationErrorGraphQL(
+            "trackReferencesOffset", explanation="Must not be negative"
+        )
+
+    if track_references_limit is not None and track_references_limit < 0:
+        return ValidationErrorGraphQL(
+            "trackReferencesLimit", explanation="Must not be negative"
+        )
+
+    playlist = await playlists_service.get_playlist_detailed(
+        playlist_id, track_references_offset, track_references_limit
+    )
 
     if playlist is None:
         return None
@@ -92,8 +116,20 @@ async def _get_one_playlist(
             external_playlist_to_sync_with=external_playlist_to_sync_with,
         )
 
+    # tracks to load are not necessarily in the requested window,
+    # so only they are fetched separately
+    playlist_track_references_to_pick_from = (
+        await playlists_service.get_playlist_track_references(
+            playlist_id, ids=tracks_to_load_ids
+        )
+        if tracks_to_load_ids is not None
+        else await playlists_service.get_playlist_track_references(
+            playlist_id, limit=MAXIMUM_TRACKS_TO_LOAD_PER_REQUEST
+        )
+    )
+
     track_references_to_load: Sequence = tracks_service.get_track_references_to_load(
-        playlist, tracks_to_load_ids, load_first_tracks
+        playlist_track_references_to_pick_from, tracks_to_load_ids, load_first_tracks
     )
 
     if None in track_references_to_load and tracks_to_load_ids is not None:
@@ -147,5 +183,9 @@ playlist_query = strawberry.field(
             tracks_to_load_ids: ids of tracks which data to load from external platforms
                 API. **Prioritized over** `load_first_tracks` flag param
             load_first_tracks: include first tracks in a portion
+            track_references_offset: how many track references to skip in
+                `trackReferences` field. `trackCount` field has the total number
+            track_references_limit: how many track references to include in
+                `trackReferences` field. If not specified, all of them are included
     """,
 )
@@ -3,6 +3,10 @@ from typing import Optional
 import strawberry
 
 from windchimes.core.services.playlists import PlaylistsFilters
+from windchimes.core.services.playlists.pagination import (
+    InvalidPlaylistsCursorError,
+)
+from windchimes.api.reusable_schemas.errors import ValidationErrorGraphQL
 from windchimes.api.reusable_schemas.playlists import (
     PlaylistToReadGraphQL,
 )
@@ -37,28 +41,48 @@ class PlaylistsFiltersGraphQL:
         default=None,
     )
 
+    after_cursor: Optional[str] = strawberry.field(
+        description="If specified, only the playlists that go after the playlist "
+        + "with this cursor are returned. Use `cursor` field of the last playlist "
+        + "of the previous page",
+        default=None,
+    )
+
+
+@strawberry.type
+class PlaylistsWrapper:
+    items: list[PlaylistToReadGraphQL]
+
 
 async def _get_playlists(
     info: GraphQLRequestInfo,
     filters: PlaylistsFiltersGraphQL,
     limit: Optional[int] = None,
-):
+) -> PlaylistsWrapper | ValidationErrorGraphQL:
     playlists_service = info.context["playlists_service"]
     playlists_access_management_service = info.context[
         "playlists_access_management_service"
     ]
 
-    playlists = await playlists_service.get_playlists(
-        PlaylistsFilters(**vars(filters)), limit
+    filters_of_viewable_playlists = (
+        playlists_access_management_service.restrict_filters_to_viewable(
+            PlaylistsFilters(**vars(filters))
+        )
     )
 
-    playlists_user_can_view = (
-        playlists_access_management_service.get_playlists_user_can_view(playlists)
-    )
+    try:
+        playlists_user_can_view = await playlists_service.get_playlists(
+            filters_of_viewable_playlists, limit
+        )
+    except InvalidPlaylistsCursorError as error:
+        return ValidationErrorGraphQL("filters.afterCursor", explanation=str(error))
 
-    return playlists_user_can_view
+    return PlaylistsWrapper(
+        items=[
+            PlaylistToReadGraphQL(**playlist.model_dump())
+            for playlist in playlists_user_can_view
+        ]
+    )
 
 
-playlists_query = strawberry.field(
-    resolver=_get_playlists, graphql_type=list[PlaylistToReadGraphQL]
-)
+playlists_query = strawberry.field(resolver=_get_playlists)
@@ -7,6 +7,10 @@ import urllib
 from windchimes.core.config import app_config
 from windchimes.core.models.platform import Platform
 from windchimes.api.reusable_schemas.errors import GraphQLApiError
+from windchimes.api.utils.client_disconnect import (
+    ClientDisconnectedError,
+    run_while_client_connected,
+)
 from windchimes.api.utils.graphql import GraphQLRequestInfo
 from windchimes.api.audio_proxy import audio_proxy_router
 
@@ -28,12 +32,26 @@ async def _get_track_audio_file(
 ) -> Optional[TrackAudioFileGraphQL] | GraphQLApiError:
     tracks_service = info.context["tracks_service"]
 
-    audio_file_url = await tracks_service.get_track_audio_file_url(
+    audio_file_url_call = tracks_service.get_track_audio_file_url(
         platform_id,
         platform,
         audio_file_endpoint_url,
     )
 
+    # added by strawberry, so it's always present when serving requests
+    request = info.context.get("request")
+
+    try:
+        # youtube urls extraction is expensive, so it's cancelled when the client
+        # is gone. Requests for the same track from other clients still get it
+        audio_file_url = (
+            await run_while_client_connected(request, audio_file_url_call)
+            if request is not None
+            else await audio_file_url_call
+        )
+    except ClientDisconnectedError:
+        return None
+
     if audio_file_url is None:
         return None
 
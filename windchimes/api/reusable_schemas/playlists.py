@@ -4,6 +4,7 @@ from typing import Optional
 import strawberry
 
 from windchimes.core.models.platform import Platform
+from windchimes.core.services.playlists.pagination import encode_playlists_cursor
 from windchimes.api.reusable_schemas.track_reference import (
     TrackReferenceToReadGraphQL,
 )
@@ -23,6 +24,10 @@ class ExternalPlaylistReferenceGraphQL:
     last_sync_at: datetime
     platform: Platform
     platform_id: str
+    last_sync_error: Optional[str] = strawberry.field(
+        description="Why the last background sync failed, `null` if it succeeded",
+        default=None,
+    )
 
 
 @strawberry.type
@@ -37,6 +42,13 @@ class PlaylistToReadGraphQL:
 
     track_count: int
 
+    @strawberry.field(
+        description="Opaque cursor to pass in `afterCursor` filter to get the "
+        + "playlists that go after this one"
+    )
+    def cursor(self) -> str:
+        return encode_playlists_cursor(self.created_at, self.id)
+
 
 @strawberry.type
 class PlaylistDetailedGraphQL(PlaylistToReadGraphQL):
@@ -3,17 +3,13 @@ from typing import Optional, TypedDict
 
 from fastapi import Request
 
-from windchimes.api.lifespan import get_lifespan_state
+from windchimes.api.lifespan import (
+    create_platform_aggregator_service,
+    get_lifespan_state,
+)
 from windchimes.common.api_clients.imagekit_api_client import (
     ImagekitApiClient,
 )
-from windchimes.common.api_clients.soundcloud import SoundcloudApiClient
-from windchimes.common.api_clients.youtube_data_api.youtube_data_api_client import (
-    YoutubeDataApiClient,
-)
-from windchimes.common.api_clients.youtube_internal_api.youtube_internal_api_client import (
-    YoutubeInternalApiClient,
-)
 from windchimes.core.config import app_config
 from windchimes.core.database import Database, database
 from windchimes.core.models.user import User
@@ -27,12 +23,6 @@ from windchimes.core.services.external_platform_import.tracks_sync import (
 from windchimes.core.services.external_platforms.platform_aggregator import (
     PlatformAggregatorService,
 )
-from windchimes.core.services.external_platforms.soundcloud import (
-    SoundcloudService,
-)
-from windchimes.core.services.external_platforms.youtube_service import (
-    YoutubeService,
-)
 from windchimes.core.services.picture_storage_service import (
     PictureStorageService,
 )
@@ -41,14 +31,16 @@ from windchimes.core.services.playlists.playlists_access_management import (
     PlaylistsAccessManagementService,
 )
 from windchimes.core.services.tracks_service import TracksService
-from windchimes.core.stores.soundcloud_api_client_id_store import (
-    get_soundcloud_api_client_id,
-)
 
 logger = logging.getLogger(__name__)
 
 
-class GraphQLRequestContext(TypedDict):
+class _StrawberryContext(TypedDict, total=False):
+    request: Request
+    """Added by strawberry itself"""
+
+
+class GraphQLRequestContext(_StrawberryContext):
     database: Database
 
     playlists_service: PlaylistsService
@@ -92,42 +84,49 @@ async def get_user_from_request(auth_service: AuthService, request: Request):
 
 
 async def get_graphql_context(request: Request):
-    soundcloud_service = SoundcloudService(
-        SoundcloudApiClient(get_soundcloud_api_client_id())
-    )
-
-    youtube_data_api_client = YoutubeDataApiClient(app_config.youtube_data_api.key)
-    youtube_internal_api_client = YoutubeInternalApiClient(app_config.proxy.url)
-    youtube_service = YoutubeService(
-        youtube_data_api_client, youtube_internal_api_client
-    )
-
-    platform_aggregator_service = PlatformAggregatorService(
-        soundcloud_service, youtube_service
+    lifespan_state = get_lifespan_state(request)
+    http_clients = lifespan_state.http_clients
+
+    platform_aggregator_service = create_platform_aggregator_service(lifespan_state)
+    # same cap as in the background sync, so syncs of a linked playlist always
+    # fetch the same tracks
+    linked_playlists_platform_aggregator_service = create_platform_aggregator_service(
+        lifespan_state,
+        youtube_max_playlist_pages=(
+            app_config.youtube_data_api.max_linked_playlist_pages
+        ),
     )
 
     playlists_service = PlaylistsService(database)
 
     tracks_import_service = TracksImportService(database, platform_aggregator_service)
 
-    auth_service = AuthService(get_lifespan_state(request).token_verifier)
+    auth_service = AuthService(lifespan_state.token_verifier)
 
     current_user = await get_user_from_request(auth_service, request)
 
     return GraphQLRequestContext(
         database=database,
         playlists_service=playlists_service,
-        tracks_service=TracksService(database, platform_aggregator_service),
+        tracks_service=TracksService(
+            database,
+            platform_aggregator_service,
+            lifespan_state.audio_file_urls_cache,
+        ),
         playlists_access_management_service=PlaylistsAccessManagementService(
             playlists_service, current_user
         ),
         tracks_import_service=tracks_import_service,
         auth_service=auth_service,
         picture_storage_service=PictureStorageService(
-            ImagekitApiClient(app_config.imagekit_api.private_key)
+            ImagekitApiClient(
+                app_config.imagekit_api.private_key, http_clients.imagekit_api
+            )
         ),
         tracks_sync_service=TracksSyncService(
-            database, platform_aggregator_service, tracks_import_service
+            database,
+            linked_playlists_platform_aggregator_service,
+            TracksImportService(database, linked_playlists_platform_aggregator_service),
         ),
         platform_aggregator_service=platform_aggregator_service,
         current_user=current_user,
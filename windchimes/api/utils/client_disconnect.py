@@ -0,0 +1,47 @@
+import asyncio
+import logging
+from typing import Awaitable, TypeVar
+
+from fastapi import Request
+
+
+logger = logging.getLogger(__name__)
+
+
+ResultT = TypeVar("ResultT")
+
+
+class ClientDisconnectedError(Exception):
+    def __init__(self):
+        super().__init__("Client disconnected before the result was ready")
+
+
+async def run_while_client_connected(
+    request: Request,
+    awaitable: Awaitable[ResultT],
+    poll_interval_seconds: float = 0.5,
+) -> ResultT:
+    """Awaits `awaitable`, cancelling it if the client closes the connection
+
+    Useful for expensive work which result is useless when nobody waits for it
+
+    Raises:
+        ClientDisconnectedError: if the client disconnected
+    """
+
+    task = asyncio.ensure_future(awaitable)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval_seconds)
+
+            if task in done:
+                return task.result()
+
+            if await request.is_disconnected():
+                logger.info("Client disconnected, cancelling the work")
+                task.cancel()
+                raise ClientDisconnectedError()
+    finally:
+        if not task.done():
+            task.cancel()
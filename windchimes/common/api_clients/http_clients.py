@@ -0,0 +1,135 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+_HTTPX_DEFAULT_TIMEOUT_SECONDS = 5.0
+
+
+def create_aiohttp_session(
+    connections_limit_per_host: int, keepalive_timeout_seconds: float
+):
+    """Creates aiohttp session with a keep-alive connection pool
+
+    Must be called inside a running event loop
+    """
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=connections_limit_per_host,
+        keepalive_timeout=keepalive_timeout_seconds,
+        ttl_dns_cache=300,
+    )
+
+    return aiohttp.ClientSession(connector=connector)
+
+
+def create_httpx_client(
+    max_connections: int,
+    keepalive_timeout_seconds: float,
+    proxy: Optional[str] = None,
+    pool_timeout_seconds: float = _HTTPX_DEFAULT_TIMEOUT_SECONDS,
+):
+    """Creates httpx client with a keep-alive connection pool
+
+    Requests to the same host are multiplexed over one HTTP/2 connection when
+    the server supports it
+
+    Args:
+        max_connections: limit of all connections of the client, httpx doesn't
+            limit connections per host
+        pool_timeout_seconds: how long to wait for a free connection when all
+            `max_connections` are in use
+    """
+
+    return httpx.AsyncClient(
+        proxy=proxy,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_timeout_seconds,
+        ),
+        timeout=httpx.Timeout(
+            _HTTPX_DEFAULT_TIMEOUT_SECONDS, pool=pool_timeout_seconds
+        ),
+    )
+
+
+@dataclass()
+class ExternalApiHttpClients:
+    """Process-wide HTTP clients, one connection pool per upstream
+
+    Created once on app startup and shared by all API clients, so connections
+    (DNS, TCP and TLS handshakes) are reused between requests
+    """
+
+    soundcloud_api: aiohttp.ClientSession
+    youtube_data_api: aiohttp.ClientSession
+    imagekit_api: aiohttp.ClientSession
+    youtube_internal_api: httpx.AsyncClient
+    youtube_cdn: httpx.AsyncClient
+
+    @staticmethod
+    def create(
+        connections_limit_per_host: int,
+        keepalive_timeout_seconds: float,
+        youtube_cdn_max_connections: int,
+        youtube_cdn_pool_timeout_seconds: float,
+        proxy: Optional[str] = None,
+    ):
+        """Creates all the clients. Must be called inside a running event loop
+
+        Args:
+            connections_limit_per_host: for httpx clients, which don't have
+                per-host limits, it's the limit of all their connections
+            youtube_cdn_max_connections: proxied audio segments hold a
+                connection while they are streamed to listeners, so Youtube CDN
+                client gets a separate, larger limit
+            youtube_cdn_pool_timeout_seconds: how long audio proxy requests wait
+                for a free Youtube CDN connection
+            proxy: proxy url for Youtube-related clients, which can't be
+                accessed without one from some regions
+        """
+
+        logger.info(
+            "Creating external api http clients. Connections limit per host: %s, "
+            + "Youtube CDN connections limit: %s",
+            connections_limit_per_host,
+            youtube_cdn_max_connections,
+        )
+
+        return ExternalApiHttpClients(
+            soundcloud_api=create_aiohttp_session(
+                connections_limit_per_host, keepalive_timeout_seconds
+            ),
+            youtube_data_api=create_aiohttp_session(
+                connections_limit_per_host, keepalive_timeout_seconds
+            ),
+            imagekit_api=create_aiohttp_session(
+                connections_limit_per_host, keepalive_timeout_seconds
+            ),
+            youtube_internal_api=create_httpx_client(
+                connections_limit_per_host, keepalive_timeout_seconds, proxy
+            ),
+            youtube_cdn=create_httpx_client(
+                youtube_cdn_max_connections,
+                keepalive_timeout_seconds,
+                proxy,
+                pool_timeout_seconds=youtube_cdn_pool_timeout_seconds,
+            ),
+        )
+
+    async def close(self):
+        logger.info("Closing external api http clients")
+
+        await self.soundcloud_api.close()
+        await self.youtube_data_api.close()
+        await self.imagekit_api.close()
+        await self.youtube_internal_api.aclose()
+        await self.youtube_cdn.aclose()
@@ -33,10 +33,17 @@ class ImagekitUploadResponse(BaseModel):
 
 
 class ImagekitApiClient:
-    def __init__(self, private_key: str):
+    def __init__(self, private_key: str, aiohttp_session: aiohttp.ClientSession):
+        """
+        Args:
+            aiohttp_session: shared session which connection pool is reused
+                between requests. Closing it is up to the caller
+        """
+
         self.encoded_private_key = base64.b64encode(
             (private_key + ":").encode()
         ).decode("utf-8")
+        self.aiohttp_session = aiohttp_session
 
     async def upload_image(
         self,
@@ -58,38 +65,34 @@ class ImagekitApiClient:
             "useUniqueFileName": str(append_unique_suffix_to_filename).lower(),
         }
 
-        async with aiohttp.ClientSession(
-            base_url=_IMAGEKIT_API_BASE_URL,
+        async with self.aiohttp_session.post(
+            _IMAGEKIT_API_BASE_URL + "/api/v1/files/upload",
+            data=form_data,
             headers={"Authorization": f"Basic {self.encoded_private_key}"},
-        ) as aiohttp_session:
-            async with aiohttp_session.post(
-                "/api/v1/files/upload", data=form_data
-            ) as response:
-                try:
-                    response_data = await response.json()
-                except json.JSONDecodeError as error:
-                    raise ImagekitApiError(
-                        await response.text(), response.status
-                    ) from error
-
-                if response.status == 400:
-                    logger.error(
-                        "Invalid image uploaded. More info: %s",
-                        response_data["message"],
-                    )
-                    raise ImagekitApiError(
-                        f"Invalid image uploaded. More info: {response_data['message']}",
-                        400,
-                    )
-                elif not response.ok:
-                    logger.error(
-                        "Image upload failed with status code %s", response.status
-                    )
-
-                    raise ImagekitApiError(
-                        "Unexpected error occurred when uploading the image",
-                        response.status,
-                    )
-                else:
-                    response_data = convert_keys_to_snake_case(response_data)
-                    return ImagekitUploadResponse.model_validate(response_data)
+        ) as response:
+            try:
+                response_data = await response.json()
+            except json.JSONDecodeError as error:
+                raise ImagekitApiError(
+                    await response.text(), response.status
+                ) from error
+
+            if response.status == 400:
+                logger.error(
+                    "Invalid image uploaded. More info: %s",
+                    response_data["message"],
+                )
+                raise ImagekitApiError(
+                    f"Invalid image uploaded. More info: {response_data['message']}",
+                    400,
+                )
+            elif not response.ok:
+                logger.error("Image upload failed with status code %s", response.status)
+
+                raise ImagekitApiError(
+                    "Unexpected error occurred when uploading the image",
+                    response.status,
+                )
+            else:
+                response_data = convert_keys_to_snake_case(response_data)
+                return ImagekitUploadResponse.model_validate(response_data)
@@ -1,9 +1,8 @@
+import asyncio
 import logging
-from functools import reduce
 from typing import Optional
 
 import aiohttp
-import httpx
 
 from windchimes.common.api_clients.platform_api_error import PlatformApiError
 from windchimes.common.api_clients.soundcloud.models import (
@@ -11,7 +10,9 @@ from windchimes.common.api_clients.soundcloud.models import (
     SoundcloudTrack,
 )
 from windchimes.common.utils.lists import set_items_order
-from windchimes.core.config import app_config
+
+MAX_SOUNDCLOUD_TRACKS_PER_REQUEST = 50
+"""Soundcloud `/tracks` endpoint ignores ids beyond this limit"""
 
 _SOUNDCLOUD_API_BASE_URL = "https://api-v2.soundcloud.com"
 _NO_REDIRECT_ERROR_MESSAGE = (
@@ -24,7 +25,12 @@ logger = logging.getLogger(__name__)
 
 
 class SoundcloudApiClient:
-    def __init__(self, client_id: str):
+    def __init__(
+        self,
+        client_id: str,
+        aiohttp_session: aiohttp.ClientSession,
+        max_concurrent_tracks_requests: int = 4,
+    ):
         """
         Creates soundcloud api client object for interacting
         with private SoundCloud API v2
@@ -32,39 +38,76 @@ class SoundcloudApiClient:
         Args:
             client_id: API key to use for Soundcloud API access. Can be scraped
                 from soundcloud website
+            aiohttp_session: shared session which connection pool is reused
+                between requests. Closing it is up to the caller
+            max_concurrent_tracks_requests: limits concurrent `/tracks` requests
+                made by this client for long ids lists
         """
 
         self.client_id = client_id
+        self.aiohttp_session = aiohttp_session
+
+        self._tracks_requests_semaphore = asyncio.Semaphore(
+            max_concurrent_tracks_requests
+        )
 
-    async def get_tracks_by_ids(self, ids: list[int]):
+    async def get_tracks_by_ids(
+        self, ids: list[int]
+    ) -> list[Optional[SoundcloudTrack]]:
         """Fetches soundcloud tracks by list of ids
 
+        Ids are split into chunks of `MAX_SOUNDCLOUD_TRACKS_PER_REQUEST`, which are
+        fetched concurrently
+
         Returns:
-            list of tracks in soundcloud's format
+            list of tracks in soundcloud's format in the order of `ids`. Tracks
+            that don't exist (e.g. deleted or private) are returned as `None`
+
+        Raises:
+            PlatformApiError: if some of the requests failed
         """
 
-        async with aiohttp.ClientSession() as aiohttp_session:
-            if len(ids) == 0:
-                return []
+        if len(ids) == 0:
+            return []
 
-            ids_as_strings = [str(track_id) for track_id in ids]
-            comma_separated_ids = reduce(
-                lambda result, id: f"{result},{id}", ids_as_strings
+        unique_ids = list(dict.fromkeys(ids))
+        ids_chunks = [
+            unique_ids[chunk_start : chunk_start + MAX_SOUNDCLOUD_TRACKS_PER_REQUEST]
+            for chunk_start in range(
+                0, len(unique_ids), MAX_SOUNDCLOUD_TRACKS_PER_REQUEST
             )
+        ]
 
-            async with aiohttp_session.get(
-                _SOUNDCLOUD_API_BASE_URL
-                + f"/tracks?ids={comma_separated_ids}"
-                + f"&client_id={self.client_id}"
+        chunks_tracks = await asyncio.gather(
+            *[self._get_tracks_chunk(ids_chunk) for ids_chunk in ids_chunks]
+        )
+
+        # soundcloud skips tracks that can't be found, so the order is restored
+        # with empty places for the missing ones
+        return set_items_order(
+            [track for chunk_tracks in chunks_tracks for track in chunk_tracks],
+            ids,
+            lambda track: track.id,
+        )
+
+    async def _get_tracks_chunk(self, ids: list[int]):
+        comma_separated_ids = ",".join(str(track_id) for track_id in ids)
+
+        async with self._tracks_requests_semaphore:
+            async with self.aiohttp_session.get(
+                _SOUNDCLOUD_API_BASE_URL + "/tracks",
+                params={"ids": comma_separated_ids, "client_id": self.client_id},
             ) as response:
-                return set_items_order(
-                    [
-                        SoundcloudTrack(**track_dict)
-                        for track_dict in await response.json()
-                    ],
-                    ids,
-                    lambda track: track.id,
-                )
+                if not response.ok:
+                    raise PlatformApiError(
+                        "Error occurred on soundcloud api request "
+                        + f"with status code {response.status}"
+                    )
+
+                return [
+                    SoundcloudTrack(**track_dict)
+                    for track_dict in await response.json()
+                ]
 
     async def get_format_data(self, format_url: str) -> dict[str, str]:
         """
@@ -73,12 +116,11 @@ class SoundcloudApiClient:
         Will try to bypass geo restrictions and paywall in the future
         """
 
-        async with aiohttp.ClientSession() as aiohttp_session:
-            async with aiohttp_session.get(
-                format_url, params={"client_id": self.client_id}
-            ) as format_data_response:
-                format_data = await format_data_response.json()
-                return format_data
+        async with self.aiohttp_session.get(
+            format_url, params={"client_id": self.client_id}
+        ) as format_data_response:
+            format_data = await format_data_response.json()
+            return format_data
 
     async def get_playlist_by_url(self, url: str):
         """Fetches playlist data, supports `on.soundcloud.com/..` shortened links
@@ -87,32 +129,31 @@ class SoundcloudApiClient:
             PlatformApiError: if soundcloud api returned an error
         """
 
-        async with aiohttp.ClientSession() as aiohttp_session:
-            if "on.soundcloud.com" in url:
-                async with aiohttp_session.get(url, allow_redirects=False) as response:
-                    redirect_url = response.headers.get("Location")
-                    if redirect_url is None:
-                        logger.error(_NO_REDIRECT_ERROR_MESSAGE)
-                        raise PlatformApiError(_NO_REDIRECT_ERROR_MESSAGE)
+        if "on.soundcloud.com" in url:
+            async with self.aiohttp_session.get(url, allow_redirects=False) as response:
+                redirect_url = response.headers.get("Location")
+                if redirect_url is None:
+                    logger.error(_NO_REDIRECT_ERROR_MESSAGE)
+                    raise PlatformApiError(_NO_REDIRECT_ERROR_MESSAGE)
 
-                    url = str(redirect_url)
+                url = str(redirect_url)
 
-            async with aiohttp_session.get(
-                f"{_SOUNDCLOUD_API_BASE_URL}/resolve?url={url}"
-                + f"&client_id={self.client_id}",
-            ) as response:
-                if not response.ok:
-                    raise PlatformApiError(
-                        "Error occurred on soundcloud api request "
-                        + f"with status code {response.status}"
-                    )
+        async with self.aiohttp_session.get(
+            f"{_SOUNDCLOUD_API_BASE_URL}/resolve?url={url}"
+            + f"&client_id={self.client_id}",
+        ) as response:
+            if not response.ok:
+                raise PlatformApiError(
+                    "Error occurred on soundcloud api request "
+                    + f"with status code {response.status}"
+                )
 
-                response_data = await response.json()
+            response_data = await response.json()
 
-                if response_data["kind"] != "playlist":
-                    return None
+            if response_data["kind"] != "playlist":
+                return None
 
-                return SoundcloudPlaylist(**response_data)
+            return SoundcloudPlaylist(**response_data)
 
     async def get_playlist_by_id(
         self,
@@ -120,33 +161,30 @@ class SoundcloudApiClient:
         artwork_in_highest_quality=False,
         secret_token: Optional[str] = None,
     ):
-        async with httpx.AsyncClient(base_url=_SOUNDCLOUD_API_BASE_URL) as httpx_client:
-            response = await httpx_client.get(
-                f"/playlists/{playlist_id}",
-                params={"client_id": self.client_id, "secret_token": secret_token},
-            )
-
-            try:
-                response.raise_for_status()
-            except httpx.HTTPStatusError as http_status_error:
+        query_params = {"client_id": self.client_id}
+        if secret_token is not None:
+            query_params["secret_token"] = secret_token
+
+        async with self.aiohttp_session.get(
+            f"{_SOUNDCLOUD_API_BASE_URL}/playlists/{playlist_id}",
+            params=query_params,
+        ) as response:
+            if not response.ok:
                 raise PlatformApiError(
                     "Error occurred on soundcloud api request "
-                    + f"with status code {response.status_code}"
-                ) from http_status_error
-
-            soundcloud_playlist = SoundcloudPlaylist(**response.json())
-
-            if (
-                artwork_in_highest_quality
-                and soundcloud_playlist.artwork_url is not None
-            ):
-                soundcloud_playlist.artwork_url = (
-                    self._get_highest_quality_playlist_artwork(
-                        soundcloud_playlist.artwork_url
-                    )
+                    + f"with status code {response.status}"
                 )
 
-            return soundcloud_playlist
+            soundcloud_playlist = SoundcloudPlaylist(**(await response.json()))
+
+        if artwork_in_highest_quality and soundcloud_playlist.artwork_url is not None:
+            soundcloud_playlist.artwork_url = (
+                self._get_highest_quality_playlist_artwork(
+                    soundcloud_playlist.artwork_url
+                )
+            )
+
+        return soundcloud_playlist
 
     def _get_highest_quality_playlist_artwork(self, artwork_url: Optional[str]):
         return (
@@ -166,25 +204,22 @@ class SoundcloudApiClient:
             Maximum of 100 tracks matching the search query
         """
 
-        async with aiohttp.ClientSession(
-            base_url=_SOUNDCLOUD_API_BASE_URL
-        ) as aiohttp_session:
-            async with aiohttp_session.get(
-                f"/search/tracks?q={search_query}"
-                + f"&client_id={self.client_id}&limit={limit}&offset=0"
-            ) as response:
-                if not response.ok:
-                    raise PlatformApiError(
-                        "Error occurred on soundcloud api request "
-                        + f"with status code {response.status}"
-                    )
+        async with self.aiohttp_session.get(
+            f"{_SOUNDCLOUD_API_BASE_URL}/search/tracks?q={search_query}"
+            + f"&client_id={self.client_id}&limit={limit}&offset=0"
+        ) as response:
+            if not response.ok:
+                raise PlatformApiError(
+                    "Error occurred on soundcloud api request "
+                    + f"with status code {response.status}"
+                )
 
-                response_data: dict = await response.json()
+            response_data: dict = await response.json()
 
-                return [
-                    SoundcloudTrack(**track_dict)
-                    for track_dict in response_data["collection"]
-                ]
+            return [
+                SoundcloudTrack(**track_dict)
+                for track_dict in response_data["collection"]
+            ]
 
     async def search_playlists(self, search_query: str):
         """Searches playlists by provided search query
@@ -193,22 +228,19 @@ class SoundcloudApiClient:
             Maximum of 100 playlists matching the search query
         """
 
-        async with aiohttp.ClientSession(
-            base_url=_SOUNDCLOUD_API_BASE_URL
-        ) as aiohttp_session:
-            async with aiohttp_session.get(
-                f"/search/playlists_without_albums?q={search_query}"
-                + f"&client_id={self.client_id}&limit=100&offset=0"
-            ) as response:
-                if not response.ok:
-                    raise PlatformApiError(
-                        "Error occurred on soundcloud api request "
-                        + f"with status code {response.status}"
-                    )
+        async with self.aiohttp_session.get(
+            f"{_SOUNDCLOUD_API_BASE_URL}/search/playlists_without_albums"
+            + f"?q={search_query}&client_id={self.client_id}&limit=100&offset=0"
+        ) as response:
+            if not response.ok:
+                raise PlatformApiError(
+                    "Error occurred on soundcloud api request "
+                    + f"with status code {response.status}"
+                )
 
-                response_data: dict = await response.json()
+            response_data: dict = await response.json()
 
-                return [
-                    SoundcloudPlaylist(**playlist_dict)
-                    for playlist_dict in response_data["collection"]
-                ]
+            return [
+                SoundcloudPlaylist(**playlist_dict)
+                for playlist_dict in response_data["collection"]
+            ]
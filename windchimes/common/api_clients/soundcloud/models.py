@@ -36,4 +36,5 @@ class SoundcloudPlaylist(BaseModel):
     permalink_url: str
     artwork_url: Optional[str]
     secret_token: Optional[str]
+    last_modified: Optional[str] = None
     tracks: list[dict[str, Any]]
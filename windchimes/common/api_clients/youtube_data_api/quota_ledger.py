@@ -0,0 +1,193 @@
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+import logging
+import time
+
+from windchimes.common.api_clients.platform_api_error import PlatformApiError
+
+
+logger = logging.getLogger(__name__)
+
+
+YOUTUBE_DATA_API_QUOTA_COSTS = {
+    "videos": 1,
+    "playlists": 1,
+    "playlistItems": 1,
+    "search": 100,
+}
+"""Quota units spent by a `list` request to each endpoint, including requests
+answered with `304 Not Modified`
+"""
+
+_ROLLING_WINDOW_SECONDS = 24 * 60 * 60
+_BUCKET_SECONDS = 60
+
+
+class YoutubeQuotaPriority(Enum):
+    INTERACTIVE = "INTERACTIVE"
+    """Requests someone waits for, e.g. loading tracks of an opened playlist"""
+
+    BACKGROUND = "BACKGROUND"
+    """Work that can be skipped or done later, e.g. background syncs and search
+    results enrichment. Refused first when the quota runs low
+    """
+
+
+class YoutubeQuotaExceededError(PlatformApiError):
+    def __init__(self, reason: str):
+        super().__init__(f"Youtube Data API request refused: {reason}")
+
+
+@dataclass()
+class YoutubeQuotaMetrics:
+    daily_quota_units: int
+    spent_units: int
+    """Spent during the last 24 hours"""
+
+    remaining_units: int
+    is_cache_only: bool
+
+    interactive_requests_refused: int
+    background_requests_refused: int
+
+
+class YoutubeQuotaLedger:
+    """Accounting of Youtube Data API quota spent by the process during the last
+    24 hours
+
+    Work is refused by priority as the remaining quota goes down: background
+    work stops first, leaving the rest of the quota for interactive requests.
+    When the quota is nearly spent, the ledger switches to cache-only mode, in
+    which all requests are refused and tracks are served only from caches
+
+    The ledger doesn't know about quota spent by other processes using the same
+    key, so it also switches to cache-only mode for a while when the API itself
+    reports the quota as exceeded
+    """
+
+    def __init__(
+        self,
+        daily_quota_units: int,
+        background_min_remaining_units: int,
+        cache_only_min_remaining_units: int,
+        exhausted_cooldown_seconds: float,
+    ):
+        """
+        Args:
+            background_min_remaining_units: background work is refused when
+                less quota than this would remain
+            cache_only_min_remaining_units: all requests are refused when less
+                quota than this would remain
+            exhausted_cooldown_seconds: how long to stay in cache-only mode after
+                the API reported the quota as exceeded
+        """
+
+        self.daily_quota_units = daily_quota_units
+        self.background_min_remaining_units = background_min_remaining_units
+        self.cache_only_min_remaining_units = cache_only_min_remaining_units
+        self.exhausted_cooldown_seconds = exhausted_cooldown_seconds
+
+        # [bucket start monotonic time, units spent during the bucket]
+        self._spent_units_buckets: deque[list[float]] = deque()
+        self._spent_units = 0
+        self._exhausted_until = 0.0
+
+        self._requests_refused = {priority: 0 for priority in YoutubeQuotaPriority}
+
+    @property
+    def remaining_units(self):
+        self._forget_old_buckets()
+
+        return max(self.daily_quota_units - self._spent_units, 0)
+
+    @property
+    def is_cache_only(self):
+        return (
+            time.monotonic() < self._exhausted_until
+            or self.remaining_units <= self.cache_only_min_remaining_units
+        )
+
+    def can_spend(self, units: int, priority: YoutubeQuotaPriority):
+        if self.is_cache_only:
+            return False
+
+        min_remaining_units = (
+            self.background_min_remaining_units
+            if priority == YoutubeQuotaPriority.BACKGROUND
+            else self.cache_only_min_remaining_units
+        )
+
+        return self.remaining_units - units >= min_remaining_units
+
+    def spend(self, units: int, priority: YoutubeQuotaPriority):
+        """Records the units as spent, must be called before each request
+
+        Raises:
+            YoutubeQuotaExceededError: if the request is refused because of its
+                priority or cache-only mode
+        """
+
+        if not self.can_spend(units, priority):
+            self._requests_refused[priority] += 1
+
+            raise YoutubeQuotaExceededError(
+                "cache-only mode"
+                if self.is_cache_only
+                else f"{priority.value.lower()} work is paused, "
+                + f"{self.remaining_units} quota units remaining"
+            )
+
+        now = time.monotonic()
+
+        if (
+            len(self._spent_units_buckets) > 0
+            and now - self._spent_units_buckets[-1][0] < _BUCKET_SECONDS
+        ):
+            self._spent_units_buckets[-1][1] += units
+        else:
+            self._spent_units_buckets.append([now, units])
+
+        self._spent_units += units
+
+    def report_exhausted(self):
+        """Switches to cache-only mode, when the API reported the quota as
+        exceeded
+        """
+
+        logger.warning(
+            "Youtube Data API quota is exceeded, switching to cache-only mode for "
+            + "%s seconds",
+            self.exhausted_cooldown_seconds,
+        )
+
+        self._exhausted_until = time.monotonic() + self.exhausted_cooldown_seconds
+
+    def get_metrics(self):
+        remaining_units = self.remaining_units
+
+        return YoutubeQuotaMetrics(
+            daily_quota_units=self.daily_quota_units,
+            spent_units=self._spent_units,
+            remaining_units=remaining_units,
+            is_cache_only=self.is_cache_only,
+            interactive_requests_refused=self._requests_refused[
+                YoutubeQuotaPriority.INTERACTIVE
+            ],
+            background_requests_refused=self._requests_refused[
+                YoutubeQuotaPriority.BACKGROUND
+            ],
+        )
+
+    def log_metrics(self):
+        logger.info("Youtube Data API quota: %s", self.get_metrics())
+
+    def _forget_old_buckets(self):
+        window_start = time.monotonic() - _ROLLING_WINDOW_SECONDS
+
+        while (
+            len(self._spent_units_buckets) > 0
+            and self._spent_units_buckets[0][0] <= window_start
+        ):
+            _, bucket_units = self._spent_units_buckets.popleft()
+            self._spent_units -= int(bucket_units)
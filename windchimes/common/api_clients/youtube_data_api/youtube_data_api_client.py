@@ -5,18 +5,27 @@ import aiohttp
 from pydantic import BaseModel
 
 from windchimes.common.api_clients.platform_api_error import PlatformApiError
+from windchimes.common.api_clients.youtube_data_api.quota_ledger import (
+    YOUTUBE_DATA_API_QUOTA_COSTS,
+    YoutubeQuotaExceededError,
+    YoutubeQuotaLedger,
+    YoutubeQuotaPriority,
+)
 from windchimes.common.api_clients.youtube_data_api.models import (
     YoutubePlaylist,
     YoutubePlaylistVideo,
     YoutubeVideo,
 )
 from windchimes.common.utils.dictionaries import convert_keys_to_snake_case
+from windchimes.common.utils.lists import set_items_order
 
 
 MAX_YOUTUBE_TRACKS_PER_REQUEST = 50
 
 _YOUTUBE_DATA_API_BASE_URL = "https://www.googleapis.com"
 
+_QUOTA_EXCEEDED_ERROR_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
 
 class YoutubePageInfo(BaseModel):
     total_results: int
@@ -26,55 +35,108 @@ class YoutubePlaylistVideosResult(BaseModel):
     items: list[YoutubePlaylistVideo]
     next_page_token: Optional[str] = None
     page_info: YoutubePageInfo
+    etag: Optional[str] = None
 
 
 class YoutubeDataApiClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        aiohttp_session: aiohttp.ClientSession,
+        quota_ledger: Optional[YoutubeQuotaLedger] = None,
+        quota_priority: YoutubeQuotaPriority = YoutubeQuotaPriority.INTERACTIVE,
+    ):
+        """
+        Args:
+            aiohttp_session: shared session which connection pool is reused
+                between requests. Closing it is up to the caller
+            quota_ledger: shared ledger that records spent quota and refuses
+                requests when it runs low. Quota is not limited if not specified
+            quota_priority: priority of the client requests, unless a request
+                specifies its own one
+        """
+
         self.api_key = api_key
+        self.aiohttp_session = aiohttp_session
+        self.quota_ledger = quota_ledger
+        self.quota_priority = quota_priority
+
+        self.quota_units_spent = 0
+        """Youtube Data API quota spent by requests of this client"""
+
+    async def get_videos_by_ids(
+        self, ids: list[str], quota_priority: Optional[YoutubeQuotaPriority] = None
+    ) -> list[Optional[YoutubeVideo]]:
+        """Fetches youtube videos by list of ids
+
+        Returns:
+            list of videos in the order of `ids`. Videos that don't exist
+            (e.g. deleted or private) are returned as `None`
+
+        Raises:
+            YoutubeQuotaExceededError: if the request is refused to save quota
+        """
 
-    async def get_videos_by_ids(self, ids: list[str]) -> list[Optional[YoutubeVideo]]:
         if len(ids) == 0:
             return []
 
         comma_separated_ids = reduce(lambda result, id: f"{result},{id}", ids)
 
-        async with aiohttp.ClientSession(
-            base_url=_YOUTUBE_DATA_API_BASE_URL
-        ) as aiohttp_session:
-            async with aiohttp_session.get(
-                f"/youtube/v3/videos?id={comma_separated_ids}"
-                + f"&key={self.api_key}&part=snippet,contentDetails"
-            ) as response:
-                raw_videos = (await response.json())["items"]
+        self._spend_quota("videos", quota_priority)
+
+        async with self.aiohttp_session.get(
+            f"{_YOUTUBE_DATA_API_BASE_URL}/youtube/v3/videos?id={comma_separated_ids}"
+            + f"&key={self.api_key}&part=snippet,contentDetails"
+        ) as response:
+            await self._raise_for_error_response(response)
 
-                return [
+            raw_videos = (await response.json())["items"]
+
+            # youtube skips videos that can't be found, so the order is restored
+            # with empty places for the missing ones
+            return set_items_order(
+                [
                     YoutubeVideo(**convert_keys_to_snake_case(raw_video))
                     for raw_video in raw_videos
-                ]
+                ],
+                ids,
+                lambda video: video.id,
+            )
 
     async def get_playlist_by_id(self, playlist_id: str):
-        async with aiohttp.ClientSession(
-            base_url=_YOUTUBE_DATA_API_BASE_URL
-        ) as aiohttp_session:
-            async with aiohttp_session.get(
-                f"/youtube/v3/playlists?id={playlist_id}"
-                + f"&key={self.api_key}&part=snippet,contentDetails,id"
-            ) as response:
-                raw_playlists = (await response.json())["items"]
+        self._spend_quota("playlists")
+
+        async with self.aiohttp_session.get(
+            f"{_YOUTUBE_DATA_API_BASE_URL}/youtube/v3/playlists?id={playlist_id}"
+            + f"&key={self.api_key}&part=snippet,contentDetails,id"
+        ) as response:
+            await self._raise_for_error_response(response)
+
+            raw_playlists = (await response.json())["items"]
 
-                if len(raw_playlists) == 0:
-                    return None
+            if len(raw_playlists) == 0:
+                return None
 
-                return YoutubePlaylist(**convert_keys_to_snake_case(raw_playlists[0]))
+            return YoutubePlaylist(**convert_keys_to_snake_case(raw_playlists[0]))
 
     async def get_playlist_videos_portion(
-        self, playlist_id: str, next_page_token: Optional[str] = None
-    ) -> YoutubePlaylistVideosResult:
+        self,
+        playlist_id: str,
+        next_page_token: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> Optional[YoutubePlaylistVideosResult]:
         """fetches 50 videos (first 50 by default) from a playlist
 
         Args:
             next_page_token: token that can be used to fetch another portion of
                 tracks. can be obtained after request of the first portion
+            if_none_match: `etag` of the previously fetched portion
+
+        Returns:
+            `None` if the portion didn't change since `if_none_match` etag
+
+        Raises:
+            YoutubeQuotaExceededError: if the request is refused to save quota
         """
 
         query_params = {
@@ -86,23 +148,60 @@ class YoutubeDataApiClient:
         if next_page_token is not None:
             query_params["page_token"] = next_page_token
 
-        async with aiohttp.ClientSession(
-            base_url=_YOUTUBE_DATA_API_BASE_URL
-        ) as aiohttp_session:
-            async with aiohttp_session.get(
-                "/youtube/v3/playlistItems",
-                params=query_params,
-            ) as response:
-                if not response.ok:
-                    raise PlatformApiError(
-                        "Error occurred on youtube api request "
-                        + f"with status code {response.status}"
-                    )
-
-                response_data = convert_keys_to_snake_case(await response.json())
-                response_data["items"] = [
-                    YoutubePlaylistVideo(**video_dict)
-                    for video_dict in response_data["items"]
-                ]
-
-                return YoutubePlaylistVideosResult(**response_data)
+        headers = {}
+        if if_none_match is not None:
+            headers["If-None-Match"] = if_none_match
+
+        self._spend_quota("playlistItems")
+
+        async with self.aiohttp_session.get(
+            f"{_YOUTUBE_DATA_API_BASE_URL}/youtube/v3/playlistItems",
+            params=query_params,
+            headers=headers,
+        ) as response:
+            if response.status == 304:
+                return None
+
+            await self._raise_for_error_response(response)
+
+            response_data = convert_keys_to_snake_case(await response.json())
+            response_data["items"] = [
+                YoutubePlaylistVideo(**video_dict)
+                for video_dict in response_data["items"]
+            ]
+
+            return YoutubePlaylistVideosResult(**response_data)
+
+    def _spend_quota(
+        self, endpoint: str, quota_priority: Optional[YoutubeQuotaPriority] = None
+    ):
+        units = YOUTUBE_DATA_API_QUOTA_COSTS[endpoint]
+
+        if self.quota_ledger is not None:
+            self.quota_ledger.spend(units, quota_priority or self.quota_priority)
+
+        self.quota_units_spent += units
+
+    async def _raise_for_error_response(self, response: aiohttp.ClientResponse):
+        if response.ok:
+            return
+
+        if response.status == 403:
+            try:
+                error_reasons = {
+                    error["reason"]
+                    for error in (await response.json())["error"]["errors"]
+                }
+            except (aiohttp.ContentTypeError, KeyError, TypeError):
+                error_reasons = set()
+
+            if len(error_reasons & _QUOTA_EXCEEDED_ERROR_REASONS) > 0:
+                if self.quota_ledger is not None:
+                    self.quota_ledger.report_exhausted()
+
+                raise YoutubeQuotaExceededError("quota is exceeded")
+
+        raise PlatformApiError(
+            "Error occurred on youtube api request "
+            + f"with status code {response.status}"
+        )
@@ -1,11 +1,17 @@
-import asyncio
 import logging
 from typing import Optional
 
 import httpx
 from pydantic import BaseModel, ValidationError
-import yt_dlp
 
+from windchimes.common.api_clients.youtube_internal_api.yt_dlp_extraction_pool import (
+    YtDlpExtractionPool,
+    YtDlpExtractionPoolOverloadedError,
+    YtDlpExtractionTimeoutError,
+)
+from windchimes.common.api_clients.youtube_internal_api.yt_dlp_worker import (
+    YtDlpExtractionError,
+)
 from windchimes.common.utils.user_agent import WINDOWS_CHROME_USER_AGENT
 
 
@@ -39,7 +45,23 @@ class YoutubeInternalApiError(Exception):
 
 
 class YoutubeInternalApiClient:
-    def __init__(self, socks_proxy_url: Optional[str] = None):
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        yt_dlp_extraction_pool: YtDlpExtractionPool,
+        socks_proxy_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            httpx_client: shared client which connection pool is reused between
+                requests. Must be configured with the same proxy as
+                `socks_proxy_url`. Closing it is up to the caller
+            yt_dlp_extraction_pool: started pool, shared between requests
+            socks_proxy_url: proxy for yt-dlp video info extraction
+        """
+
+        self.httpx_client = httpx_client
+        self.yt_dlp_extraction_pool = yt_dlp_extraction_pool
         self.socks_proxy_url = socks_proxy_url
 
     async def search_videos_and_get_ids(self, search_query: str) -> list[str]:
@@ -84,31 +106,26 @@ class YoutubeInternalApiClient:
         }
 
         try:
-            async with httpx.AsyncClient(
-                proxy=self.socks_proxy_url, base_url=_YOUTUBE_INTERNAL_API_BASE_URL
-            ) as httpx_client:
-                response = await httpx_client.post(
-                    url="/search?prettyPrint=false",
-                    headers=headers,
-                    json=body,
-                    timeout=10,
-                )
+            response = await self.httpx_client.post(
+                url=f"{_YOUTUBE_INTERNAL_API_BASE_URL}/search?prettyPrint=false",
+                headers=headers,
+                json=body,
+                timeout=10,
+            )
 
-                response.raise_for_status()
+            response.raise_for_status()
 
-                data = response.json()
+            data = response.json()
 
-                renderers = data["contents"]["twoColumnSearchResultsRenderer"][
-                    "primaryContents"
-                ]["sectionListRenderer"]["contents"][0]["itemSectionRenderer"][
-                    "contents"
-                ]
+            renderers = data["contents"]["twoColumnSearchResultsRenderer"][
+                "primaryContents"
+            ]["sectionListRenderer"]["contents"][0]["itemSectionRenderer"]["contents"]
 
-                return [
-                    renderer["videoRenderer"]["videoId"]
-                    for renderer in renderers
-                    if "videoRenderer" in renderer
-                ]
+            return [
+                renderer["videoRenderer"]["videoId"]
+                for renderer in renderers
+                if "videoRenderer" in renderer
+            ]
         except httpx.HTTPStatusError as http_status_error:
             raise YoutubeInternalApiError(
                 status_code=http_status_error.response.status_code,
@@ -118,13 +135,10 @@ class YoutubeInternalApiClient:
             raise YoutubeInternalApiError(more_info=str(http_error)) from http_error
 
     async def fetch_video_download_url(self, video_url: str):
-        def fetch_info():
-            with yt_dlp.YoutubeDL({"proxy": self.socks_proxy_url}) as youtube_dl:
-                return youtube_dl.extract_info(video_url, download=False)
-
         try:
-            loop = asyncio.get_running_loop()
-            video_info_dict = await loop.run_in_executor(None, fetch_info)
+            video_info_dict = await self.yt_dlp_extraction_pool.extract_video_info(
+                video_url, self.socks_proxy_url
+            )
 
             if video_info_dict is None:
                 return None
@@ -148,7 +162,14 @@ class YoutubeInternalApiClient:
             raise YoutubeInternalApiError(
                 more_info=f"Youtube video info validation failed: {validation_error}"
             ) from validation_error
-        except yt_dlp.DownloadError as yt_dlp_error:
+        except YtDlpExtractionError as yt_dlp_error:
             raise YoutubeInternalApiError(
                 more_info=f"Failed to extract YT video info: {yt_dlp_error}"
             ) from yt_dlp_error
+        except (
+            YtDlpExtractionPoolOverloadedError,
+            YtDlpExtractionTimeoutError,
+        ) as extraction_pool_error:
+            raise YoutubeInternalApiError(
+                more_info=str(extraction_pool_error)
+            ) from extraction_pool_error
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from windchimes.common.api_clients.youtube_internal_api import yt_dlp_worker
+
+
+logger = logging.getLogger(__name__)
+
+
+class YtDlpExtractionPoolOverloadedError(Exception):
+    def __init__(self, max_jobs_count: int):
+        super().__init__(
+            f"yt-dlp extraction pool is overloaded: {max_jobs_count} jobs are "
+            + "already running or queued"
+        )
+
+
+class YtDlpExtractionTimeoutError(Exception):
+    def __init__(self, timeout_seconds: float):
+        super().__init__(f"yt-dlp extraction did not finish in {timeout_seconds}s")
+
+
+@dataclass()
+class YtDlpExtractionPoolMetrics:
+    jobs_in_progress: int = 0
+    """Jobs that are running or waiting for a free worker, including ones
+    their callers stopped waiting for
+    """
+
+    jobs_completed: int = 0
+    jobs_failed: int = 0
+    jobs_rejected: int = 0
+    jobs_timed_out: int = 0
+    jobs_cancelled: int = 0
+
+    total_queue_wait_seconds: float = 0
+    total_extraction_seconds: float = 0
+
+
+def _get_workers_context():
+    """Workers are not forked from the app process, forking a process with
+    running event loop and threads is unsafe
+
+    They are forked from a fork server that imported only the worker module,
+    so starting (and restarting after a crash) a worker doesn't import yt-dlp
+    again. The app main module is still imported by each worker, unless it's a
+    package `__main__` module, see `windchimes.api.__main__`. Workers are
+    spawned where fork server is not available
+    """
+
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+
+    workers_context = multiprocessing.get_context("forkserver")
+    workers_context.set_forkserver_preload([yt_dlp_worker.__name__])
+
+    return workers_context
+
+
+class YtDlpExtractionPool:
+    """Dedicated process pool for yt-dlp video info extraction
+
+    yt-dlp parsing is CPU-heavy python code, so running it in threads blocks
+    the event loop because of GIL. Pool must be started once on app startup
+    with `start` and reused
+    """
+
+    def __init__(
+        self, max_workers: int, max_queued_jobs: int, job_timeout_seconds: float
+    ):
+        """
+        Args:
+            max_queued_jobs: how many jobs can wait for a free worker. Jobs
+                beyond that are rejected immediately
+            job_timeout_seconds: how long to wait for a job result, including
+                time spent in the queue
+        """
+
+        self.max_workers = max_workers
+        self.max_queued_jobs = max_queued_jobs
+        self.job_timeout_seconds = job_timeout_seconds
+
+        self.metrics = YtDlpExtractionPoolMetrics()
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        logger.info("Starting yt-dlp extraction pool with %s workers", self.max_workers)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=_get_workers_context()
+        )
+
+    def close(self):
+        if self._executor is not None:
+            logger.info("Shutting down yt-dlp extraction pool")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _restart_broken_executor(self, broken_executor: ProcessPoolExecutor):
+        # a worker crash (e.g. OOM kill) makes the whole executor unusable.
+        # Jobs failed together restart it only once
+        if self._executor is broken_executor:
+            logger.error("yt-dlp extraction pool is broken, restarting it")
+            self.close()
+            self.start()
+
+    def _release_job_slot(self):
+        self.metrics.jobs_in_progress -= 1
+
+    def _call_soon_threadsafe(self, loop: asyncio.AbstractEventLoop, callback):
+        """Job future callbacks run in the executor thread, so the metrics are
+        changed in the event loop thread instead
+        """
+
+        try:
+            loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # the loop is closed on shutdown, nobody reads the metrics anymore
+            pass
+
+    async def extract_video_info(
+        self, video_url: str, proxy_url: Optional[str] = None
+    ) -> Optional[dict[str, Any]]:
+        """Extracts video info with yt-dlp in a worker process
+
+        Cancelling the call removes the job from the queue if it hasn't
+        started yet
+
+        Raises:
+            YtDlpExtractionError: if yt-dlp failed to extract the info
+            YtDlpExtractionPoolOverloadedError: if queue is full
+            YtDlpExtractionTimeoutError: if job didn't finish in time
+        """
+
+        executor = self._executor
+
+        if executor is None:
+            raise RuntimeError("yt-dlp extraction pool is not started")
+
+        max_jobs_count = self.max_workers + self.max_queued_jobs
+
+        if self.metrics.jobs_in_progress >= max_jobs_count:
+            self.metrics.jobs_rejected += 1
+            raise YtDlpExtractionPoolOverloadedError(max_jobs_count)
+
+        loop = asyncio.get_running_loop()
+        start_time_seconds = time.perf_counter()
+
+        job_future = executor.submit(
+            yt_dlp_worker.extract_video_info, video_url, proxy_url
+        )
+
+        # a job that timed out or was cancelled keeps its worker busy until it
+        # finishes, so its slot is freed only when the worker is done with it
+        self.metrics.jobs_in_progress += 1
+        job_future.add_done_callback(
+            lambda _: self._call_soon_threadsafe(loop, self._release_job_slot)
+        )
+
+        try:
+            # cancellation is passed to the job future, which removes the job
+            # from the queue if it hasn't started yet
+            video_info_dict, extraction_seconds = await asyncio.wait_for(
+                asyncio.wrap_future(job_future, loop=loop),
+                timeout=self.job_timeout_seconds,
+            )
+        except asyncio.TimeoutError as timeout_error:
+            self.metrics.jobs_timed_out += 1
+            raise YtDlpExtractionTimeoutError(
+                self.job_timeout_seconds
+            ) from timeout_error
+        except asyncio.CancelledError:
+            self.metrics.jobs_cancelled += 1
+            raise
+        except BrokenProcessPool:
+            self.metrics.jobs_failed += 1
+            self._restart_broken_executor(executor)
+            raise
+        except Exception:
+            self.metrics.jobs_failed += 1
+            raise
+
+        total_seconds = time.perf_counter() - start_time_seconds
+        queue_wait_seconds = max(total_seconds - extraction_seconds, 0)
+
+        self.metrics.jobs_completed += 1
+        self.metrics.total_queue_wait_seconds += queue_wait_seconds
+        self.metrics.total_extraction_seconds += extraction_seconds
+
+        logger.info(
+            "Extracted yt video info. Queue wait: %.3fs, extraction: %.3fs, "
+            + "jobs in progress: %s",
+            queue_wait_seconds,
+            extraction_seconds,
+            self.metrics.jobs_in_progress,
+        )
+
+        return video_info_dict
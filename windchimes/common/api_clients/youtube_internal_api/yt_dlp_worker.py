@@ -0,0 +1,57 @@
+"""Code that runs in yt-dlp extraction pool workers
+
+Imports only yt-dlp, so workers start fast and don't need the app config
+"""
+
+import time
+from typing import Optional
+
+import yt_dlp
+import yt_dlp.utils
+
+
+class YtDlpExtractionError(Exception):
+    """yt-dlp failed to extract video info
+
+    Raised instead of yt-dlp own errors, which can't be passed between
+    processes
+    """
+
+    pass
+
+
+def extract_video_info(video_url: str, proxy_url: Optional[str]):
+    """
+    Returns:
+        Tuple of video info (only fields the app uses, to keep inter-process
+        transfer cheap) and extraction duration in seconds
+    """
+
+    start_time_seconds = time.perf_counter()
+
+    try:
+        with yt_dlp.YoutubeDL({"proxy": proxy_url}) as youtube_dl:
+            video_info_dict = youtube_dl.extract_info(video_url, download=False)
+    except yt_dlp.utils.YoutubeDLError as yt_dlp_error:
+        raise YtDlpExtractionError(str(yt_dlp_error)) from None
+
+    extraction_seconds = time.perf_counter() - start_time_seconds
+
+    if video_info_dict is None:
+        return None, extraction_seconds
+
+    requested_formats = video_info_dict.get("requested_formats")
+
+    return {
+        "requested_formats": (
+            [
+                {
+                    "url": requested_format.get("url"),
+                    "audio_ext": requested_format.get("audio_ext"),
+                }
+                for requested_format in requested_formats
+            ]
+            if requested_formats is not None
+            else None
+        )
+    }, extraction_seconds
@@ -0,0 +1,81 @@
+import re
+
+
+_TIME_DURATION_PATTERN = re.compile(r"PT(?=\d)(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?")
+"""Whole hours, minutes and seconds, the format of almost all Youtube videos
+durations. Matched first, as it's cheaper than the full format
+"""
+
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+
+_ISO_8601_DURATION_PATTERN = re.compile(
+    # at least one component after `P` and after `T`
+    rf"P(?!$)(?:{_NUMBER}Y)?(?:{_NUMBER}M)?(?:{_NUMBER}W)?(?:{_NUMBER}D)?"
+    + rf"(?:T(?=\d)(?:{_NUMBER}H)?(?:{_NUMBER}M)?(?:{_NUMBER}S)?)?"
+)
+
+_COMPONENTS_SECONDS = (
+    365 * 24 * 60 * 60,
+    30 * 24 * 60 * 60,
+    7 * 24 * 60 * 60,
+    24 * 60 * 60,
+    60 * 60,
+    60,
+    1,
+)
+"""Seconds in years, months, weeks, days, hours, minutes and seconds of the
+duration, in the order of the pattern groups. Years and months have nominal
+lengths, since the duration is not anchored to a date
+"""
+
+
+def parse_iso8601_duration(duration: str) -> float:
+    """Converts ISO 8601 duration in the designator format (e.g. `PT1H2M3S`,
+    `P1DT2H`, `PT0.5S`, the one Youtube uses) to seconds
+
+    Every component is supported, including days, weeks, components of any
+    length (e.g. `PT150M`) and a decimal fraction of the smallest component
+
+    Raises:
+        ValueError: if the duration is not in the designator format
+    """
+
+    time_match = _TIME_DURATION_PATTERN.fullmatch(duration)
+
+    if time_match is not None:
+        hours, minutes, seconds = time_match.groups()
+
+        return (
+            (int(hours) * 3600 if hours else 0)
+            + (int(minutes) * 60 if minutes else 0)
+            + (int(seconds) if seconds else 0)
+        )
+
+    match = _ISO_8601_DURATION_PATTERN.fullmatch(duration)
+
+    if match is None:
+        raise ValueError(f"Invalid ISO 8601 duration: {duration}")
+
+    present_components = [
+        (component, component_seconds)
+        for component, component_seconds in zip(match.groups(), _COMPONENTS_SECONDS)
+        if component is not None
+    ]
+
+    if any(
+        "." in component or "," in component for component, _ in present_components[:-1]
+    ):
+        raise ValueError(
+            f"Invalid ISO 8601 duration: {duration}, only the smallest component "
+            + "can have a fraction"
+        )
+
+    return sum(
+        (
+            float(component.replace(",", "."))
+            if "." in component or "," in component
+            else int(component)
+        )
+        * component_seconds
+        for component, component_seconds in present_components
+    )
@@ -1,7 +1,8 @@
-from typing import Any, Callable, Iterable, TypeVar
+from typing import Any, Callable, Hashable, Iterable, Sequence, TypeVar
 
 
 ItemT = TypeVar("ItemT")
+KeyT = TypeVar("KeyT", bound=Hashable)
 
 
 def find_item(iterable: Iterable[ItemT], is_needed_item: Callable[[ItemT], bool]):
@@ -12,18 +13,43 @@ def find_item(iterable: Iterable[ItemT], is_needed_item: Callable[[ItemT], bool]
     return None
 
 
+def index_items(
+    items: Iterable[ItemT], get_item_key: Callable[[ItemT], KeyT]
+) -> dict[KeyT, ItemT]:
+    """builds a dictionary for O(1) item lookups by key
+
+    If several items have the same key, the first one is kept, just like
+    `find_item` would return it
+    """
+
+    items_by_key: dict[KeyT, ItemT] = {}
+
+    for item in items:
+        items_by_key.setdefault(get_item_key(item), item)
+
+    return items_by_key
+
+
 def set_items_order(
-    items: list[ItemT], keys_in_needed_order: list, get_item_key: Callable[[ItemT], Any]
+    items: Sequence[ItemT],
+    keys_in_needed_order: Sequence,
+    get_item_key: Callable[[ItemT], Any],
 ):
     """reorders the list to match the order of provided keys list
 
+    Runs in O(n) time by indexing items by key first
+
     Args:
-        keys_in_needed_order: list of unique keys that reference items in target list
+        keys_in_needed_order: list of keys that reference items in target list.
+            A key can be repeated, each occurrence gets the same item
         get_item_key: function that returns unique item key that can be matched with
             a key in `keys_in_needed_order` param
+
+    Returns:
+        list of items with the same length as `keys_in_needed_order`. Keys that
+        don't match any item get `None` in their place
     """
 
-    return [
-        find_item(items, lambda item: get_item_key(item) == key)
-        for key in keys_in_needed_order
-    ]
+    items_by_key = index_items(items, get_item_key)
+
+    return [items_by_key.get(key) for key in keys_in_needed_order]
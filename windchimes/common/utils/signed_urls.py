@@ -0,0 +1,54 @@
+import base64
+import binascii
+import json
+import re
+import urllib.parse
+from typing import Optional
+
+
+_EXPIRE_PATH_SEGMENT_PATTERN = re.compile(r"/expire/(\d+)(?:/|$)")
+
+_CLOUDFRONT_BASE64_TRANSLATION = str.maketrans({"-": "+", "_": "=", "~": "/"})
+
+
+def get_signed_url_expiration_timestamp(url: str) -> Optional[int]:
+    """Finds out when the signed url expires from the url itself
+
+    Supported formats:
+        - `expire` or `Expires` query param (Youtube CDN, S3, CloudFront)
+        - `/expire/TIMESTAMP/` path segment (Youtube manifests)
+        - `Policy` query param of CloudFront signed urls (Soundcloud CDN)
+
+    Returns:
+        Unix timestamp of the expiration or `None` if url doesn't contain it
+    """
+
+    parsed_url = urllib.parse.urlparse(url)
+    query_params = urllib.parse.parse_qs(parsed_url.query)
+
+    for param_name in ("expire", "Expires"):
+        param_values = query_params.get(param_name)
+
+        if param_values is not None and param_values[0].isdigit():
+            return int(param_values[0])
+
+    expire_path_segment_match = _EXPIRE_PATH_SEGMENT_PATTERN.search(parsed_url.path)
+    if expire_path_segment_match is not None:
+        return int(expire_path_segment_match.group(1))
+
+    policy_values = query_params.get("Policy")
+    if policy_values is not None:
+        return _get_cloudfront_policy_expiration_timestamp(policy_values[0])
+
+    return None
+
+
+def _get_cloudfront_policy_expiration_timestamp(encoded_policy: str):
+    try:
+        policy = json.loads(
+            base64.b64decode(encoded_policy.translate(_CLOUDFRONT_BASE64_TRANSLATION))
+        )
+
+        return int(policy["Statement"][0]["Condition"]["DateLessThan"]["AWS:EpochTime"])
+    except (binascii.Error, ValueError, KeyError, IndexError, TypeError):
+        return None
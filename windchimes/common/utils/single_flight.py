@@ -0,0 +1,61 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+ResultT = TypeVar("ResultT")
+
+
+class _InFlightCall(Generic[ResultT]):
+    def __init__(self, task: "asyncio.Future[ResultT]"):
+        self.task = task
+        self.waiters_count = 0
+
+
+class SingleFlight(Generic[ResultT]):
+    """Coalesces concurrent identical calls into one
+
+    While a call with some key is in flight, other callers with the same key
+    don't start their own call, but wait for the result of the running one.
+    Results are not stored after the call completes
+
+    Cancellation of one caller doesn't affect the others. The shared call is
+    cancelled only when all of its callers are cancelled
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _InFlightCall[ResultT]] = {}
+
+    async def run(
+        self, key: Hashable, create_call: Callable[[], Awaitable[ResultT]]
+    ) -> ResultT:
+        """Runs the call or joins the one already running with the same key
+
+        Args:
+            create_call: function that starts the call. Isn't invoked if a call
+                with the same key is already running
+        """
+
+        call = self._calls.get(key)
+
+        if call is None:
+            call = _InFlightCall(asyncio.ensure_future(create_call()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters_count += 1
+
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters_count == 1 and not call.task.done():
+                # nobody else needs the result
+                self._forget(key, call)
+                call.task.cancel()
+
+            raise
+        finally:
+            call.waiters_count -= 1
+
+    def _forget(self, key: Hashable, call: _InFlightCall[ResultT]):
+        if self._calls.get(key) is call:
+            del self._calls[key]
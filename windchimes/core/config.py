@@ -1,5 +1,6 @@
 import logging
 import os
+import tempfile
 from typing import Literal, Optional
 
 from pydantic import BaseModel, AnyUrl
@@ -15,7 +16,40 @@ logger = logging.getLogger()
 
 class DatabaseSettings(BaseModel):
     url: AnyUrl
-    echo: bool = True
+
+    echo: bool = False
+    """Logs every executed statement, slows down the app noticeably"""
+
+    pool_size: int = 10
+    """Connections kept open by each app process. Processes count multiplied by
+    `pool_size + max_overflow` must fit into Postgres `max_connections`
+    """
+
+    max_overflow: int = 10
+    """Extra connections opened under load and closed when returned"""
+
+    pool_timeout_seconds: float = 30
+    """How long to wait for a free connection before failing"""
+
+    pool_pre_ping: bool = True
+    """Checks connections before use, so ones dropped by the server or a proxy
+    are replaced instead of failing the request
+    """
+
+    pool_recycle_seconds: Optional[float] = 30 * 60
+
+    prepared_statement_cache_size: int = 100
+    """asyncpg prepared statements cache per connection. Must be `0` when
+    connecting through PgBouncer in transaction pooling mode
+    """
+
+    statement_timeout_seconds: Optional[float] = 30
+    """Server-side limit for a single statement"""
+
+    pool_warmup_connections: int = 2
+    """Connections opened on startup, so first requests don't pay for it"""
+
+    pool_metrics_log_interval_seconds: Optional[float] = 5 * 60
 
 
 class Auth0Settings(BaseModel):
@@ -28,6 +62,44 @@ class Auth0Settings(BaseModel):
 class YoutubeDataApiSettings(BaseModel):
     key: str
 
+    load_tracks_timeout_seconds: float = 5
+    """Timeout for loading youtube tracks
+
+    When exceeded, the tracks are returned as not available (`None`)
+    """
+
+    max_playlist_pages: int = 40
+    """Max pages of 50 videos fetched from a playlist on user requests (import,
+    viewing). Each page costs a unit of quota
+    """
+
+    max_linked_playlist_pages: int = 200
+    """Max pages of 50 videos fetched from a playlist linked for sync, by both
+    user-requested and background syncs. They must use the same cap, otherwise
+    a sync with a lower cap deletes the tracks the other one added past it
+    """
+
+    daily_quota_units: int = 10_000
+    """Quota of the key per day, spending is tracked over the last 24 hours"""
+
+    background_min_remaining_quota_units: int = 3_000
+    """Background syncs and search results loading are paused when less quota
+    than this would remain, leaving it for interactive requests
+    """
+
+    cache_only_min_remaining_quota_units: int = 500
+    """All requests are refused when less quota than this would remain, tracks
+    are served only from the cache then
+    """
+
+    quota_exhausted_cooldown_seconds: float = 60 * 60
+    """How long to serve tracks only from the cache after the API reported the
+    quota as exceeded (e.g. spent by other processes)
+    """
+
+    quota_metrics_log_interval_seconds: Optional[float] = 5 * 60
+    """`None` disables logging of the quota metrics"""
+
 
 class SoundcloudApiSettings(BaseModel):
     fallback_client_id: str = ""
@@ -36,6 +108,15 @@ class SoundcloudApiSettings(BaseModel):
     Used when scraping it automatically does not work
     """
 
+    load_tracks_timeout_seconds: float = 5
+    """Timeout for loading soundcloud tracks
+
+    When exceeded, the tracks are returned as not available (`None`)
+    """
+
+    max_concurrent_tracks_requests: int = 4
+    """Long track lists are loaded in chunks, this many chunks at once"""
+
 
 class ImagekitApiSettings(BaseModel):
     private_key: str
@@ -45,6 +126,129 @@ class ProxySettings(BaseModel):
     url: Optional[str] = None
 
 
+class HttpClientsSettings(BaseModel):
+    """Connection pool settings of HTTP clients used for external APIs access"""
+
+    connections_limit_per_host: int = 20
+    """Limit of connections to each host. httpx clients don't have per-host
+    limits, so for them it's the limit of all connections of the client
+    """
+
+    keepalive_timeout_seconds: float = 30
+
+    youtube_cdn_max_connections: int = 200
+    """Limit of all connections of the audio proxy to Youtube CDN. Each proxied
+    segment holds a connection until it's streamed to the listener, so it's
+    sized by concurrent listeners, not by request rate
+    """
+
+    youtube_cdn_pool_timeout_seconds: float = 30
+    """How long audio proxy requests wait for a free Youtube CDN connection
+    when all of them are in use
+    """
+
+
+class LoadedTracksCacheSettings(BaseModel):
+    backend: Literal["MEMORY", "DATABASE", "DISABLED"] = "MEMORY"
+    """Where to store the cache
+
+    `MEMORY` cache is local to each app process, `DATABASE` cache is shared
+    between all of them
+    """
+
+    soundcloud_ttl_seconds: float = 6 * 60 * 60
+    youtube_ttl_seconds: float = 6 * 60 * 60
+
+    not_available_track_ttl_seconds: float = 5 * 60
+    """How long to remember that the track is deleted or unavailable"""
+
+    max_memory_bytes: int = 64 * 1024 * 1024
+    """Approximate memory limit for `MEMORY` backend"""
+
+
+class AudioFileUrlsCacheSettings(BaseModel):
+    enabled: bool = True
+
+    default_ttl_seconds: float = 10 * 60
+    """How long to store urls that don't specify their expiration time"""
+
+    expiration_margin_seconds: float = 5 * 60
+    """Urls are dropped from the cache this much time before they expire"""
+
+    max_entries: int = 10_000
+
+
+class HlsDiskCacheSettings(BaseModel):
+    """Disk cache of Youtube HLS segments and manifests passed through the audio
+    proxy
+    """
+
+    enabled: bool = True
+
+    directory: str = os.path.join(tempfile.gettempdir(), "windchimes-hls-cache")
+    """Can be shared by multiple app processes on the same machine"""
+
+    max_size_bytes: int = 1024 * 1024 * 1024
+
+    manifest_max_ttl_seconds: float = 60 * 60
+
+    manifest_expiration_margin_seconds: float = 5 * 60
+    """Manifests are dropped this much time before their urls expire"""
+
+
+class HlsPrefetchSettings(BaseModel):
+    """Background download of upcoming HLS segments into the disk cache
+
+    Works only when `HlsDiskCacheSettings.enabled` is set
+    """
+
+    enabled: bool = True
+
+    segments_count: int = 3
+    """How many segments after the requested one to prefetch"""
+
+    max_concurrent_requests_per_stream: int = 2
+
+    listener_idle_timeout_seconds: float = 60
+    """Prefetching stops when stream segments are not requested for this long"""
+
+
+class YtDlpSettings(BaseModel):
+    """Settings of the process pool for Youtube videos info extraction"""
+
+    max_workers: int = 2
+
+    max_queued_jobs: int = 32
+    """Extraction requests beyond this limit fail immediately instead of waiting"""
+
+    job_timeout_seconds: float = 30
+    """Includes time spent waiting for a free worker"""
+
+
+class TracksAutoSyncSettings(BaseModel):
+    """Background sync of playlists linked to external ones"""
+
+    enabled: bool = True
+
+    interval_seconds: float = 5 * 60
+    """How often to look for stale playlists"""
+
+    stale_after_seconds: float = 6 * 60 * 60
+    """Playlist is synced when it wasn't synced for this long"""
+
+    batch_size: int = 20
+    """Max playlists synced in one run"""
+
+    max_concurrent_syncs: int = 4
+
+    min_seconds_between_soundcloud_syncs: float = 1
+
+    min_seconds_between_youtube_syncs: float = 2
+    """Each sync spends Youtube Data API quota, so it's spaced out more"""
+
+    max_jitter_seconds: float = 10
+
+
 class AppConfig(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=ENV_FILE_PATH,
@@ -70,6 +274,20 @@ class AppConfig(BaseSettings):
 
     proxy: ProxySettings = ProxySettings()
 
+    http_clients: HttpClientsSettings = HttpClientsSettings()
+
+    loaded_tracks_cache: LoadedTracksCacheSettings = LoadedTracksCacheSettings()
+
+    audio_file_urls_cache: AudioFileUrlsCacheSettings = AudioFileUrlsCacheSettings()
+
+    yt_dlp: YtDlpSettings = YtDlpSettings()
+
+    hls_disk_cache: HlsDiskCacheSettings = HlsDiskCacheSettings()
+
+    hls_prefetch: HlsPrefetchSettings = HlsPrefetchSettings()
+
+    tracks_auto_sync: TracksAutoSyncSettings = TracksAutoSyncSettings()
+
     @staticmethod
     def load_from_env():
         return AppConfig.model_validate({})
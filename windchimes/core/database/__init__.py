@@ -1,28 +1,187 @@
+import asyncio
+from dataclasses import dataclass
 import logging
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+import time
+from typing import Any, cast
 
-from windchimes.core.config import app_config
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from windchimes.core.config import DatabaseSettings, app_config
 
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass()
+class DatabasePoolMetrics:
+    size: int
+    checked_out: int
+    """Connections currently in use"""
+
+    overflow: int
+    """Connections opened beyond `size`, negative while the pool is not filled"""
+
+    checkouts: int
+    total_checkout_wait_seconds: float
+    """Includes opening of new connections, when the pool has no idle ones"""
+
+    max_checkout_wait_seconds: float
+    """Longest wait for a connection since the previous metrics reading"""
+
+
+class _TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Pool that measures how long callers wait for a connection
+
+    The wait includes opening a new connection when there is no idle one and the
+    pool can grow, not only waiting for a connection to be returned
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.checkouts = 0
+        self.total_checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+
+    def connect(self):
+        start_time = time.perf_counter()
+
+        connection = super().connect()
+
+        wait_seconds = time.perf_counter() - start_time
+        self.checkouts += 1
+        self.total_checkout_wait_seconds += wait_seconds
+        self.max_checkout_wait_seconds = max(
+            self.max_checkout_wait_seconds, wait_seconds
+        )
+
+        return connection
+
+    def recreate(self):
+        # the pool is recreated on engine disposal, counters are kept
+        new_pool = cast(_TimedAsyncAdaptedQueuePool, super().recreate())
+        new_pool.checkouts = self.checkouts
+        new_pool.total_checkout_wait_seconds = self.total_checkout_wait_seconds
+        new_pool.max_checkout_wait_seconds = self.max_checkout_wait_seconds
+
+        return new_pool
+
+
 class Database:
-    def __init__(self, url: str, echo=True) -> None:
+    def __init__(self, settings: DatabaseSettings) -> None:
+        self.settings = settings
+
+        connect_args: dict[str, Any] = {
+            "prepared_statement_cache_size": settings.prepared_statement_cache_size
+        }
+        if settings.statement_timeout_seconds is not None:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(int(settings.statement_timeout_seconds * 1000))
+            }
+
         self._engine = create_async_engine(
-            url,
-            echo=echo,
+            str(settings.url),
+            echo=settings.echo,
+            poolclass=_TimedAsyncAdaptedQueuePool,
+            pool_size=settings.pool_size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.pool_timeout_seconds,
+            pool_pre_ping=settings.pool_pre_ping,
+            pool_recycle=(
+                int(settings.pool_recycle_seconds)
+                if settings.pool_recycle_seconds is not None
+                else -1
+            ),
+            connect_args=connect_args,
         )
 
-        logger.info("initialized database engine with url: %s", url)
+        logger.info(
+            "initialized database engine with url: %s",
+            self._engine.url.render_as_string(hide_password=True),
+        )
 
         self.create_session = async_sessionmaker(
             bind=self._engine, autoflush=False, autocommit=False, expire_on_commit=False
         )
 
+    async def warm_up_pool(self):
+        """Opens `pool_warmup_connections` connections and returns them to the
+        pool
+        """
+
+        connections_count = min(
+            self.settings.pool_warmup_connections, self.settings.pool_size
+        )
+
+        if connections_count <= 0:
+            return
+
+        start_time = time.perf_counter()
+
+        connections_or_errors = await asyncio.gather(
+            *[self._engine.connect() for _ in range(connections_count)],
+            return_exceptions=True,
+        )
+
+        # connections that were opened go back to the pool even if others failed
+        for connection_or_error in connections_or_errors:
+            if isinstance(connection_or_error, AsyncConnection):
+                await connection_or_error.close()
+
+        errors = [
+            connection_or_error
+            for connection_or_error in connections_or_errors
+            if isinstance(connection_or_error, BaseException)
+        ]
+
+        if errors:
+            # the app can still start and connect later, when the database is up
+            logger.warning(
+                "failed to warm up database pool, %s of %s connections failed: %s",
+                len(errors),
+                connections_count,
+                errors[0],
+            )
+            return
+
+        logger.info(
+            "warmed up database pool with %s connections in %.3fs",
+            connections_count,
+            time.perf_counter() - start_time,
+        )
+
+    def get_pool_metrics(self):
+        pool = self._engine.pool
+
+        if not isinstance(pool, _TimedAsyncAdaptedQueuePool):
+            return None
+
+        metrics = DatabasePoolMetrics(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            checkouts=pool.checkouts,
+            total_checkout_wait_seconds=pool.total_checkout_wait_seconds,
+            max_checkout_wait_seconds=pool.max_checkout_wait_seconds,
+        )
+        pool.max_checkout_wait_seconds = 0
+
+        return metrics
+
+    def log_pool_metrics(self):
+        metrics = self.get_pool_metrics()
+
+        if metrics is not None:
+            logger.info("database pool metrics: %s", metrics)
+
     async def close(self):
         logger.info("closing sqlalchemy engine")
         await self._engine.dispose()
 
 
-database = Database(url=str(app_config.database.url), echo=app_config.database.echo)
+database = Database(app_config.database)
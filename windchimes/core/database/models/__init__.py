@@ -1,8 +1,11 @@
 from windchimes.core.database.models.base import BaseDatabaseModel
 from windchimes.core.database.models.track_reference import TrackReference
 from windchimes.core.database.models.playlist import Playlist
+from windchimes.core.database.models.loaded_track_cache_entry import (
+    LoadedTrackCacheEntry,
+)
 
 
-__all__ = ["BaseDatabaseModel", "TrackReference", "Playlist"]
+__all__ = ["BaseDatabaseModel", "TrackReference", "Playlist", "LoadedTrackCacheEntry"]
 
-database_models = [TrackReference, Playlist]
+database_models = [TrackReference, Playlist, LoadedTrackCacheEntry]
@@ -21,6 +21,16 @@ class ExternalPlaylistReference(BaseDatabaseModel):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
     last_sync_at: Mapped[datetime]
+    """Time of the last successful sync"""
+
+    last_sync_attempt_at: Mapped[datetime] = mapped_column(index=True)
+    """Background sync picks the playlists attempted to sync long ago first. Moved
+    forward when a playlist is claimed for the sync, so failed syncs are retried
+    only when the playlist becomes stale again
+    """
+
+    last_sync_error: Mapped[Optional[str]]
+    """Why the last background sync failed, `None` if it succeeded"""
 
     platform_id: Mapped[str]
     """External platform id of the playlist that is being referenced"""
@@ -30,7 +40,15 @@ class ExternalPlaylistReference(BaseDatabaseModel):
     soundcloud_secret_token: Mapped[Optional[str]]
     """Platform-specific column for fetching private soundcloud playlists"""
 
-    parent_playlist_id: Mapped[Optional[int]] = mapped_column(ForeignKey("playlist.id"))
+    content_fingerprint: Mapped[Optional[str]]
+    """Fingerprint of the playlist tracks at the last sync, see
+    `ExternalPlaylistInfo.content_fingerprint`. Sync skips writes when it didn't
+    change
+    """
+
+    parent_playlist_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("playlist.id"), index=True
+    )
     playlist: Mapped[Any] = relationship(
         "Playlist", back_populates="external_playlist_to_sync_with"
     )
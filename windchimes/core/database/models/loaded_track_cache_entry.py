@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from windchimes.core.database.models.base import BaseDatabaseModel
+
+
+class LoadedTrackCacheEntry(BaseDatabaseModel):
+    """
+    Track data loaded from external platform, stored temporarily to not load it
+    again on every request
+
+    Shared between all app processes, unlike in-memory cache
+    """
+
+    __tablename__ = "loaded_track_cache_entry"
+
+    track_id: Mapped[str] = mapped_column(primary_key=True)
+    """Track reference id, e.g. `YOUTUBE/vKuKp10LQEM`"""
+
+    loaded_track: Mapped[Optional[dict[str, Any]]] = mapped_column(JSONB)
+    """Loaded track data. `NULL` if the track is not available on the platform"""
+
+    expires_at: Mapped[datetime] = mapped_column(index=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from sqlalchemy import ForeignKey, DateTime
+from sqlalchemy import BigInteger, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import functions
 
@@ -22,6 +22,20 @@ class PlaylistTrack(BaseDatabaseModel):
         ForeignKey("track_reference.id", ondelete="CASCADE"), primary_key=True
     )
 
+    position: Mapped[int] = mapped_column(BigInteger(), server_default="0")
+    """Sort key of the track in the playlist
+
+    Positions have gaps between them, so a track can be moved by changing only
+    its own position. See `windchimes.core.services.playlists.track_positions`
+    """
+
+    __table_args__ = (
+        Index("ix_playlist_track_playlist_id_position", "playlist_id", "position"),
+        # "playlists containing the track" filters and track deletion, the primary
+        # key can't serve them because it leads with `playlist_id`
+        Index("ix_playlist_track_track_id_playlist_id", "track_id", "playlist_id"),
+    )
+
 
 class Playlist(BaseDatabaseModel):
     """model of a playlist used for database operations
@@ -29,6 +43,9 @@ class Playlist(BaseDatabaseModel):
     Attributes:
         owner_user_id: id of the user that owns a playlist. for now it's provided by
             auth0, an external service
+        track_count: number of tracks in the playlist, stored to avoid counting
+            them on every read. Must be changed in the same transaction with the
+            tracks, see `change_playlists_track_count`
     """
 
     __tablename__ = "playlist"
@@ -45,6 +62,8 @@ class Playlist(BaseDatabaseModel):
     publicly_available: Mapped[bool] = mapped_column(default=False)
     owner_user_id: Mapped[str]
 
+    track_count: Mapped[int] = mapped_column(default=0, server_default="0")
+
     track_references: Mapped[list[Any]] = relationship(
         "TrackReference", secondary="playlist_track", back_populates="playlists"
     )
@@ -53,5 +72,17 @@ class Playlist(BaseDatabaseModel):
         relationship(ExternalPlaylistReference, back_populates="playlist")
     )
 
+    __table_args__ = (
+        # playlists feed is ordered and paginated by these columns
+        Index("ix_playlist_created_at_id", "created_at", "id"),
+        # feed of a single user's playlists
+        Index(
+            "ix_playlist_owner_user_id_created_at_id",
+            "owner_user_id",
+            "created_at",
+            "id",
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"playlist {self.id} - '{self.name}'"
@@ -3,5 +3,14 @@ class ExternalPlaylistNotFoundError(Exception):
         super().__init__("External playlist with specified url/id cannot be found")
 
 
+class ExternalPlaylistNotModifiedError(Exception):
+    """Raised when the platform confirms that the playlist didn't change since
+    it was fetched with the known content fingerprint
+    """
+
+    def __init__(self):
+        super().__init__("External playlist was not modified")
+
+
 class ExternalPlatformAudioFetchingError(Exception):
     pass
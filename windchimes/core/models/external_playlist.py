@@ -16,6 +16,7 @@ class ExternalPlaylistReferenceSchema(BaseModel):
     last_sync_at: datetime
     platform: Platform
     platform_id: str
+    last_sync_error: Optional[str] = None
 
 
 class ExternalPlaylistInfo(BaseModel):
@@ -38,3 +39,8 @@ class ExternalPlaylistInfo(BaseModel):
 
     soundcloud_secret_token: Optional[str] = None
     """Platform-specific column for fetching private soundcloud playlists"""
+
+    content_fingerprint: Optional[str] = None
+    """Opaque value that changes when playlist tracks change. Built by the
+    platform service, which can use it later for conditional fetching
+    """
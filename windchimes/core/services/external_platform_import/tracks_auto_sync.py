@@ -0,0 +1,244 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import random
+import time
+from typing import Callable, Optional
+
+from sqlalchemy import select, update
+
+from windchimes.common.api_clients.youtube_data_api.quota_ledger import (
+    YoutubeQuotaLedger,
+    YoutubeQuotaPriority,
+)
+from windchimes.core.database import Database
+from windchimes.core.database.models.external_playlist_reference import (
+    ExternalPlaylistReference,
+)
+from windchimes.core.errors.external_platforms import (
+    ExternalPlaylistNotFoundError,
+)
+from windchimes.core.models.platform import Platform
+from windchimes.core.services.external_platform_import.tracks_sync import (
+    TracksSyncService,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _PlatformRateLimiter:
+    """Spaces out starts of requests to the same platform"""
+
+    def __init__(self, min_interval_seconds: float):
+        self.min_interval_seconds = min_interval_seconds
+
+        self._lock = asyncio.Lock()
+        self._next_start_at = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            delay_seconds = self._next_start_at - time.monotonic()
+
+            if delay_seconds > 0:
+                await asyncio.sleep(delay_seconds)
+
+            self._next_start_at = time.monotonic() + self.min_interval_seconds
+
+
+class TracksAutoSyncService:
+    """Periodically syncs playlists linked to external ones, so their owners see
+    fresh tracks without requesting the sync
+
+    Playlists are claimed in batches with `FOR UPDATE SKIP LOCKED`, and claiming
+    moves their `last_sync_attempt_at` forward, so multiple app processes never
+    sync the same playlist at once. `last_sync_at` moves only when the sync
+    succeeds, failed syncs store their error in `last_sync_error` and are
+    retried when the playlist becomes stale again
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        create_tracks_sync_service: Callable[[], TracksSyncService],
+        stale_after_seconds: float,
+        batch_size: int,
+        max_concurrent_syncs: int,
+        min_seconds_between_platform_syncs: dict[Platform, float],
+        max_jitter_seconds: float,
+        youtube_quota_ledger: Optional[YoutubeQuotaLedger] = None,
+    ):
+        """
+        Args:
+            create_tracks_sync_service: called for each batch, so platform clients
+                get fresh credentials (e.g. Soundcloud client id)
+            stale_after_seconds: playlist is synced when it wasn't synced for
+                this long
+            min_seconds_between_platform_syncs: minimal interval between starts
+                of syncs of playlists from the same platform
+            max_jitter_seconds: each sync is delayed by a random time up to this,
+                so syncs of different processes don't hit platforms at once
+            youtube_quota_ledger: while it refuses background work, Youtube
+                playlists are not claimed and stay stale until the quota allows
+                syncing them
+        """
+
+        self.database = database
+        self.create_tracks_sync_service = create_tracks_sync_service
+        self.stale_after_seconds = stale_after_seconds
+        self.batch_size = batch_size
+        self.max_concurrent_syncs = max_concurrent_syncs
+        self.max_jitter_seconds = max_jitter_seconds
+        self.youtube_quota_ledger = youtube_quota_ledger
+
+        self._rate_limiters = {
+            platform: _PlatformRateLimiter(min_interval_seconds)
+            for platform, min_interval_seconds in (
+                min_seconds_between_platform_syncs.items()
+            )
+        }
+
+    async def sync_stale_playlists(self):
+        claimed_playlists = await self._claim_stale_playlists()
+
+        if len(claimed_playlists) == 0:
+            return
+
+        logger.info("Auto sync: syncing %s stale playlists", len(claimed_playlists))
+
+        tracks_sync_service = self.create_tracks_sync_service()
+        semaphore = asyncio.Semaphore(self.max_concurrent_syncs)
+
+        results = await asyncio.gather(
+            *[
+                self._sync_playlist(
+                    tracks_sync_service, semaphore, playlist_id, platform
+                )
+                for playlist_id, platform in claimed_playlists
+            ]
+        )
+
+        logger.info(
+            "Auto sync: %s of %s playlists synced",
+            sum(results),
+            len(claimed_playlists),
+        )
+
+    async def _claim_stale_playlists(self) -> list[tuple[int, Platform]]:
+        """
+        Returns:
+            Ids and platforms of the claimed playlists
+        """
+
+        now = datetime.now()
+
+        async with self.database.create_session() as database_session:
+            stale_playlists_statement = (
+                select(
+                    ExternalPlaylistReference.id,
+                    ExternalPlaylistReference.parent_playlist_id,
+                    ExternalPlaylistReference.platform,
+                )
+                .where(
+                    ExternalPlaylistReference.parent_playlist_id.is_not(None),
+                    ExternalPlaylistReference.last_sync_attempt_at
+                    < now - timedelta(seconds=self.stale_after_seconds),
+                )
+                .order_by(ExternalPlaylistReference.last_sync_attempt_at)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+
+            if (
+                self.youtube_quota_ledger is not None
+                and not self.youtube_quota_ledger.can_spend(
+                    1, YoutubeQuotaPriority.BACKGROUND
+                )
+            ):
+                logger.info(
+                    "Auto sync: Youtube playlists are deferred to save the quota"
+                )
+
+                stale_playlists_statement = stale_playlists_statement.where(
+                    ExternalPlaylistReference.platform != Platform.YOUTUBE
+                )
+
+            stale_playlists = (
+                (await database_session.execute(stale_playlists_statement))
+                .tuples()
+                .all()
+            )
+
+            if len(stale_playlists) == 0:
+                return []
+
+            claim_statement = (
+                update(ExternalPlaylistReference)
+                .where(
+                    ExternalPlaylistReference.id.in_(
+                        [reference_id for reference_id, _, _ in stale_playlists]
+                    )
+                )
+                .values(last_sync_attempt_at=now)
+            )
+            await database_session.execute(claim_statement)
+
+            await database_session.commit()
+
+        return [
+            (playlist_id, platform)
+            for _, playlist_id, platform in stale_playlists
+            if playlist_id is not None
+        ]
+
+    async def _sync_playlist(
+        self,
+        tracks_sync_service: TracksSyncService,
+        semaphore: asyncio.Semaphore,
+        playlist_id: int,
+        platform: Platform,
+    ):
+        """
+        Returns:
+            Whether the playlist was synced
+        """
+
+        async with semaphore:
+            await asyncio.sleep(random.uniform(0, self.max_jitter_seconds))
+
+            rate_limiter = self._rate_limiters.get(platform)
+            if rate_limiter is not None:
+                await rate_limiter.wait()
+
+            try:
+                await tracks_sync_service.sync_playlist_tracks(
+                    playlist_id, skip_if_not_modified=True
+                )
+            except ExternalPlaylistNotFoundError as error:
+                logger.warning(
+                    "Auto sync: external playlist linked to playlist %s is not "
+                    + "available",
+                    playlist_id,
+                )
+                await self._record_sync_error(playlist_id, str(error))
+                return False
+            except Exception as error:
+                logger.exception("Auto sync: failed to sync playlist %s", playlist_id)
+                await self._record_sync_error(playlist_id, repr(error))
+                return False
+
+            return True
+
+    async def _record_sync_error(self, playlist_id: int, error_message: str):
+        try:
+            async with self.database.create_session() as database_session:
+                await database_session.execute(
+                    update(ExternalPlaylistReference)
+                    .where(ExternalPlaylistReference.parent_playlist_id == playlist_id)
+                    .values(last_sync_error=error_message)
+                )
+                await database_session.commit()
+        except Exception:
+            logger.exception(
+                "Auto sync: failed to record sync error of playlist %s", playlist_id
+            )
@@ -0,0 +1,189 @@
+import bisect
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import BaseModel
+
+from windchimes.core.services.playlists.track_positions import TRACK_POSITIONS_GAP
+
+
+class PlaylistTracksDiff(BaseModel):
+    added_tracks_ids: list[str]
+    removed_tracks_ids: list[str]
+
+    moved_tracks_ids: list[str]
+    """Tracks that stayed in the playlist, but changed their place relative to
+    other ones. Minimal set of such tracks is picked, so moving one track in the
+    external playlist reports only that track as moved
+    """
+
+
+@dataclass()
+class PlaylistTracksDiffPlan:
+    diff: PlaylistTracksDiff
+
+    new_positions_by_track_id: dict[str, int]
+    """Positions to write for added and moved tracks. Can include tracks that are
+    not moved in `diff`, when there is no room between neighbours and the
+    playlist is renumbered
+    """
+
+
+def plan_playlist_tracks_diff(
+    current_tracks: list[tuple[str, int]], target_tracks_ids: list[str]
+):
+    """Computes changes that turn current playlist tracks into the target ones
+
+    Tracks forming the longest subsequence that is already in the target order
+    keep their positions, others get positions between their new neighbours
+
+    Args:
+        current_tracks: ids and positions of the playlist tracks, ordered by
+            position
+        target_tracks_ids: unique track ids in the desired order
+    """
+
+    target_indexes_by_track_id = {
+        track_id: track_index for track_index, track_id in enumerate(target_tracks_ids)
+    }
+    current_positions_by_track_id = dict(current_tracks)
+
+    kept_tracks_ids = [
+        track_id
+        for track_id, _ in current_tracks
+        if track_id in target_indexes_by_track_id
+    ]
+    stationary_tracks_ids = set(
+        _get_longest_increasing_subsequence(
+            kept_tracks_ids,
+            key=lambda track_id: target_indexes_by_track_id[track_id],
+        )
+    )
+
+    diff = PlaylistTracksDiff(
+        added_tracks_ids=[
+            track_id
+            for track_id in target_tracks_ids
+            if track_id not in current_positions_by_track_id
+        ],
+        removed_tracks_ids=[
+            track_id
+            for track_id, _ in current_tracks
+            if track_id not in target_indexes_by_track_id
+        ],
+        moved_tracks_ids=[
+            track_id
+            for track_id in target_tracks_ids
+            if track_id in current_positions_by_track_id
+            and track_id not in stationary_tracks_ids
+        ],
+    )
+
+    new_positions_by_track_id = _get_positions_around_stationary_tracks(
+        target_tracks_ids, stationary_tracks_ids, current_positions_by_track_id
+    )
+
+    if new_positions_by_track_id is None:
+        new_positions_by_track_id = {
+            track_id: (track_index + 1) * TRACK_POSITIONS_GAP
+            for track_index, track_id in enumerate(target_tracks_ids)
+            if current_positions_by_track_id.get(track_id)
+            != (track_index + 1) * TRACK_POSITIONS_GAP
+        }
+
+    return PlaylistTracksDiffPlan(
+        diff=diff, new_positions_by_track_id=new_positions_by_track_id
+    )
+
+
+def _get_positions_around_stationary_tracks(
+    target_tracks_ids: list[str],
+    stationary_tracks_ids: set[str],
+    current_positions_by_track_id: dict[str, int],
+) -> Optional[dict[str, int]]:
+    """
+    Returns:
+        Positions of non-stationary tracks spread between their stationary
+        neighbours or `None` if some of the neighbours have no room between them
+    """
+
+    new_positions_by_track_id: dict[str, int] = {}
+    previous_position: Optional[int] = None
+    tracks_run: list[str] = []
+
+    for track_id in [*target_tracks_ids, None]:
+        if track_id is not None and track_id not in stationary_tracks_ids:
+            tracks_run.append(track_id)
+            continue
+
+        next_position = (
+            current_positions_by_track_id[track_id] if track_id is not None else None
+        )
+
+        if len(tracks_run) > 0:
+            slots_count = len(tracks_run) + 1
+
+            run_previous_position = previous_position
+            run_next_position = next_position
+
+            if run_next_position is None:
+                if run_previous_position is None:
+                    run_previous_position = 0
+
+                run_next_position = (
+                    run_previous_position + slots_count * TRACK_POSITIONS_GAP
+                )
+            elif run_previous_position is None:
+                run_previous_position = (
+                    run_next_position - slots_count * TRACK_POSITIONS_GAP
+                )
+
+            if run_next_position - run_previous_position < slots_count:
+                return None
+
+            for track_index, run_track_id in enumerate(tracks_run):
+                new_positions_by_track_id[run_track_id] = (
+                    run_previous_position
+                    + (run_next_position - run_previous_position)
+                    * (track_index + 1)
+                    // slots_count
+                )
+
+            tracks_run = []
+
+        previous_position = next_position
+
+    return new_positions_by_track_id
+
+
+def _get_longest_increasing_subsequence(items: list[str], key) -> list[str]:
+    """Patience sorting, O(n log n)"""
+
+    # smallest key of the last item of increasing subsequence of each length
+    tail_keys: list[int] = []
+    tail_indexes: list[int] = []
+    previous_indexes: list[Optional[int]] = []
+
+    for item_index, item in enumerate(items):
+        item_key = key(item)
+        length_index = bisect.bisect_left(tail_keys, item_key)
+
+        previous_indexes.append(
+            tail_indexes[length_index - 1] if length_index > 0 else None
+        )
+
+        if length_index == len(tail_keys):
+            tail_keys.append(item_key)
+            tail_indexes.append(item_index)
+        else:
+            tail_keys[length_index] = item_key
+            tail_indexes[length_index] = item_index
+
+    subsequence = []
+    item_index = tail_indexes[-1] if len(tail_indexes) > 0 else None
+
+    while item_index is not None:
+        subsequence.append(items[item_index])
+        item_index = previous_indexes[item_index]
+
+    return subsequence[::-1]
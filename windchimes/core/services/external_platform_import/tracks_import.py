@@ -1,25 +1,44 @@
 import logging
-from typing import Sequence
+from typing import TypeVar, cast
 
-from sqlalchemy import delete, select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Table, bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from windchimes.core.database import Database
-from windchimes.core.database.models.playlist import PlaylistTrack
+from windchimes.core.database.models.playlist import Playlist, PlaylistTrack
 from windchimes.core.database.models.track_reference import TrackReference
 from windchimes.core.errors.external_platforms import (
     ExternalPlaylistNotFoundError,
 )
 from windchimes.core.models.external_playlist import ExternalPlaylistToLink
 from windchimes.core.models.track import TrackReferenceSchema
+from windchimes.core.services.external_platform_import.tracks_diff import (
+    plan_playlist_tracks_diff,
+)
 from windchimes.core.services.external_platforms.platform_aggregator import (
     PlatformAggregatorService,
 )
+from windchimes.core.services.playlists.track_count import (
+    change_playlists_track_count,
+)
+from windchimes.core.services.playlists.track_positions import (
+    get_appended_track_positions,
+    get_playlists_last_track_positions,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+_INSERT_CHUNK_SIZE = 5000
+"""Max rows in one multi-row insert. Keeps statement params count below the
+Postgres protocol limit (32767) for tables with up to 6 columns
+"""
+
+_RowT = TypeVar("_RowT")
+
+
 class TracksImportService:
     def __init__(
         self,
@@ -39,6 +58,10 @@ class TracksImportService:
         Adds or replaces tracks in app playlist with tracks from external platform
         (e.g. SoundCloud) playlist
 
+        Tracks are written in a transaction per fetched page of the external
+        playlist, so big playlists appear in the app playlist gradually and an
+        error in the middle leaves the pages imported before it
+
         Args:
             playlist_to_import_from: external playlist platform and url to obtain the
                 tracks data
@@ -58,21 +81,26 @@ class TracksImportService:
             replace_existing_tracks,
         )
 
-        playlist_to_import_from_data = (
-            await self.platform_aggregator_service.get_playlist_by_url(
-                playlist_to_import_from.platform,
-                str(playlist_to_import_from.url),
+        imported_pages_count = 0
+
+        # each page is written as soon as it's fetched, while the next one is
+        # being fetched, instead of waiting for the whole playlist
+        async for (
+            track_references_page
+        ) in self.platform_aggregator_service.iterate_playlist_tracks_pages_by_url(
+            playlist_to_import_from.platform,
+            str(playlist_to_import_from.url),
+        ):
+            await self.add_tracks_to_playlist(
+                playlist_to_import_to_id,
+                track_references_page,
+                replace_existing_tracks and imported_pages_count == 0,
             )
-        )
 
-        if playlist_to_import_from_data is None:
-            raise ExternalPlaylistNotFoundError()
+            imported_pages_count += 1
 
-        await self.add_tracks_to_playlist(
-            playlist_to_import_to_id,
-            playlist_to_import_from_data.track_references,
-            replace_existing_tracks,
-        )
+        if imported_pages_count == 0:
+            raise ExternalPlaylistNotFoundError()
 
     async def add_tracks_to_playlist(
         self,
@@ -80,8 +108,21 @@ class TracksImportService:
         track_references: list[TrackReferenceSchema],
         replace_existing_tracks: bool,
     ):
-        if replace_existing_tracks:
-            async with self.database.create_session() as database_session:
+        """Links the tracks to the playlist in the given order, adding track
+        references that were never imported before
+
+        Everything is done in a single transaction with set-based
+        `INSERT ... ON CONFLICT DO NOTHING` statements, so already existing track
+        references and tracks already in the playlist are skipped by the database
+        without loading them
+        """
+
+        unique_track_references = _get_unique_track_references(track_references)
+
+        async with self.database.create_session() as database_session:
+            await _lock_playlist(database_session, playlist_id)
+
+            if replace_existing_tracks:
                 logger.info(
                     "Deleting existing tracks of playlist %s to replace with "
                     + "imported ones",
@@ -92,106 +133,245 @@ class TracksImportService:
                     PlaylistTrack.playlist_id == playlist_id
                 )
                 await database_session.execute(delete_existing_tracks_statement)
-                await database_session.commit()
 
-        already_existing_track_references = (
-            await self._get_already_existing_track_references(track_references)
-        )
-        already_existing_track_references_ids = [
-            track_reference.id for track_reference in already_existing_track_references
-        ]
-
-        new_track_references_to_add = [
-            track_reference
-            for track_reference in track_references
-            if track_reference.id not in already_existing_track_references_ids
-        ]
-        new_track_references_to_add_ids = [
-            track_reference.id for track_reference in new_track_references_to_add
-        ]
-
-        track_references_to_associate_with_playlist = (
-            self._get_track_references_not_in_playlist(
-                already_existing_track_references,
+                reset_track_count_statement = (
+                    update(Playlist)
+                    .where(Playlist.id == playlist_id)
+                    .values(track_count=0)
+                )
+                await database_session.execute(reset_track_count_statement)
+
+            added_track_references_count = await _insert_track_references(
+                database_session, unique_track_references
+            )
+
+            last_track_position = (
+                await get_playlists_last_track_positions(
+                    database_session, [playlist_id]
+                )
+            ).get(playlist_id)
+
+            # tracks already in the playlist keep their position, the ones linked
+            # below leave unused positions in place of them, which is fine
+            positions = get_appended_track_positions(
+                last_track_position, len(unique_track_references)
+            )
+            linked_tracks_count = await _link_tracks_to_playlist(
+                database_session,
                 playlist_id,
+                [
+                    (track_reference.id, position)
+                    for track_reference, position in zip(
+                        unique_track_references, positions
+                    )
+                ],
             )
-        )
-        track_references_ids_to_associate_with_playlist = list(
-            map(
-                lambda track_reference: track_reference.id,
-                track_references_to_associate_with_playlist,
+
+            await change_playlists_track_count(
+                database_session, {playlist_id: linked_tracks_count}
             )
-        )
+
+            await database_session.commit()
 
         logger.info(
-            "%s tracks references already exist, to be linked: %s, to be added: %s",
-            len(already_existing_track_references_ids),
-            len(track_references_ids_to_associate_with_playlist),
-            len(new_track_references_to_add),
+            "%s tracks references were added, %s tracks were linked to playlist %s",
+            added_track_references_count,
+            linked_tracks_count,
+            playlist_id,
         )
 
+    async def update_playlist_tracks(
+        self, playlist_id: int, track_references: list[TrackReferenceSchema]
+    ):
+        """Makes playlist tracks match the given ones, in the given order
+
+        Unlike replacing all tracks, only the difference is written: missing
+        tracks are added, extra ones are deleted and only tracks that changed
+        their place relative to others get new positions
+
+        Returns:
+            `PlaylistTracksDiff` that was applied
+        """
+
+        unique_track_references = _get_unique_track_references(track_references)
+
         async with self.database.create_session() as database_session:
-            # Adds track references that was never imported before in the db
-            track_references_to_add_to_database = [
-                TrackReference(**track_reference.model_dump())
-                for track_reference in new_track_references_to_add
-            ]
-            database_session.add_all(track_references_to_add_to_database)
+            await _lock_playlist(database_session, playlist_id)
 
-            await database_session.commit()
+            current_tracks_statement = (
+                select(PlaylistTrack.track_id, PlaylistTrack.position)
+                .where(PlaylistTrack.playlist_id == playlist_id)
+                .order_by(PlaylistTrack.position, PlaylistTrack.track_id)
+            )
+            current_tracks = list(
+                (await database_session.execute(current_tracks_statement))
+                .tuples()
+                .all()
+            )
 
-            # Links already existing and new track references (added above) to the
-            # playlist
-            new_playlist_tracks_associations = [
-                PlaylistTrack(playlist_id=playlist_id, track_id=track_reference_id)
-                for track_reference_id in [
-                    *new_track_references_to_add_ids,
-                    *track_references_ids_to_associate_with_playlist,
-                ]
-            ]
+            diff_plan = plan_playlist_tracks_diff(
+                current_tracks,
+                [track_reference.id for track_reference in unique_track_references],
+            )
+            diff = diff_plan.diff
 
-            database_session.add_all(new_playlist_tracks_associations)
+            deleted_tracks_count = 0
 
-            await database_session.commit()
+            for removed_tracks_ids_chunk in _split_into_chunks(diff.removed_tracks_ids):
+                delete_removed_tracks_statement = delete(PlaylistTrack).where(
+                    PlaylistTrack.playlist_id == playlist_id,
+                    PlaylistTrack.track_id.in_(removed_tracks_ids_chunk),
+                )
+                result = await database_session.execute(delete_removed_tracks_statement)
+                deleted_tracks_count += result.rowcount
+
+            added_tracks_ids = set(diff.added_tracks_ids)
+            await _insert_track_references(
+                database_session,
+                [
+                    track_reference
+                    for track_reference in unique_track_references
+                    if track_reference.id in added_tracks_ids
+                ],
+            )
 
-    async def _get_already_existing_track_references(
-        self,
-        track_references: list[TrackReferenceSchema],
-    ):
-        async with self.database.create_session() as database_session:
-            track_references_ids = [
-                track_reference.id for track_reference in track_references
+            linked_tracks_count = await _link_tracks_to_playlist(
+                database_session,
+                playlist_id,
+                [
+                    (track_id, diff_plan.new_positions_by_track_id[track_id])
+                    for track_id in diff.added_tracks_ids
+                ],
+            )
+
+            repositioned_tracks_params = [
+                {"repositioned_track_id": track_id, "new_position": position}
+                for track_id, position in diff_plan.new_positions_by_track_id.items()
+                if track_id not in added_tracks_ids
             ]
 
-            statement = (
-                select(TrackReference)
-                .where(TrackReference.id.in_(track_references_ids))
-                .options(joinedload(TrackReference.playlists))
+            if len(repositioned_tracks_params) > 0:
+                # core table statement, so it's executed as a single executemany
+                playlist_track_table = cast(Table, PlaylistTrack.__table__)
+
+                await database_session.execute(
+                    update(playlist_track_table)
+                    .where(
+                        playlist_track_table.c.playlist_id == playlist_id,
+                        playlist_track_table.c.track_id
+                        == bindparam("repositioned_track_id"),
+                    )
+                    .values(position=bindparam("new_position")),
+                    repositioned_tracks_params,
+                )
+
+            await change_playlists_track_count(
+                database_session,
+                {playlist_id: linked_tracks_count - deleted_tracks_count},
             )
-            result = await database_session.execute(statement)
 
-            already_existing_track_references = result.scalars().unique().all()
+            await database_session.commit()
 
-            return already_existing_track_references
+        logger.info(
+            "Updated tracks of playlist %s: %s added, %s removed, %s moved, "
+            + "%s positions written",
+            playlist_id,
+            len(diff.added_tracks_ids),
+            len(diff.removed_tracks_ids),
+            len(diff.moved_tracks_ids),
+            len(repositioned_tracks_params),
+        )
 
-    def _get_track_references_not_in_playlist(
-        self,
-        already_existing_track_references: Sequence[TrackReference],
-        playlist_id: int,
-    ):
-        track_references_not_in_playlist = []
+        return diff
 
-        for track_reference in already_existing_track_references:
-            matching_playlists = list(
-                filter(
-                    lambda playlist: playlist.id == playlist_id,
-                    track_reference.playlists,
-                )
+
+def _get_unique_track_references(track_references: list[TrackReferenceSchema]):
+    """The same track can't be inserted twice in one statement, so it's kept only
+    at the position of its first occurrence
+    """
+
+    return list(
+        {
+            track_reference.id: track_reference for track_reference in track_references
+        }.values()
+    )
+
+
+async def _lock_playlist(database_session: AsyncSession, playlist_id: int):
+    """Locks the playlist row until the end of the transaction, so concurrent
+    changes of the playlist tracks don't get the same positions
+    """
+
+    await database_session.execute(
+        select(Playlist.id).where(Playlist.id == playlist_id).with_for_update()
+    )
+
+
+async def _insert_track_references(
+    database_session: AsyncSession, track_references: list[TrackReferenceSchema]
+):
+    """
+    Returns:
+        Number of track references that didn't exist before
+    """
+
+    added_track_references_count = 0
+
+    for track_references_chunk in _split_into_chunks(track_references):
+        statement = (
+            insert(TrackReference)
+            .values(
+                [
+                    track_reference.model_dump()
+                    for track_reference in track_references_chunk
+                ]
             )
+            .on_conflict_do_nothing()
+            .returning(TrackReference.id)
+        )
+        result = await database_session.execute(statement)
+        added_track_references_count += len(result.all())
+
+    return added_track_references_count
+
+
+async def _link_tracks_to_playlist(
+    database_session: AsyncSession,
+    playlist_id: int,
+    tracks_ids_and_positions: list[tuple[str, int]],
+):
+    """
+    Returns:
+        Number of linked tracks, not counting ones that were already in the
+        playlist
+    """
+
+    linked_tracks_count = 0
+
+    for tracks_chunk in _split_into_chunks(tracks_ids_and_positions):
+        statement = (
+            insert(PlaylistTrack)
+            .values(
+                [
+                    {
+                        "playlist_id": playlist_id,
+                        "track_id": track_id,
+                        "position": position,
+                    }
+                    for track_id, position in tracks_chunk
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(PlaylistTrack.track_id)
+        )
+        result = await database_session.execute(statement)
+        linked_tracks_count += len(result.all())
+
+    return linked_tracks_count
 
-            if len(matching_playlists) > 0:
-                continue
-            else:
-                track_references_not_in_playlist.append(track_reference)
 
-        return track_references_not_in_playlist
+def _split_into_chunks(rows: list[_RowT]) -> list[list[_RowT]]:
+    return [
+        rows[chunk_start : chunk_start + _INSERT_CHUNK_SIZE]
+        for chunk_start in range(0, len(rows), _INSERT_CHUNK_SIZE)
+    ]
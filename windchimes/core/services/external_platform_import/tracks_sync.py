@@ -1,6 +1,8 @@
 from datetime import datetime
 import logging
+from typing import Literal, Optional, overload
 
+from pydantic import BaseModel
 from sqlalchemy import delete, select, update
 
 from windchimes.core.database import Database
@@ -9,18 +11,22 @@ from windchimes.core.database.models.external_playlist_reference import (
 )
 from windchimes.core.errors.external_platforms import (
     ExternalPlaylistNotFoundError,
+    ExternalPlaylistNotModifiedError,
 )
 from windchimes.core.models.external_playlist import ExternalPlaylistToLink
 from windchimes.core.models.platform_specific_params import (
     PlatformSpecificParams,
 )
+from windchimes.core.models.track import TrackReferenceSchema
+from windchimes.core.services.external_platform_import.tracks_diff import (
+    PlaylistTracksDiff,
+)
 from windchimes.core.services.external_platform_import.tracks_import import (
     TracksImportService,
 )
 from windchimes.core.services.external_platforms.platform_aggregator import (
     PlatformAggregatorService,
 )
-from windchimes.core.services.playlists import PlaylistToReadWithTrackCount
 
 
 logger = logging.getLogger(__name__)
@@ -34,6 +40,13 @@ class ExternalPlaylistNotLinkedError(Exception):
         )
 
 
+class PlaylistTracksSyncResult(BaseModel):
+    track_references: list[TrackReferenceSchema]
+    """All tracks of the playlist after the sync"""
+
+    diff: PlaylistTracksDiff
+
+
 class TracksSyncService:
     def __init__(
         self,
@@ -71,12 +84,16 @@ class TracksSyncService:
         await self.disable_external_playlist_sync(playlist_to_link_to_id)
 
         async with self.database.create_session() as database_session:
+            now = datetime.now()
+
             external_playlist_reference = ExternalPlaylistReference(
                 platform=external_playlist_to_link.platform,
                 platform_id=external_playlist_data.external_platform_id,
                 parent_playlist_id=playlist_to_link_to_id,
-                last_sync_at=datetime.now(),
+                last_sync_at=now,
+                last_sync_attempt_at=now,
                 soundcloud_secret_token=external_playlist_data.soundcloud_secret_token,
+                content_fingerprint=external_playlist_data.content_fingerprint,
             )
 
             database_session.add(external_playlist_reference)
@@ -101,13 +118,67 @@ class TracksSyncService:
             await database_session.execute(statement)
             await database_session.commit()
 
+    @overload
     async def sync_playlist_tracks(
-        self, playlist_to_sync: PlaylistToReadWithTrackCount
-    ):
-        external_playlist_data = await self.get_external_playlist_linked(
-            playlist_to_sync.id
+        self, playlist_id: int, skip_if_not_modified: Literal[False] = False
+    ) -> PlaylistTracksSyncResult: ...
+
+    @overload
+    async def sync_playlist_tracks(
+        self, playlist_id: int, skip_if_not_modified: bool
+    ) -> Optional[PlaylistTracksSyncResult]: ...
+
+    async def sync_playlist_tracks(
+        self, playlist_id: int, skip_if_not_modified: bool = False
+    ) -> Optional[PlaylistTracksSyncResult]:
+        """Makes playlist tracks match the tracks of the external playlist linked
+        to it
+
+        Args:
+            skip_if_not_modified: allows platforms to skip fetching of the whole
+                playlist, if they can confirm it didn't change, and skips writes
+                to the playlist tracks when the external playlist content
+                fingerprint didn't change since the last sync. No result is
+                returned when the fetch is skipped, so it's meant for background
+                syncs. Without it, the playlist tracks are always rewritten, which
+                also restores tracks changed in the app since the last sync
+
+        Returns:
+            Sync result or `None` if it was skipped because of
+            `skip_if_not_modified`
+
+        Raises:
+            ExternalPlaylistNotFoundError: if the playlist is not linked or the
+                external playlist is not available
+        """
+
+        external_playlist_reference = await self._get_external_playlist_reference(
+            playlist_id
         )
 
+        if external_playlist_reference is None:
+            raise ExternalPlaylistNotFoundError()
+
+        try:
+            external_playlist_data = await self._fetch_external_playlist(
+                external_playlist_reference,
+                known_content_fingerprint=(
+                    external_playlist_reference.content_fingerprint
+                    if skip_if_not_modified
+                    else None
+                ),
+            )
+        except ExternalPlaylistNotModifiedError:
+            logger.info(
+                "Sync of playlist %s skipped, external playlist was not modified",
+                playlist_id,
+            )
+
+            await self._update_sync_state(
+                playlist_id, external_playlist_reference.content_fingerprint
+            )
+            return None
+
         if external_playlist_data is None:
             raise ExternalPlaylistNotFoundError()
 
@@ -116,23 +187,60 @@ class TracksSyncService:
             len(external_playlist_data.track_references),
         )
 
-        await self.tracks_import_service.add_tracks_to_playlist(
-            playlist_to_sync.id,
-            external_playlist_data.track_references,
-            replace_existing_tracks=True,
-        )
+        if (
+            skip_if_not_modified
+            and external_playlist_data.content_fingerprint is not None
+            and external_playlist_data.content_fingerprint
+            == external_playlist_reference.content_fingerprint
+        ):
+            logger.info(
+                "External playlist of playlist %s has the same content fingerprint, "
+                + "tracks are not updated",
+                playlist_id,
+            )
 
-        async with self.database.create_session() as database_session:
-            update_last_sync_date_statement = update(ExternalPlaylistReference).values(
-                last_sync_at=datetime.now()
+            diff = PlaylistTracksDiff(
+                added_tracks_ids=[], removed_tracks_ids=[], moved_tracks_ids=[]
+            )
+        else:
+            diff = await self.tracks_import_service.update_playlist_tracks(
+                playlist_id, external_playlist_data.track_references
             )
 
-            await database_session.execute(update_last_sync_date_statement)
-            await database_session.commit()
+            logger.info(
+                "Synced playlist %s: added %s, removed %s, moved %s tracks",
+                playlist_id,
+                len(diff.added_tracks_ids),
+                len(diff.removed_tracks_ids),
+                len(diff.moved_tracks_ids),
+            )
+            logger.debug(
+                "Synced playlist %s tracks ids: added %s, removed %s, moved %s",
+                playlist_id,
+                diff.added_tracks_ids,
+                diff.removed_tracks_ids,
+                diff.moved_tracks_ids,
+            )
 
-        return external_playlist_data.track_references
+        await self._update_sync_state(
+            playlist_id, external_playlist_data.content_fingerprint
+        )
+
+        return PlaylistTracksSyncResult(
+            track_references=external_playlist_data.track_references, diff=diff
+        )
 
     async def get_external_playlist_linked(self, playlist_id: int):
+        external_playlist_reference = await self._get_external_playlist_reference(
+            playlist_id
+        )
+
+        if external_playlist_reference is None:
+            return None
+
+        return await self._fetch_external_playlist(external_playlist_reference)
+
+    async def _get_external_playlist_reference(self, playlist_id: int):
         async with self.database.create_session() as database_session:
             linked_playlist_query_statement = select(ExternalPlaylistReference).where(
                 ExternalPlaylistReference.parent_playlist_id == playlist_id
@@ -140,23 +248,46 @@ class TracksSyncService:
 
             result = await database_session.execute(linked_playlist_query_statement)
 
-            external_playlist_reference = result.scalar()
-
-            if external_playlist_reference is None:
-                return None
+            return result.scalar()
 
-            soundcloud_secret_token = (
-                external_playlist_reference.soundcloud_secret_token
-            )
+    async def _fetch_external_playlist(
+        self,
+        external_playlist_reference: ExternalPlaylistReference,
+        known_content_fingerprint: Optional[str] = None,
+    ):
+        """
+        Raises:
+            ExternalPlaylistNotModifiedError: if the platform confirmed that the
+                playlist didn't change since `known_content_fingerprint`
+        """
+
+        soundcloud_secret_token = external_playlist_reference.soundcloud_secret_token
+
+        return await self.platform_aggregator_service.get_playlist_by_id(
+            external_playlist_reference.platform,
+            external_playlist_reference.platform_id,
+            platform_specific_params=PlatformSpecificParams(
+                soundcloud_secret_token=soundcloud_secret_token
+            ),
+            known_content_fingerprint=known_content_fingerprint,
+        )
 
-            external_playlist_data = (
-                await self.platform_aggregator_service.get_playlist_by_id(
-                    external_playlist_reference.platform,
-                    external_playlist_reference.platform_id,
-                    platform_specific_params=PlatformSpecificParams(
-                        soundcloud_secret_token=soundcloud_secret_token
-                    ),
+    async def _update_sync_state(
+        self, playlist_id: int, content_fingerprint: Optional[str]
+    ):
+        async with self.database.create_session() as database_session:
+            now = datetime.now()
+
+            statement = (
+                update(ExternalPlaylistReference)
+                .where(ExternalPlaylistReference.parent_playlist_id == playlist_id)
+                .values(
+                    last_sync_at=now,
+                    last_sync_attempt_at=now,
+                    last_sync_error=None,
+                    content_fingerprint=content_fingerprint,
                 )
             )
 
-            return external_playlist_data
+            await database_session.execute(statement)
+            await database_session.commit()
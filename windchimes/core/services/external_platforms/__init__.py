@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Sequence
+import hashlib
+from typing import AsyncIterator, Hashable, Optional, Sequence
 
 from windchimes.core.models.platform_specific_params import (
     PlatformSpecificParams,
@@ -14,6 +15,14 @@ class ExternalPlatformService(ABC):
     external platforms like Youtube and Soundcloud
     """
 
+    @property
+    def single_flight_key(self) -> Hashable:
+        """Settings of the service that affect results of its calls. Concurrent
+        identical calls are shared only between services with the same settings
+        """
+
+        return ()
+
     @abstractmethod
     async def load_tracks(
         self, tracks_to_load: list[TrackReferenceSchema]
@@ -50,10 +59,41 @@ class ExternalPlatformService(ABC):
     async def get_playlist_by_url(self, url: str) -> Optional[ExternalPlaylistInfo]:
         pass
 
+    async def iterate_playlist_tracks_pages_by_url(
+        self, url: str
+    ) -> AsyncIterator[list[TrackReferenceSchema]]:
+        """Yields playlist tracks page by page, as they are fetched, so the caller
+        can process them without waiting for the whole playlist
+
+        Platforms returning the whole playlist at once yield it as a single page
+
+        Yields:
+            At least one (possibly empty) page if the playlist exists, nothing
+            otherwise
+        """
+
+        playlist = await self.get_playlist_by_url(url)
+
+        if playlist is not None:
+            yield playlist.track_references
+
     @abstractmethod
     async def get_playlist_by_id(
-        self, playlist_id: str, platform_specific_params: PlatformSpecificParams
+        self,
+        playlist_id: str,
+        platform_specific_params: PlatformSpecificParams,
+        known_content_fingerprint: Optional[str] = None,
     ) -> Optional[ExternalPlaylistInfo]:
+        """
+        Args:
+            known_content_fingerprint: fingerprint of the previously fetched
+                playlist. Platforms supporting conditional requests use it to
+                avoid fetching unchanged playlists
+
+        Raises:
+            ExternalPlaylistNotModifiedError: if the platform confirmed that the
+                playlist didn't change since `known_content_fingerprint`
+        """
         pass
 
     @abstractmethod
@@ -65,3 +105,13 @@ class ExternalPlatformService(ABC):
         self, resource_to_convert, track_id: str
     ) -> LoadedTrack:
         pass
+
+
+def get_track_references_fingerprint(track_references: list[TrackReferenceSchema]):
+    """Hash of the ordered track ids, changes when tracks are added, removed or
+    reordered
+    """
+
+    return hashlib.sha256(
+        "\n".join(track_reference.id for track_reference in track_references).encode()
+    ).hexdigest()
@@ -1,11 +1,14 @@
+import asyncio
+import logging
 import random
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
 
 from windchimes.core.models.platform_specific_params import (
     PlatformSpecificParams,
 )
 from windchimes.core.services.external_platforms import ExternalPlatformService
 from windchimes.common.utils.lists import set_items_order
+from windchimes.common.utils.single_flight import SingleFlight
 from windchimes.core.models.platform import Platform
 from windchimes.core.models.external_playlist import (
     ExternalPlaylistInfo,
@@ -17,6 +20,15 @@ from windchimes.core.services.external_platforms.soundcloud import (
 from windchimes.core.services.external_platforms.youtube_service import (
     YoutubeService,
 )
+from windchimes.core.stores.loaded_tracks_cache import LoadedTracksCache
+
+
+logger = logging.getLogger(__name__)
+
+
+_DEFAULT_LOAD_TRACKS_TIMEOUT_SECONDS = 5
+
+ResultT = TypeVar("ResultT")
 
 
 class PlatformAggregatorService:
@@ -28,28 +40,55 @@ class PlatformAggregatorService:
     """
 
     def __init__(
-        self, soundcloud_service: SoundcloudService, youtube_service: YoutubeService
+        self,
+        soundcloud_service: SoundcloudService,
+        youtube_service: YoutubeService,
+        load_tracks_timeouts_seconds: Optional[dict[Platform, float]] = None,
+        loaded_tracks_cache: Optional[LoadedTracksCache] = None,
+        single_flight: Optional[SingleFlight[Any]] = None,
     ):
+        """
+        Args:
+            load_tracks_timeouts_seconds: how long to wait for each platform's
+                tracks. Tracks of a platform that didn't respond in time are
+                returned as `None`
+            loaded_tracks_cache: cache to look tracks up in before loading them
+                from platforms. Caching is disabled if not specified
+            single_flight: process-wide single-flight shared by the services
+                created for different requests, so concurrent identical platform
+                calls (e.g. many users opening the same playlist) share one
+                upstream call. Calls are keyed by platform, operation and
+                arguments. Each call is made separately if not specified
+        """
+
         self.platform_services: dict[Platform, ExternalPlatformService] = {
             Platform.SOUNDCLOUD: soundcloud_service,
             Platform.YOUTUBE: youtube_service,
         }
 
+        self.load_tracks_timeouts_seconds = load_tracks_timeouts_seconds or {}
+        self.loaded_tracks_cache = loaded_tracks_cache
+        self.single_flight = single_flight
+
     async def load_tracks(self, tracks_to_load: list[TrackReferenceSchema]):
         # groups tracks by platform to query them from api in batches
         tracks_grouped_by_platform = {platform: [] for platform in Platform}
         for track_reference in tracks_to_load:
             tracks_grouped_by_platform[track_reference.platform].append(track_reference)
 
-        loaded_tracks: list[Optional[LoadedTrack]] = []
-
-        for platform in tracks_grouped_by_platform:
-            platform_service = self.platform_services[platform]
-            tracks_to_load_group = tracks_grouped_by_platform[platform]
+        # platforms are queried concurrently, so the slowest one determines
+        # the response time instead of the sum of all of them
+        loaded_tracks_groups = await asyncio.gather(
+            *[
+                self._load_platform_tracks(platform, tracks_to_load_group)
+                for platform, tracks_to_load_group in tracks_grouped_by_platform.items()
+                if len(tracks_to_load_group) > 0
+            ]
+        )
 
-            loaded_tracks.extend(
-                await platform_service.load_tracks(tracks_to_load_group)
-            )
+        loaded_tracks: list[Optional[LoadedTrack]] = []
+        for loaded_tracks_group in loaded_tracks_groups:
+            loaded_tracks.extend(loaded_tracks_group)
 
         # restores the order
         return set_items_order(
@@ -58,6 +97,114 @@ class PlatformAggregatorService:
             lambda track: track.id if track is not None else None,
         )
 
+    async def _load_platform_tracks(
+        self, platform: Platform, tracks_to_load: list[TrackReferenceSchema]
+    ) -> list[Optional[LoadedTrack]]:
+        """Loads tracks of one platform, taking cached ones from the cache
+
+        Returns:
+            Loaded tracks in the order of `tracks_to_load`
+        """
+
+        cached_tracks: dict[str, Optional[LoadedTrack]] = {}
+        if self.loaded_tracks_cache is not None:
+            cached_tracks = await self.loaded_tracks_cache.get_many(tracks_to_load)
+
+        tracks_to_fetch = [
+            track_reference
+            for track_reference in tracks_to_load
+            if track_reference.id not in cached_tracks
+        ]
+
+        logger.info(
+            "Loading %s %s tracks, %s of them are cached",
+            len(tracks_to_load),
+            platform.value,
+            len(tracks_to_load) - len(tracks_to_fetch),
+        )
+
+        fetched_tracks: dict[str, Optional[LoadedTrack]] = {}
+
+        if len(tracks_to_fetch) > 0:
+            fetched_tracks_list = await self._fetch_platform_tracks(
+                platform, tracks_to_fetch
+            )
+
+            if fetched_tracks_list is not None:
+                fetched_tracks = {
+                    track_reference.id: loaded_track
+                    for track_reference, loaded_track in zip(
+                        tracks_to_fetch, fetched_tracks_list
+                    )
+                }
+
+        return [
+            (
+                cached_tracks[track_reference.id]
+                if track_reference.id in cached_tracks
+                else fetched_tracks.get(track_reference.id)
+            )
+            for track_reference in tracks_to_load
+        ]
+
+    async def _fetch_platform_tracks(
+        self, platform: Platform, tracks_to_fetch: list[TrackReferenceSchema]
+    ) -> Optional[list[Optional[LoadedTrack]]]:
+        """Fetches tracks from the platform API
+
+        One slow or failing platform must not break loading of tracks from the others
+
+        Returns:
+            Loaded tracks or `None` if the platform failed or didn't respond in time
+        """
+
+        timeout_seconds = self.load_tracks_timeouts_seconds.get(
+            platform, _DEFAULT_LOAD_TRACKS_TIMEOUT_SECONDS
+        )
+
+        try:
+            # waiting is limited per caller, the shared call is cancelled only
+            # when all of its callers gave up
+            return await asyncio.wait_for(
+                self._run_single_flight(
+                    platform,
+                    "load_tracks",
+                    tuple(track_reference.id for track_reference in tracks_to_fetch),
+                    lambda: self._load_and_cache_platform_tracks(
+                        platform, tracks_to_fetch
+                    ),
+                ),
+                timeout=timeout_seconds,
+            )
+        except asyncio.TimeoutError:
+            logger.error(
+                "Loading %s %s tracks timed out after %s seconds",
+                len(tracks_to_fetch),
+                platform.value,
+                timeout_seconds,
+            )
+        except Exception as error:
+            logger.error(
+                "Loading %s %s tracks failed: %s",
+                len(tracks_to_fetch),
+                platform.value,
+                error,
+            )
+
+        return None
+
+    async def _load_and_cache_platform_tracks(
+        self, platform: Platform, tracks_to_load: list[TrackReferenceSchema]
+    ):
+        loaded_tracks = await self.platform_services[platform].load_tracks(
+            tracks_to_load
+        )
+
+        if self.loaded_tracks_cache is not None:
+            await self.loaded_tracks_cache.set_many(tracks_to_load, loaded_tracks)
+
+        return loaded_tracks
+
     async def get_track_audio_file_url(
         self,
         track_platform_id: str,
@@ -71,22 +218,71 @@ class PlatformAggregatorService:
     async def get_playlist_by_url(
         self, platform: Platform, playlist_url: str
     ) -> Optional[ExternalPlaylistInfo]:
-        playlist = await self.platform_services[platform].get_playlist_by_url(
-            playlist_url
+        return await self._run_single_flight(
+            platform,
+            "get_playlist_by_url",
+            (playlist_url,),
+            lambda: self.platform_services[platform].get_playlist_by_url(playlist_url),
         )
 
-        return playlist
+    def iterate_playlist_tracks_pages_by_url(
+        self, platform: Platform, playlist_url: str
+    ) -> AsyncIterator[list[TrackReferenceSchema]]:
+        """Yields playlist tracks page by page, as they are fetched. Yields
+        nothing if the playlist is not found
+        """
+
+        return self.platform_services[platform].iterate_playlist_tracks_pages_by_url(
+            playlist_url
+        )
 
     async def get_playlist_by_id(
         self,
         platform: Platform,
         playlist_id: str,
         platform_specific_params: PlatformSpecificParams,
+        known_content_fingerprint: Optional[str] = None,
     ) -> Optional[ExternalPlaylistInfo]:
-        return await self.platform_services[platform].get_playlist_by_id(
-            playlist_id, platform_specific_params
+        """
+        Raises:
+            ExternalPlaylistNotModifiedError: if the platform confirmed that the
+                playlist didn't change since `known_content_fingerprint`
+        """
+
+        return await self._run_single_flight(
+            platform,
+            "get_playlist_by_id",
+            (
+                playlist_id,
+                platform_specific_params.model_dump_json(),
+                known_content_fingerprint,
+            ),
+            lambda: self.platform_services[platform].get_playlist_by_id(
+                playlist_id, platform_specific_params, known_content_fingerprint
+            ),
         )
 
+    async def _run_single_flight(
+        self,
+        platform: Platform,
+        operation: str,
+        arguments: tuple,
+        create_call: Callable[[], Awaitable[ResultT]],
+    ) -> ResultT:
+        if self.single_flight is None:
+            return await create_call()
+
+        # services created with different settings (e.g. for background work)
+        # can return different results for the same arguments
+        key = (
+            platform,
+            operation,
+            self.platform_services[platform].single_flight_key,
+            arguments,
+        )
+
+        return await self.single_flight.run(key, create_call)
+
     async def search_tracks(self, search_query: str) -> list[LoadedTrack]:
         tracks = []
 
@@ -2,7 +2,10 @@ import logging
 
 from windchimes.common.api_clients.platform_api_error import PlatformApiError
 from windchimes.common.api_clients.soundcloud import SoundcloudApiClient
-from windchimes.common.api_clients.soundcloud.models import SoundcloudTrack
+from windchimes.common.api_clients.soundcloud.models import (
+    SoundcloudPlaylist,
+    SoundcloudTrack,
+)
 from windchimes.core.errors.external_platforms import (
     ExternalPlatformAudioFetchingError,
 )
@@ -14,7 +17,10 @@ from windchimes.core.models.external_playlist import (
     ExternalPlaylistInfo,
 )
 from windchimes.core.models.track import LoadedTrack, TrackReferenceSchema
-from windchimes.core.services.external_platforms import ExternalPlatformService
+from windchimes.core.services.external_platforms import (
+    ExternalPlatformService,
+    get_track_references_fingerprint,
+)
 
 
 logger = logging.getLogger()
@@ -47,15 +53,11 @@ class SoundcloudService(ExternalPlatformService):
         suitable_format_url = audio_file_endpoint_url
 
         if suitable_format_url is None:
-            found_tracks = await self.soundcloud_api_client.get_tracks_by_ids(
+            # missing track comes back as `None` in its place
+            (track,) = await self.soundcloud_api_client.get_tracks_by_ids(
                 [int(track_platform_id)]
             )
 
-            if len(found_tracks) == 0:
-                return None
-
-            track = found_tracks[0]
-
             if track is None:
                 return None
 
@@ -85,26 +87,30 @@ class SoundcloudService(ExternalPlatformService):
             logger.error(str(error))
             return None
 
+        track_references = self._get_playlist_track_references(soundcloud_playlist)
+
         return ExternalPlaylistInfo(
             external_platform_id=str(soundcloud_playlist.id),
             name=soundcloud_playlist.title,
             description=soundcloud_playlist.description,
             picture_url=soundcloud_playlist.artwork_url,
-            track_references=[
-                TrackReferenceSchema(
-                    id=f"{Platform.SOUNDCLOUD.value}/{track['id']}",
-                    platform_id=str(track["id"]),
-                    platform=Platform.SOUNDCLOUD,
-                )
-                for track in soundcloud_playlist.tracks
-            ],
+            track_references=track_references,
             original_page_url=soundcloud_playlist.permalink_url,
             soundcloud_secret_token=soundcloud_playlist.secret_token,
+            content_fingerprint=self._get_playlist_content_fingerprint(
+                soundcloud_playlist, track_references
+            ),
         )
 
     async def get_playlist_by_id(
-        self, playlist_id, platform_specific_params: PlatformSpecificParams
+        self,
+        playlist_id,
+        platform_specific_params: PlatformSpecificParams,
+        known_content_fingerprint=None,
     ):
+        # Soundcloud doesn't support conditional requests, so the playlist is
+        # always fetched and `known_content_fingerprint` is not used
+
         try:
             soundcloud_playlist = await self.soundcloud_api_client.get_playlist_by_id(
                 playlist_id,
@@ -118,20 +124,18 @@ class SoundcloudService(ExternalPlatformService):
             logger.error(str(error))
             return None
 
+        track_references = self._get_playlist_track_references(soundcloud_playlist)
+
         return ExternalPlaylistInfo(
             external_platform_id=str(soundcloud_playlist.id),
             name=soundcloud_playlist.title,
             description=soundcloud_playlist.description,
             picture_url=soundcloud_playlist.artwork_url,
-            track_references=[
-                TrackReferenceSchema(
-                    id=f"{Platform.SOUNDCLOUD.value}/{track['id']}",
-                    platform_id=str(track["id"]),
-                    platform=Platform.SOUNDCLOUD,
-                )
-                for track in soundcloud_playlist.tracks
-            ],
+            track_references=track_references,
             original_page_url=soundcloud_playlist.permalink_url,
+            content_fingerprint=self._get_playlist_content_fingerprint(
+                soundcloud_playlist, track_references
+            ),
         )
 
     async def search_tracks(self, search_query):
@@ -144,6 +148,29 @@ class SoundcloudService(ExternalPlatformService):
             for track in tracks
         ]
 
+    def _get_playlist_track_references(self, soundcloud_playlist: SoundcloudPlaylist):
+        return [
+            TrackReferenceSchema(
+                id=f"{Platform.SOUNDCLOUD.value}/{track['id']}",
+                platform_id=str(track["id"]),
+                platform=Platform.SOUNDCLOUD,
+            )
+            for track in soundcloud_playlist.tracks
+        ]
+
+    def _get_playlist_content_fingerprint(
+        self,
+        soundcloud_playlist: SoundcloudPlaylist,
+        track_references: list[TrackReferenceSchema],
+    ):
+        # `last_modified` alone is not trusted to change on tracks reordering
+        return "|".join(
+            [
+                soundcloud_playlist.last_modified or "",
+                get_track_references_fingerprint(track_references),
+            ]
+        )
+
     def _get_suitable_format_url(self, track_transcodings: list[dict]):
         suitable_formats = [
             transcoding
@@ -1,15 +1,24 @@
+import asyncio
 import logging
-import re
+from typing import AsyncIterator, Optional, cast
 import urllib.parse
 
 from windchimes.common.api_clients.youtube_data_api.models import YoutubeVideo
+from windchimes.common.api_clients.youtube_data_api.quota_ledger import (
+    YoutubeQuotaExceededError,
+    YoutubeQuotaPriority,
+)
 from windchimes.common.api_clients.youtube_data_api.youtube_data_api_client import (
-    MAX_YOUTUBE_TRACKS_PER_REQUEST,
     YoutubeDataApiClient,
+    YoutubePlaylistVideosResult,
 )
 from windchimes.common.api_clients.youtube_internal_api.youtube_internal_api_client import (
     YoutubeInternalApiClient,
 )
+from windchimes.common.utils.durations import parse_iso8601_duration
+from windchimes.core.errors.external_platforms import (
+    ExternalPlaylistNotModifiedError,
+)
 from windchimes.core.models.platform import Platform
 from windchimes.core.models.external_playlist import (
     ExternalPlaylistInfo,
@@ -18,11 +27,14 @@ from windchimes.core.models.platform_specific_params import (
     PlatformSpecificParams,
 )
 from windchimes.core.models.track import LoadedTrack, TrackReferenceSchema
-from windchimes.core.services.external_platforms import ExternalPlatformService
+from windchimes.core.services.external_platforms import (
+    ExternalPlatformService,
+    get_track_references_fingerprint,
+)
 
 
-MAX_YOUTUBE_TRACKS_REQUESTS = 4
 _YOUTUBE_PLAYLIST_PAGE_BASE_URL = "https://youtube.com/playlist"
+_ETAG_FINGERPRINT_PREFIX = "etag:"
 
 
 logger = logging.getLogger()
@@ -33,16 +45,40 @@ class YoutubeService(ExternalPlatformService):
         self,
         youtube_data_api_client: YoutubeDataApiClient,
         youtube_internal_api_client: YoutubeInternalApiClient,
+        max_playlist_pages: int,
     ):
+        """
+        Args:
+            max_playlist_pages: max pages of 50 videos fetched from one playlist.
+                Each page costs a unit of Youtube Data API quota
+        """
+
         self.youtube_data_api_client = youtube_data_api_client
         self.youtube_internal_api_client = youtube_internal_api_client
+        self.max_playlist_pages = max_playlist_pages
+
+    @property
+    def single_flight_key(self):
+        # a call of the background service could be refused by the quota or
+        # return a playlist truncated at its pages cap
+        return (
+            self.max_playlist_pages,
+            self.youtube_data_api_client.quota_priority,
+        )
 
     async def load_tracks(self, tracks_to_load):
+        return await self._load_tracks(tracks_to_load)
+
+    async def _load_tracks(
+        self,
+        tracks_to_load: list[TrackReferenceSchema],
+        quota_priority: Optional[YoutubeQuotaPriority] = None,
+    ):
         tracks_ids = [track.id for track in tracks_to_load]
         platform_ids = [track.platform_id for track in tracks_to_load]
 
         youtube_tracks = await self.youtube_data_api_client.get_videos_by_ids(
-            platform_ids
+            platform_ids, quota_priority
         )
 
         return [
@@ -68,25 +104,60 @@ class YoutubeService(ExternalPlatformService):
         )
 
     async def get_playlist_by_url(self, url: str):
-        playlist_id_query_param = urllib.parse.parse_qs(
-            urllib.parse.urlparse(url).query
-        ).get("list")
+        playlist_id = self._get_playlist_id_from_url(url)
 
-        if playlist_id_query_param is None:
+        if playlist_id is None:
             return None
 
         return await self.get_playlist_by_id(
-            playlist_id_query_param[0],
+            playlist_id,
             PlatformSpecificParams(),  # There aren't any Youtube-specific params
         )
 
-    async def get_playlist_by_id(self, playlist_id, platform_specific_params):
+    async def iterate_playlist_tracks_pages_by_url(self, url: str):
+        playlist_id = self._get_playlist_id_from_url(url)
+
+        if playlist_id is None:
+            return
+
+        # playlist items of a missing playlist are an error, not an empty page
+        youtube_playlist = await self.youtube_data_api_client.get_playlist_by_id(
+            playlist_id
+        )
+
+        if youtube_playlist is None:
+            return
+
+        async for videos_page in self._iterate_playlist_videos_pages(playlist_id):
+            yield self._convert_to_track_references(videos_page)
+
+    async def get_playlist_by_id(
+        self, playlist_id, platform_specific_params, known_content_fingerprint=None
+    ):
         logger.info(
             "Fetching Youtube playlist with id %s. Platform-specific params: %s",
             playlist_id,
             str(platform_specific_params),
         )
 
+        first_videos_page = None
+
+        if (
+            known_content_fingerprint is not None
+            and known_content_fingerprint.startswith(_ETAG_FINGERPRINT_PREFIX)
+        ):
+            first_videos_page = (
+                await self.youtube_data_api_client.get_playlist_videos_portion(
+                    playlist_id,
+                    if_none_match=known_content_fingerprint.removeprefix(
+                        _ETAG_FINGERPRINT_PREFIX
+                    ),
+                )
+            )
+
+            if first_videos_page is None:
+                raise ExternalPlaylistNotModifiedError()
+
         youtube_playlist = await self.youtube_data_api_client.get_playlist_by_id(
             playlist_id
         )
@@ -94,7 +165,21 @@ class YoutubeService(ExternalPlatformService):
         if youtube_playlist is None:
             return None
 
-        tracks_references = await self._fetch_all_videos_as_tracks(playlist_id)
+        tracks_references: list[TrackReferenceSchema] = []
+        videos_pages: list[YoutubePlaylistVideosResult] = []
+
+        async for videos_page in self._iterate_playlist_videos_pages(
+            playlist_id, first_videos_page
+        ):
+            videos_pages.append(videos_page)
+            tracks_references.extend(self._convert_to_track_references(videos_page))
+
+        # etag of the only page covers the whole playlist, so it can be used for
+        # conditional requests. Otherwise changes on other pages would be missed
+        if len(videos_pages) == 1 and videos_pages[0].etag is not None:
+            content_fingerprint = _ETAG_FINGERPRINT_PREFIX + videos_pages[0].etag
+        else:
+            content_fingerprint = get_track_references_fingerprint(tracks_references)
 
         return ExternalPlaylistInfo(
             external_platform_id=youtube_playlist.id,
@@ -104,8 +189,19 @@ class YoutubeService(ExternalPlatformService):
             track_references=tracks_references,
             original_page_url=_YOUTUBE_PLAYLIST_PAGE_BASE_URL
             + f"?list={youtube_playlist.id}",
+            content_fingerprint=content_fingerprint,
         )
 
+    def _get_playlist_id_from_url(self, url: str):
+        playlist_id_query_param = urllib.parse.parse_qs(
+            urllib.parse.urlparse(url).query
+        ).get("list")
+
+        if playlist_id_query_param is None:
+            return None
+
+        return playlist_id_query_param[0]
+
     async def search_tracks(self, search_query):
         found_videos_ids = (
             await self.youtube_internal_api_client.search_videos_and_get_ids(
@@ -113,122 +209,129 @@ class YoutubeService(ExternalPlatformService):
             )
         )
 
-        loaded_tracks = await self.load_tracks(
-            [
-                TrackReferenceSchema(
-                    id=f"{Platform.YOUTUBE}/{video_id}",
-                    platform=Platform.YOUTUBE,
-                    platform_id=video_id,
-                )
-                for video_id in found_videos_ids
-            ]
-        )
+        # search works without the quota, only loading of the found videos data
+        # spends it, so it's the first to give up when the quota runs low
+        try:
+            loaded_tracks = await self._load_tracks(
+                [
+                    TrackReferenceSchema(
+                        id=f"{Platform.YOUTUBE}/{video_id}",
+                        platform=Platform.YOUTUBE,
+                        platform_id=video_id,
+                    )
+                    for video_id in found_videos_ids
+                ],
+                YoutubeQuotaPriority.BACKGROUND,
+            )
+        except YoutubeQuotaExceededError as error:
+            logger.warning("Youtube search results are not loaded: %s", error)
+            return []
 
         return loaded_tracks
 
-    async def _fetch_all_videos_as_tracks(self, playlist_id: str):
+    async def _iterate_playlist_videos_pages(
+        self,
+        playlist_id: str,
+        first_page: Optional[YoutubePlaylistVideosResult] = None,
+    ) -> AsyncIterator[YoutubePlaylistVideosResult]:
+        """Yields pages of up to 50 playlist videos (maximum per request)
+
+        Pages are chained by tokens, so they can't be requested concurrently.
+        Instead, the next page is requested right before yielding the current one
+        and arrives while the caller processes it. At most `max_playlist_pages`
+        pages are fetched to limit the spent quota
+
+        Args:
+            first_page: already fetched first page, it's not requested again
         """
-        fetches all playlist videos by sending a request for each 50
-        videos (maximum per request)
 
-        the maximum of 200 (4 requests for 50 requests) is set to prevent spending
-        quota
-        """
+        quota_units_spent_before = self.youtube_data_api_client.quota_units_spent
 
-        current_page = {"token": None, "number": 1, "total": None}
+        page = first_page or await self._fetch_playlist_videos_page(playlist_id)
+        pages_count = 1
 
-        tracks_references = []
+        next_page_task: Optional[asyncio.Task[YoutubePlaylistVideosResult]] = None
 
-        while current_page["number"] <= MAX_YOUTUBE_TRACKS_REQUESTS:
-            logger.info(
-                "fetching videos page %s of playlist %s. total videos: %s, "
-                + "page token: %s",
-                current_page["number"],
-                playlist_id,
-                current_page["total"] or "unknown",
-                current_page["token"] or "missing",
-            )
+        try:
+            while True:
+                has_next_page = page.next_page_token is not None
+                is_page_cap_reached = pages_count >= self.max_playlist_pages
 
-            tracks_fetched_count = (
-                current_page["number"] * MAX_YOUTUBE_TRACKS_PER_REQUEST
-            )
+                if has_next_page and not is_page_cap_reached:
+                    next_page_task = asyncio.create_task(
+                        self._fetch_playlist_videos_page(
+                            playlist_id, page.next_page_token
+                        )
+                    )
 
-            if (
-                current_page["total"] is not None
-                and tracks_fetched_count >= current_page["total"]
-            ):
-                break
+                yield page
 
-            youtube_videos_result = (
-                await self.youtube_data_api_client.get_playlist_videos_portion(
-                    playlist_id, current_page["token"]
-                )
-            )
+                if next_page_task is None:
+                    break
 
-            tracks_references.extend(
-                [
-                    TrackReferenceSchema(
-                        id=f"{Platform.YOUTUBE.value}/{video.content_details.video_id}",
-                        platform_id=video.content_details.video_id,
-                        platform=Platform.YOUTUBE,
-                    )
-                    for video in youtube_videos_result.items
-                ]
+                page = await next_page_task
+                next_page_task = None
+                pages_count += 1
+        finally:
+            # the caller stopped consuming the pages early
+            if next_page_task is not None:
+                next_page_task.cancel()
+
+        if has_next_page:
+            logger.warning(
+                "Youtube playlist %s has more than %s pages of videos (%s videos "
+                + "in total), the rest are not fetched",
+                playlist_id,
+                self.max_playlist_pages,
+                page.page_info.total_results,
             )
 
-            # completes the execution if there is only one page of videos
-            if youtube_videos_result.next_page_token is None:
-                break
+        logger.info(
+            "Fetched %s pages of videos of Youtube playlist %s, %s quota units spent",
+            pages_count,
+            playlist_id,
+            self.youtube_data_api_client.quota_units_spent - quota_units_spent_before,
+        )
+
+    async def _fetch_playlist_videos_page(
+        self, playlist_id: str, page_token: Optional[str] = None
+    ):
+        logger.info(
+            "fetching videos page of playlist %s. page token: %s",
+            playlist_id,
+            page_token or "missing",
+        )
 
-            current_page["total"] = youtube_videos_result.page_info.total_results
-            current_page["token"] = youtube_videos_result.next_page_token
-            current_page["number"] = current_page["number"] + 1
+        # not conditional, so it's never `None`
+        return cast(
+            YoutubePlaylistVideosResult,
+            await self.youtube_data_api_client.get_playlist_videos_portion(
+                playlist_id, page_token
+            ),
+        )
 
-        return tracks_references
+    def _convert_to_track_references(
+        self, videos_page: YoutubePlaylistVideosResult
+    ) -> list[TrackReferenceSchema]:
+        return [
+            TrackReferenceSchema(
+                id=f"{Platform.YOUTUBE.value}/{video.content_details.video_id}",
+                platform_id=video.content_details.video_id,
+                platform=Platform.YOUTUBE,
+            )
+            for video in videos_page.items
+        ]
 
     def _convert_to_multi_platform_track(
         self, resource_to_convert: YoutubeVideo, track_id: str
     ):
         duration_string: str = resource_to_convert.content_details.duration
 
-        seconds_symbol_index = duration_string.find("S")
-        seconds = (
-            int(
-                re.sub(
-                    r"[^0-9]",
-                    "",
-                    duration_string[seconds_symbol_index - 2 : seconds_symbol_index],
-                )
-            )
-            if seconds_symbol_index != -1
-            else 0
-        )
-
-        minutes_symbol_index = duration_string.find("M")
-        minutes = (
-            int(
-                re.sub(
-                    r"[^0-9]",
-                    "",
-                    duration_string[minutes_symbol_index - 2 : minutes_symbol_index],
-                )
-            )
-            if minutes_symbol_index != -1
-            else 0
-        )
-
-        hours_symbol_index = duration_string.find("H")
-        hours = (
-            int(
-                re.sub(
-                    r"[^0-9]",
-                    "",
-                    duration_string[hours_symbol_index - 2 : hours_symbol_index],
-                )
-            )
-            if hours_symbol_index != -1
-            else 0
-        )
+        try:
+            seconds_duration = round(parse_iso8601_duration(duration_string))
+        except ValueError as error:
+            logger.warning("Youtube video %s: %s", resource_to_convert.id, error)
+            seconds_duration = 0
 
         return LoadedTrack.model_validate(
             dict(
@@ -239,7 +342,7 @@ class YoutubeService(ExternalPlatformService):
                 description=resource_to_convert.snippet.description,
                 likes_count=None,
                 picture_url=resource_to_convert.snippet.thumbnails["default"]["url"],
-                seconds_duration=seconds + minutes * 60 + hours * 60 * 60,
+                seconds_duration=seconds_duration,
                 original_page_url=f"https://youtube.com/watch?v={resource_to_convert.id}",
                 audio_file_endpoint_url=None,
                 owner={"name": resource_to_convert.snippet.channel_title},
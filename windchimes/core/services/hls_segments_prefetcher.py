@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+from windchimes.common.utils.user_agent import WINDOWS_CHROME_USER_AGENT
+from windchimes.core.stores.hls_disk_cache import (
+    HlsDiskCache,
+    get_youtube_cdn_resource_cache_key,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+_CHUNK_SIZE_BYTES = 64 * 1024
+
+
+@dataclass()
+class _HlsStream:
+    segment_urls: list[str]
+    segment_keys: list[str]
+    semaphore: asyncio.Semaphore
+    last_activity_at: float
+
+    prefetch_tasks_by_segment_key: dict[str, asyncio.Task] = field(default_factory=dict)
+    started_segment_keys: set[str] = field(default_factory=set)
+    """Segments whose prefetching got past the semaphore of the stream"""
+
+
+class HlsSegmentsPrefetcher:
+    """Warms up `HlsDiskCache` with upcoming segments of HLS streams
+
+    Segment urls are taken from manifests passed through the proxy. When a
+    segment is requested, next ones are downloaded in the background, so the
+    player doesn't stall waiting for them. Prefetching of a stream stops when its
+    segments are not requested for a while (listener went away)
+
+    Streams are tracked per process, so segments requested from other app
+    processes don't trigger prefetching here
+    """
+
+    def __init__(
+        self,
+        httpx_client: httpx.AsyncClient,
+        hls_disk_cache: HlsDiskCache,
+        segments_count: int,
+        max_concurrent_requests_per_stream: int,
+        listener_idle_timeout_seconds: float,
+    ):
+        """
+        Args:
+            segments_count: how many segments after the requested one to prefetch
+            listener_idle_timeout_seconds: stream is forgotten and its prefetching
+                is stopped when none of its segments are requested for this long
+        """
+
+        self.httpx_client = httpx_client
+        self.hls_disk_cache = hls_disk_cache
+        self.segments_count = segments_count
+        self.max_concurrent_requests_per_stream = max_concurrent_requests_per_stream
+        self.listener_idle_timeout_seconds = listener_idle_timeout_seconds
+
+        self._streams_by_manifest_key: dict[str, _HlsStream] = {}
+        self._streams_by_segment_key: dict[str, tuple[_HlsStream, int]] = {}
+
+    def register_manifest(self, manifest_key: str, segment_urls: list[str]):
+        """Starts tracking the stream and prefetches its first segments"""
+
+        self._forget_idle_streams()
+
+        stream = self._streams_by_manifest_key.get(manifest_key)
+
+        if stream is None:
+            segment_keys_and_urls = [
+                (segment_key, segment_url)
+                for segment_url in segment_urls
+                if (segment_key := get_youtube_cdn_resource_cache_key(segment_url))
+                is not None
+            ]
+
+            stream = _HlsStream(
+                segment_urls=[segment_url for _, segment_url in segment_keys_and_urls],
+                segment_keys=[segment_key for segment_key, _ in segment_keys_and_urls],
+                semaphore=asyncio.Semaphore(self.max_concurrent_requests_per_stream),
+                last_activity_at=time.monotonic(),
+            )
+
+            self._streams_by_manifest_key[manifest_key] = stream
+
+            for segment_index, segment_key in enumerate(stream.segment_keys):
+                self._streams_by_segment_key[segment_key] = (stream, segment_index)
+
+        stream.last_activity_at = time.monotonic()
+        self._schedule_prefetch(stream, first_segment_index=0)
+
+    def on_segment_requested(self, segment_key: str):
+        """Prefetches segments following the requested one"""
+
+        self._forget_idle_streams()
+
+        stream_and_segment_index = self._streams_by_segment_key.get(segment_key)
+
+        if stream_and_segment_index is None:
+            return
+
+        stream, segment_index = stream_and_segment_index
+
+        stream.last_activity_at = time.monotonic()
+        self._schedule_prefetch(stream, first_segment_index=segment_index + 1)
+
+    async def wait_for_prefetch(self, segment_key: str):
+        """Waits until the segment prefetching finishes, if the segment is being
+        downloaded, so it's downloaded only once
+
+        Never raises prefetching errors, the segment is fetched directly if it's
+        not in the cache after the wait. Prefetching that didn't start yet, queued
+        behind other segments of the stream, is cancelled instead of waited for
+        """
+
+        stream_and_segment_index = self._streams_by_segment_key.get(segment_key)
+
+        if stream_and_segment_index is None:
+            return
+
+        stream, _ = stream_and_segment_index
+        prefetch_task = stream.prefetch_tasks_by_segment_key.get(segment_key)
+
+        if prefetch_task is None or prefetch_task.done():
+            return
+
+        if segment_key not in stream.started_segment_keys:
+            prefetch_task.cancel()
+            del stream.prefetch_tasks_by_segment_key[segment_key]
+            return
+
+        # unlike awaiting the task, doesn't raise its errors or cancellation and
+        # doesn't cancel prefetching when the listener disconnects
+        await asyncio.wait([prefetch_task])
+
+    def close(self):
+        for stream in self._streams_by_manifest_key.values():
+            self._cancel_prefetch_tasks(stream)
+
+        self._streams_by_manifest_key.clear()
+        self._streams_by_segment_key.clear()
+
+    def _schedule_prefetch(self, stream: _HlsStream, first_segment_index: int):
+        for segment_index in range(
+            first_segment_index,
+            min(first_segment_index + self.segments_count, len(stream.segment_keys)),
+        ):
+            segment_key = stream.segment_keys[segment_index]
+
+            if segment_key in stream.prefetch_tasks_by_segment_key:
+                continue
+
+            stream.prefetch_tasks_by_segment_key[segment_key] = asyncio.create_task(
+                self._prefetch_segment(
+                    stream, segment_key, stream.segment_urls[segment_index]
+                )
+            )
+
+    async def _prefetch_segment(
+        self, stream: _HlsStream, segment_key: str, segment_url: str
+    ):
+        async with stream.semaphore:
+            stream.started_segment_keys.add(segment_key)
+
+            if self._is_stream_idle(stream):
+                return
+
+            cache_writer = self.hls_disk_cache.open_segment_writer(segment_key)
+            is_body_complete = False
+
+            try:
+                if await self.hls_disk_cache.get_segment_file(segment_key) is not None:
+                    return
+
+                async with self.httpx_client.stream(
+                    url=segment_url,
+                    method="GET",
+                    headers={"Accept": "*/*", "User-Agent": WINDOWS_CHROME_USER_AGENT},
+                    follow_redirects=True,
+                ) as response:
+                    if (
+                        response.status_code != 200
+                        or "application/octet-stream"
+                        not in response.headers.get("Content-Type", "")
+                        or "Content-Encoding" in response.headers
+                    ):
+                        return
+
+                    async for chunk in response.aiter_raw(_CHUNK_SIZE_BYTES):
+                        await cache_writer.write(chunk)
+
+                    expected_size_bytes = response.headers.get("Content-Length")
+                    is_body_complete = (
+                        expected_size_bytes is None
+                        or str(cache_writer.size_bytes) == expected_size_bytes
+                    )
+
+                logger.info("Prefetched HLS segment: %s", segment_url)
+            except Exception as error:
+                # e.g. network or disk errors, the segment is fetched directly then
+                is_body_complete = False
+                logger.warning("Failed to prefetch HLS segment: %s", error)
+            finally:
+                # also runs on cancellation, so temporary files are not left over
+                try:
+                    if is_body_complete:
+                        await cache_writer.commit()
+                    else:
+                        await cache_writer.discard()
+                except OSError as error:
+                    logger.warning("Failed to save prefetched HLS segment: %s", error)
+
+    def _is_stream_idle(self, stream: _HlsStream):
+        return (
+            time.monotonic() - stream.last_activity_at
+            > self.listener_idle_timeout_seconds
+        )
+
+    def _forget_idle_streams(self):
+        idle_streams_manifest_keys = [
+            manifest_key
+            for manifest_key, stream in self._streams_by_manifest_key.items()
+            if self._is_stream_idle(stream)
+        ]
+
+        for manifest_key in idle_streams_manifest_keys:
+            stream = self._streams_by_manifest_key.pop(manifest_key)
+            self._cancel_prefetch_tasks(stream)
+
+            for segment_key in stream.segment_keys:
+                # the same segment can belong to a newer stream of the same track
+                stream_and_segment_index = self._streams_by_segment_key.get(segment_key)
+
+                if (
+                    stream_and_segment_index is not None
+                    and stream_and_segment_index[0] is stream
+                ):
+                    del self._streams_by_segment_key[segment_key]
+
+    def _cancel_prefetch_tasks(self, stream: _HlsStream):
+        for prefetch_task in stream.prefetch_tasks_by_segment_key.values():
+            prefetch_task.cancel()
@@ -3,10 +3,21 @@ from typing import Annotated, Optional
 import timeit
 
 from annotated_types import Len
-from pydantic import BaseModel
-from sqlalchemy import and_, delete, desc, not_, select, update
+from pydantic import BaseModel, field_validator, model_validator
+from sqlalchemy import (
+    and_,
+    delete,
+    desc,
+    exists,
+    literal,
+    not_,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
-from sqlalchemy.sql import functions
 
 from windchimes.core.database import Database
 from windchimes.core.database.models.playlist import Playlist, PlaylistTrack
@@ -18,11 +29,26 @@ from windchimes.core.models.playlist import (
     PlaylistDetailed,
 )
 from windchimes.core.models.track import TrackReferenceSchema
+from windchimes.core.services.playlists.pagination import decode_playlists_cursor
+from windchimes.core.services.playlists.track_count import (
+    change_playlists_track_count,
+    count_tracks_by_playlist,
+)
+from windchimes.core.services.playlists.track_positions import (
+    get_appended_track_positions,
+    get_playlists_last_track_positions,
+    move_playlist_tracks,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+class PlaylistsViewer(BaseModel):
+    user_id: Optional[str] = None
+    """`None` for anonymous users, who can view only public playlists"""
+
+
 class PlaylistsFilters(BaseModel):
     owner_user_id: Optional[str] = None
     exclude_owner_user_id: Optional[str] = None
@@ -40,6 +66,18 @@ class PlaylistsFilters(BaseModel):
     specified id are included in the output
     """
 
+    after_cursor: Optional[str] = None
+    """
+    If specified, only the playlists that go after the playlist with this cursor
+    in the feed are included in the output. See `encode_playlists_cursor`
+    """
+
+    viewable_by: Optional[PlaylistsViewer] = None
+    """
+    If specified, ONLY the public playlists and the playlists owned by the viewer
+    are included in the output
+    """
+
 
 class PlaylistUpdate(BaseModel):
     name: Optional[str] = None
@@ -69,62 +107,121 @@ class TrackToDeleteFromPlaylists(BaseModel):
     playlists_ids: Annotated[list[int], Len(min_length=1)]
 
 
+class PlaylistTracksToMove(BaseModel):
+    playlist_id: int
+    tracks_ids: Annotated[list[str], Len(min_length=1, max_length=1000)]
+    after_track_id: Optional[str] = None
+
+    @field_validator("tracks_ids")
+    @classmethod
+    def _check_tracks_ids_are_unique(cls, tracks_ids: list[str]):
+        if len(set(tracks_ids)) != len(tracks_ids):
+            raise ValueError("Tracks ids must be unique")
+
+        return tracks_ids
+
+    @model_validator(mode="after")
+    def _check_tracks_are_not_moved_after_themselves(self):
+        if self.after_track_id in self.tracks_ids:
+            raise ValueError("Tracks can't be moved after one of themselves")
+
+        return self
+
+
+def _playlist_contains_track(track_id: str):
+    # checks only the association table, so the check is a single lookup in its
+    # `(track_id, playlist_id)` index
+    return exists().where(
+        PlaylistTrack.playlist_id == Playlist.id, PlaylistTrack.track_id == track_id
+    )
+
+
+def build_playlists_statement(
+    filters: PlaylistsFilters = PlaylistsFilters(), limit: Optional[int] = None
+):
+    """Builds the playlists feed query, see `PlaylistsService.get_playlists`
+
+    Raises:
+        InvalidPlaylistsCursorError: if `filters.after_cursor` is malformed
+    """
+
+    statement = select(Playlist)
+
+    if filters.exclude_owner_user_id is not None:
+        statement = statement.where(
+            Playlist.owner_user_id != filters.exclude_owner_user_id
+        )
+
+    if filters.owner_user_id is not None:
+        statement = statement.where(Playlist.owner_user_id == filters.owner_user_id)
+
+    if filters.ids is not None:
+        statement = statement.where(Playlist.id.in_(filters.ids))
+
+    if filters.containing_track_reference_id is not None:
+        statement = statement.where(
+            _playlist_contains_track(filters.containing_track_reference_id)
+        )
+
+    if filters.exclude_containing_track_reference_id is not None:
+        statement = statement.where(
+            not_(
+                _playlist_contains_track(filters.exclude_containing_track_reference_id)
+            )
+        )
+
+    if filters.viewable_by is not None:
+        # filtered in the query, not after it, so pages are not cut short by
+        # the playlists the user can't view
+        statement = statement.where(
+            or_(
+                Playlist.publicly_available,
+                Playlist.owner_user_id == filters.viewable_by.user_id,
+            )
+            if filters.viewable_by.user_id is not None
+            else Playlist.publicly_available
+        )
+
+    if filters.after_cursor is not None:
+        cursor_created_at, cursor_playlist_id = decode_playlists_cursor(
+            filters.after_cursor
+        )
+
+        # keyset pagination, uses the index instead of skipping rows,
+        # so deep pages cost the same as the first one
+        statement = statement.where(
+            tuple_(Playlist.created_at, Playlist.id)
+            < tuple_(literal(cursor_created_at), literal(cursor_playlist_id))
+        )
+
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    # id makes the order stable for playlists created at the same time
+    statement = statement.order_by(desc(Playlist.created_at), desc(Playlist.id))
+
+    return statement
+
+
 class PlaylistsService:
     def __init__(self, database: Database):
         self._database = database
 
-    # TODO: optimize, do not query all of playlists' tracks just to count them
     async def get_playlists(
         self,
         filters: PlaylistsFilters = PlaylistsFilters(),
         limit: Optional[int] = None,
     ):
-        async with self._database.create_session() as database_session:
-            start_time_seconds = timeit.default_timer()
-
-            statement = (
-                select(
-                    Playlist,
-                    functions.count(PlaylistTrack.playlist_id).label("track_count"),
-                )
-                .outerjoin(PlaylistTrack)
-                .group_by(Playlist.id)
-            )
-
-            if filters.exclude_owner_user_id is not None:
-                statement = statement.where(
-                    Playlist.owner_user_id != filters.exclude_owner_user_id
-                )
-
-            if filters.owner_user_id is not None:
-                statement = statement.where(
-                    Playlist.owner_user_id == filters.owner_user_id
-                )
-
-            if filters.ids is not None:
-                statement = statement.where(Playlist.id.in_(filters.ids))
-
-            if filters.containing_track_reference_id is not None:
-                statement = statement.where(
-                    Playlist.track_references.any(
-                        TrackReference.id == filters.containing_track_reference_id
-                    )
-                )
+        """Fetches playlists feed, newest first
 
-            if filters.exclude_containing_track_reference_id is not None:
-                statement = statement.where(
-                    not_(
-                        Playlist.track_references.any(
-                            TrackReference.id
-                            == filters.exclude_containing_track_reference_id
-                        )
-                    )
-                )
+        Raises:
+            InvalidPlaylistsCursorError: if `filters.after_cursor` is malformed
+        """
 
-            if limit is not None:
-                statement = statement.limit(limit)
+        async with self._database.create_session() as database_session:
+            start_time_seconds = timeit.default_timer()
 
-            statement = statement.order_by(desc(Playlist.created_at))
+            statement = build_playlists_statement(filters, limit)
 
             playlists_result = await database_session.execute(statement)
 
@@ -134,22 +231,31 @@ class PlaylistsService:
             )
 
             return [
-                PlaylistToReadWithTrackCount(
-                    **vars(playlist_and_track_count[0]),
-                    track_count=playlist_and_track_count[1],
-                )
-                for playlist_and_track_count in playlists_result.unique().all()
+                PlaylistToReadWithTrackCount.model_validate(vars(playlist))
+                for playlist in playlists_result.scalars().all()
             ]
 
-    async def get_playlist_detailed(self, playlist_id: int):
+    async def get_playlist_detailed(
+        self,
+        playlist_id: int,
+        track_references_offset: int = 0,
+        track_references_limit: Optional[int] = None,
+    ):
+        """Fetches playlist with a window of its track references
+
+        Only the window is read from the database, so the cost doesn't depend on
+        the playlist size. Total number of tracks is in `track_count`
+
+        Args:
+            track_references_limit: size of the window. If `None`, all the track
+                references starting from `track_references_offset` are included
+        """
+
         async with self._database.create_session() as database_session:
             playlist = await database_session.get(
                 Playlist,
                 playlist_id,
-                options=[
-                    joinedload(Playlist.track_references),
-                    joinedload(Playlist.external_playlist_to_sync_with),
-                ],
+                options=[joinedload(Playlist.external_playlist_to_sync_with)],
             )
 
             if playlist is None:
@@ -163,18 +269,72 @@ class PlaylistsService:
                 else None
             )
 
+            track_references = await self._get_playlist_track_references(
+                database_session,
+                playlist_id,
+                offset=track_references_offset,
+                limit=track_references_limit,
+            )
+
             return PlaylistDetailed.model_validate(
                 {
                     **vars(playlist),
                     "external_playlist_to_sync_with": external_playlist_to_sync_with,
-                    "track_count": len(playlist.track_references),
-                    "track_references": [
-                        TrackReferenceSchema.model_validate(vars(track_reference))
-                        for track_reference in playlist.track_references
-                    ],
+                    "track_references": track_references,
                 }
             )
 
+    async def get_playlist_track_references(
+        self,
+        playlist_id: int,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        ids: Optional[list[str]] = None,
+    ):
+        """
+        Args:
+            ids: if specified, only track references with these ids are included
+
+        Returns:
+            Track references of the playlist, in the playlist order
+        """
+
+        async with self._database.create_session() as database_session:
+            return await self._get_playlist_track_references(
+                database_session, playlist_id, offset, limit, ids
+            )
+
+    async def _get_playlist_track_references(
+        self,
+        database_session: AsyncSession,
+        playlist_id: int,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        ids: Optional[list[str]] = None,
+    ):
+        # plain columns are selected instead of ORM entities, as hydrating
+        # thousands of them is expensive
+        statement = (
+            select(
+                TrackReference.id, TrackReference.platform, TrackReference.platform_id
+            )
+            .join(PlaylistTrack, PlaylistTrack.track_id == TrackReference.id)
+            .where(PlaylistTrack.playlist_id == playlist_id)
+            .order_by(PlaylistTrack.position, PlaylistTrack.track_id)
+            .offset(offset)
+            .limit(limit)
+        )
+
+        if ids is not None:
+            statement = statement.where(TrackReference.id.in_(ids))
+
+        result = await database_session.execute(statement)
+
+        return [
+            TrackReferenceSchema.model_validate(dict(row._mapping))
+            for row in result.all()
+        ]
+
     async def create_playlist(self, playlist: PlaylistToCreate, owner_user_id: str):
         async with self._database.create_session() as database_session:
             new_playlist = Playlist(
@@ -183,9 +343,7 @@ class PlaylistsService:
             database_session.add(new_playlist)
             await database_session.commit()
 
-            return PlaylistDetailed(
-                **vars(new_playlist), track_count=0, track_references=[]
-            )
+            return PlaylistDetailed(**vars(new_playlist), track_references=[])
 
     # TODO: move to separate `auth/playlists.py` service
     async def delete_playlist(self, playlist_to_delete_id: int, owner_user_id: str):
@@ -260,21 +418,75 @@ class PlaylistsService:
     async def add_tracks_to_playlists(
         self, tracks_to_add_wrapper: TracksToAddToPlaylistsWrapper
     ):
+        """Appends tracks to the end of the playlists, in the specified order"""
+
         async with self._database.create_session() as database_session:
-            new_playlist_tracks_associations: list[PlaylistTrack] = []
+            tracks_ids_by_playlist_id: dict[int, list[str]] = {}
 
             for track in tracks_to_add_wrapper.tracks:
+                for playlist_id in track.playlists_ids_to_add_to:
+                    tracks_ids_by_playlist_id.setdefault(playlist_id, []).append(
+                        track.id
+                    )
+
+            # also locks the playlists rows, so concurrent appends to the same
+            # playlist don't get the same positions
+            await change_playlists_track_count(
+                database_session,
+                {
+                    playlist_id: len(tracks_ids)
+                    for playlist_id, tracks_ids in tracks_ids_by_playlist_id.items()
+                },
+            )
+
+            last_track_positions = await get_playlists_last_track_positions(
+                database_session, list(tracks_ids_by_playlist_id)
+            )
+
+            new_playlist_tracks_associations: list[PlaylistTrack] = []
+
+            for playlist_id, tracks_ids in tracks_ids_by_playlist_id.items():
                 new_playlist_tracks_associations.extend(
-                    [
-                        PlaylistTrack(playlist_id=playlist_id, track_id=track.id)
-                        for playlist_id in track.playlists_ids_to_add_to
-                    ]
+                    PlaylistTrack(
+                        playlist_id=playlist_id, track_id=track_id, position=position
+                    )
+                    for track_id, position in zip(
+                        tracks_ids,
+                        get_appended_track_positions(
+                            last_track_positions.get(playlist_id), len(tracks_ids)
+                        ),
+                    )
                 )
 
             database_session.add_all(new_playlist_tracks_associations)
 
             await database_session.commit()
 
+    async def move_tracks(self, tracks_to_move: PlaylistTracksToMove):
+        """Moves the tracks right after `tracks_to_move.after_track_id` track, in
+        the given order. If it's `None`, the tracks are moved to the beginning
+
+        Raises:
+            PlaylistTrackNotFoundError: if some of the tracks are not in the playlist
+        """
+
+        async with self._database.create_session() as database_session:
+            # serializes concurrent changes of the same playlist tracks order
+            await database_session.execute(
+                select(Playlist.id)
+                .where(Playlist.id == tracks_to_move.playlist_id)
+                .with_for_update()
+            )
+
+            await move_playlist_tracks(
+                database_session,
+                tracks_to_move.playlist_id,
+                tracks_to_move.tracks_ids,
+                tracks_to_move.after_track_id,
+            )
+
+            await database_session.commit()
+
     async def delete_track_from_playlists(
         self, track_to_delete_from_playlists: TrackToDeleteFromPlaylists
     ):
@@ -287,16 +499,32 @@ class PlaylistsService:
         """
 
         async with self._database.create_session() as database_session:
-            statement = delete(PlaylistTrack).where(
-                and_(
-                    PlaylistTrack.playlist_id.in_(
-                        track_to_delete_from_playlists.playlists_ids
-                    ),
-                    PlaylistTrack.track_id == track_to_delete_from_playlists.track_id,
+            statement = (
+                delete(PlaylistTrack)
+                .where(
+                    and_(
+                        PlaylistTrack.playlist_id.in_(
+                            track_to_delete_from_playlists.playlists_ids
+                        ),
+                        PlaylistTrack.track_id
+                        == track_to_delete_from_playlists.track_id,
+                    )
                 )
+                .returning(PlaylistTrack.playlist_id)
+            )
+
+            result = await database_session.execute(statement)
+
+            await change_playlists_track_count(
+                database_session,
+                {
+                    playlist_id: -track_count
+                    for playlist_id, track_count in count_tracks_by_playlist(
+                        result.scalars().all()
+                    ).items()
+                },
             )
 
-            await database_session.execute(statement)
             await database_session.commit()
 
             return track_to_delete_from_playlists.playlists_ids
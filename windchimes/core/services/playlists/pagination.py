@@ -0,0 +1,41 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class InvalidPlaylistsCursorError(ValueError):
+    def __init__(self):
+        super().__init__("Playlists cursor is invalid")
+
+
+def encode_playlists_cursor(created_at: datetime, playlist_id: int):
+    """Creates an opaque cursor pointing to the playlist in the playlists feed
+
+    Feed is ordered by `(created_at, id)`, so the cursor is made of these fields
+    """
+
+    return base64.urlsafe_b64encode(
+        json.dumps([created_at.isoformat(), playlist_id]).encode()
+    ).decode()
+
+
+def decode_playlists_cursor(cursor: str):
+    """
+    Returns:
+        Creation time and id of the playlist the cursor points to
+
+    Raises:
+        InvalidPlaylistsCursorError: if cursor was not created by
+            `encode_playlists_cursor`
+    """
+
+    try:
+        created_at, playlist_id = json.loads(base64.urlsafe_b64decode(cursor))
+
+        if not isinstance(playlist_id, int):
+            raise InvalidPlaylistsCursorError()
+
+        return datetime.fromisoformat(created_at), playlist_id
+    except (binascii.Error, ValueError, TypeError) as error:
+        raise InvalidPlaylistsCursorError() from error
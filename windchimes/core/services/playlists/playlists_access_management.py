@@ -10,6 +10,7 @@ from windchimes.core.models.user import User
 from windchimes.core.services.playlists import (
     PlaylistsFilters,
     PlaylistsService,
+    PlaylistsViewer,
 )
 
 
@@ -50,6 +51,21 @@ class PlaylistsAccessManagementService:
                 user_owns_all_playlists=True, loaded_playlists=playlists_to_check
             )
 
+    def restrict_filters_to_viewable(self, filters: PlaylistsFilters):
+        """Adds a condition to the filters, so only the playlists current user can
+        view are fetched. Same rules as in `get_playlists_user_can_view`
+        """
+
+        return filters.model_copy(
+            update={
+                "viewable_by": PlaylistsViewer(
+                    user_id=(
+                        self.current_user.sub if self.current_user is not None else None
+                    )
+                )
+            }
+        )
+
     def get_playlists_user_can_view(self, playlists: Sequence[PlaylistToRead]):
         return [
             playlist
@@ -0,0 +1,58 @@
+from collections import Counter
+from typing import Iterable, cast
+
+from sqlalchemy import Table, bindparam, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from windchimes.core.database.models.playlist import Playlist
+
+
+async def change_playlists_track_count(
+    database_session: AsyncSession, track_count_changes: dict[int, int]
+):
+    """Adjusts stored `track_count` of the playlists
+
+    Must be executed in the same transaction that adds or deletes playlist tracks,
+    so the count never drifts from the actual tracks. Changes are applied as
+    increments instead of recounting, which keeps the count correct when
+    concurrent transactions change the same playlist
+
+    Args:
+        track_count_changes: playlist id -> number of added (positive) or
+            deleted (negative) tracks
+    """
+
+    changes_params = [
+        {"changed_playlist_id": playlist_id, "track_count_change": change}
+        # sorted to always lock the rows in the same order and avoid deadlocks
+        for playlist_id, change in sorted(track_count_changes.items())
+        if change != 0
+    ]
+
+    if len(changes_params) == 0:
+        return
+
+    # core table statement, so it's executed as a single executemany
+    playlist_table = cast(Table, Playlist.__table__)
+
+    statement = (
+        update(playlist_table)
+        .where(playlist_table.c.id == bindparam("changed_playlist_id"))
+        .values(
+            track_count=playlist_table.c.track_count + bindparam("track_count_change")
+        )
+    )
+
+    await database_session.execute(statement, changes_params)
+
+
+def count_tracks_by_playlist(playlists_ids: Iterable[int]):
+    """
+    Args:
+        playlists_ids: playlist id of each added or deleted playlist track
+
+    Returns:
+        Playlist id -> number of its tracks in `playlists_ids`
+    """
+
+    return dict(Counter(playlists_ids))
@@ -0,0 +1,192 @@
+from typing import Optional, Sequence, cast
+
+from sqlalchemy import Table, bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from windchimes.core.database.models.playlist import PlaylistTrack
+
+
+TRACK_POSITIONS_GAP = 2**16
+"""Distance between positions of neighbour tracks when they are appended or
+renumbered. Leaves room for moving tracks between them without renumbering
+the whole playlist
+"""
+
+
+class PlaylistTrackNotFoundError(Exception):
+    def __init__(self, track_id: str):
+        super().__init__(f"Track {track_id} is not in the playlist")
+
+
+async def get_playlists_last_track_positions(
+    database_session: AsyncSession, playlists_ids: Sequence[int]
+) -> dict[int, int]:
+    """
+    Returns:
+        Playlist id -> position of its last track. Empty playlists are not
+        included
+    """
+
+    statement = (
+        select(PlaylistTrack.playlist_id, func.max(PlaylistTrack.position))
+        .where(PlaylistTrack.playlist_id.in_(playlists_ids))
+        .group_by(PlaylistTrack.playlist_id)
+    )
+
+    result = await database_session.execute(statement)
+
+    return {playlist_id: position for playlist_id, position in result.tuples().all()}
+
+
+def get_appended_track_positions(last_track_position: Optional[int], count: int):
+    """Positions for tracks appended to the end of a playlist, keeping their order"""
+
+    first_position = (last_track_position or 0) + TRACK_POSITIONS_GAP
+
+    return [
+        first_position + track_index * TRACK_POSITIONS_GAP
+        for track_index in range(count)
+    ]
+
+
+async def move_playlist_tracks(
+    database_session: AsyncSession,
+    playlist_id: int,
+    tracks_ids: list[str],
+    after_track_id: Optional[str],
+):
+    """Places the tracks right after `after_track_id` track, in the given order
+
+    Only the moved tracks are updated, they get positions between their new
+    neighbours. The whole playlist is renumbered only when there is no room
+    left between the neighbours, which happens rarely thanks to
+    `TRACK_POSITIONS_GAP`
+
+    Args:
+        after_track_id: if `None`, the tracks are moved to the beginning
+
+    Raises:
+        PlaylistTrackNotFoundError: if some of the tracks are not in the playlist
+    """
+
+    new_positions = await _get_positions_between_neighbours(
+        database_session, playlist_id, tracks_ids, after_track_id
+    )
+
+    if new_positions is None:
+        await _renumber_playlist_tracks(database_session, playlist_id)
+
+        # there is always enough room after renumbering
+        new_positions = await _get_positions_between_neighbours(
+            database_session, playlist_id, tracks_ids, after_track_id
+        )
+
+    if new_positions is None:
+        raise RuntimeError("No room for the tracks after renumbering")
+
+    # core table statement, so it's executed as a single executemany
+    playlist_track_table = cast(Table, PlaylistTrack.__table__)
+
+    await database_session.execute(
+        update(playlist_track_table)
+        .where(
+            playlist_track_table.c.playlist_id == playlist_id,
+            playlist_track_table.c.track_id == bindparam("moved_track_id"),
+        )
+        .values(position=bindparam("new_position")),
+        [
+            {"moved_track_id": track_id, "new_position": position}
+            for track_id, position in zip(tracks_ids, new_positions)
+        ],
+    )
+
+
+async def _get_positions_between_neighbours(
+    database_session: AsyncSession,
+    playlist_id: int,
+    tracks_ids: list[str],
+    after_track_id: Optional[str],
+):
+    """
+    Returns:
+        New positions for the moved tracks or `None` if there is no room between
+        the neighbours
+    """
+
+    tracks_positions_statement = select(
+        PlaylistTrack.track_id, PlaylistTrack.position
+    ).where(
+        PlaylistTrack.playlist_id == playlist_id,
+        PlaylistTrack.track_id.in_(
+            [*tracks_ids, *([after_track_id] if after_track_id is not None else [])]
+        ),
+    )
+    tracks_positions = dict(
+        (await database_session.execute(tracks_positions_statement)).tuples().all()
+    )
+
+    for track_id in [*tracks_ids, after_track_id]:
+        if track_id is not None and track_id not in tracks_positions:
+            raise PlaylistTrackNotFoundError(track_id)
+
+    previous_position = (
+        tracks_positions[after_track_id] if after_track_id is not None else None
+    )
+
+    # the closest track after the insertion point, not counting the moved ones
+    next_position_statement = select(func.min(PlaylistTrack.position)).where(
+        PlaylistTrack.playlist_id == playlist_id,
+        PlaylistTrack.track_id.not_in(tracks_ids),
+    )
+    if previous_position is not None:
+        next_position_statement = next_position_statement.where(
+            PlaylistTrack.position > previous_position
+        )
+    next_position = (await database_session.execute(next_position_statement)).scalar()
+
+    slots_count = len(tracks_ids) + 1
+
+    if next_position is None:
+        if previous_position is None:
+            previous_position = 0
+
+        next_position = previous_position + slots_count * TRACK_POSITIONS_GAP
+    elif previous_position is None:
+        previous_position = next_position - slots_count * TRACK_POSITIONS_GAP
+
+    if next_position - previous_position < slots_count:
+        return None
+
+    return [
+        previous_position
+        + (next_position - previous_position) * (track_index + 1) // slots_count
+        for track_index in range(len(tracks_ids))
+    ]
+
+
+async def _renumber_playlist_tracks(database_session: AsyncSession, playlist_id: int):
+    """Spreads positions of all playlist tracks evenly, keeping their order"""
+
+    new_positions = (
+        select(
+            PlaylistTrack.track_id,
+            (
+                func.row_number().over(
+                    order_by=(PlaylistTrack.position, PlaylistTrack.track_id)
+                )
+                * TRACK_POSITIONS_GAP
+            ).label("new_position"),
+        )
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .subquery()
+    )
+
+    await database_session.execute(
+        update(PlaylistTrack)
+        .where(
+            PlaylistTrack.playlist_id == playlist_id,
+            PlaylistTrack.track_id == new_positions.c.track_id,
+        )
+        .values(position=new_positions.c.new_position)
+        .execution_options(synchronize_session=False)
+    )
@@ -9,22 +9,24 @@ from windchimes.core.models.track import TrackReferenceSchema
 from windchimes.core.services.external_platforms.platform_aggregator import (
     PlatformAggregatorService,
 )
-from windchimes.core.services.playlists import (
-    PlaylistDetailed,
-)
-from windchimes.common.utils.lists import find_item
+from windchimes.core.stores.audio_file_urls_cache import AudioFileUrlsCache
+from windchimes.common.utils.lists import set_items_order
 
 
 class TracksService:
     def __init__(
-        self, database: Database, platform_aggregator_service: PlatformAggregatorService
+        self,
+        database: Database,
+        platform_aggregator_service: PlatformAggregatorService,
+        audio_file_urls_cache: Optional[AudioFileUrlsCache] = None,
     ):
         self.platform_aggregator_service = platform_aggregator_service
         self.database = database
+        self.audio_file_urls_cache = audio_file_urls_cache
 
     def get_track_references_to_load(
         self,
-        playlist: PlaylistDetailed,
+        playlist_track_references: Sequence[TrackReferenceSchema],
         track_references_ids_to_load: Optional[list[str]] = None,
         load_first_tracks=False,
     ) -> Sequence[Optional[TrackReferenceSchema]]:
@@ -36,7 +38,8 @@ class TracksService:
         with `tracks_to_load_ids` or `load_first_tracks` parameters
 
         Args:
-            playlist: Playlist from which to read tracks references from
+            playlist_track_references: Playlist tracks references to pick from. To
+                pick by ids, it's enough to pass only the references with these ids
             tracks_to_load_ids: Tracks references ids to include in a portion,
                 **prioritized over** `load_first_tracks` flag param
             load_first_tracks: Include first tracks in a portion
@@ -57,16 +60,13 @@ class TracksService:
                     + f"{MAXIMUM_TRACKS_TO_LOAD_PER_REQUEST} tracks"
                 )
 
-            return [
-                find_item(
-                    playlist.track_references,
-                    lambda some_track_reference: some_track_reference.id
-                    == track_reference_id,
-                )
-                for track_reference_id in track_references_ids_to_load
-            ]
+            return set_items_order(
+                playlist_track_references,
+                track_references_ids_to_load,
+                lambda track_reference: track_reference.id,
+            )
         elif load_first_tracks:
-            return playlist.track_references[0:MAXIMUM_TRACKS_TO_LOAD_PER_REQUEST]
+            return playlist_track_references[0:MAXIMUM_TRACKS_TO_LOAD_PER_REQUEST]
         else:
             return []
 
@@ -76,6 +76,16 @@ class TracksService:
         platform: Platform,
         audio_file_endpoint_url: Optional[str],
     ):
-        return await self.platform_aggregator_service.get_track_audio_file_url(
-            platform_id, platform, audio_file_endpoint_url
+        """Retrieves audio file url of the track, from the cache if possible"""
+
+        async def resolve_url():
+            return await self.platform_aggregator_service.get_track_audio_file_url(
+                platform_id, platform, audio_file_endpoint_url
+            )
+
+        if self.audio_file_urls_cache is None:
+            return await resolve_url()
+
+        return await self.audio_file_urls_cache.get_or_resolve(
+            platform, platform_id, audio_file_endpoint_url, resolve_url
         )
@@ -0,0 +1,117 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from windchimes.common.utils.signed_urls import get_signed_url_expiration_timestamp
+from windchimes.common.utils.single_flight import SingleFlight
+from windchimes.core.models.platform import Platform
+
+
+logger = logging.getLogger(__name__)
+
+
+class AudioFileUrlsCache:
+    """Process-local cache of resolved track audio file urls
+
+    Audio file urls are signed and expire, so each one is stored until the
+    expiration time specified in the url itself. Concurrent resolutions of the
+    same track's url share one in-flight call
+
+    Urls are stored per track and audio file endpoint url, since the endpoint
+    comes from the client and can point to audio of any other track
+    """
+
+    def __init__(
+        self,
+        default_ttl_seconds: float,
+        expiration_margin_seconds: float,
+        max_entries: int,
+    ):
+        """
+        Args:
+            default_ttl_seconds: how long to store urls that don't specify their
+                expiration time
+            expiration_margin_seconds: url is considered expired this much time
+                before its actual expiration, so the player has time to use it
+            max_entries: when exceeded, least recently used urls are evicted
+        """
+
+        self.default_ttl_seconds = default_ttl_seconds
+        self.expiration_margin_seconds = expiration_margin_seconds
+        self.max_entries = max_entries
+
+        # (platform, platform id, audio file endpoint url) ->
+        # (audio file url, expiration unix time)
+        self._entries: OrderedDict[
+            tuple[Platform, str, Optional[str]], tuple[str, float]
+        ] = OrderedDict()
+        self._single_flight: SingleFlight[Optional[str]] = SingleFlight()
+
+    async def get_or_resolve(
+        self,
+        platform: Platform,
+        platform_id: str,
+        audio_file_endpoint_url: Optional[str],
+        resolve_url: Callable[[], Awaitable[Optional[str]]],
+    ):
+        """Returns cached audio file url of the track or resolves it
+
+        Args:
+            audio_file_endpoint_url: endpoint `resolve_url` gets the url from,
+                if passed by the client
+            resolve_url: function that fetches the url from the platform if it's
+                not cached. `None` results are not cached
+
+        Returns:
+            Audio file url or `None` if track is not found
+        """
+
+        key = (platform, platform_id, audio_file_endpoint_url)
+
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            url, expires_at = entry
+
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                return url
+
+            del self._entries[key]
+
+        return await self._single_flight.run(
+            key, lambda: self._resolve_and_store(key, resolve_url)
+        )
+
+    async def _resolve_and_store(
+        self,
+        key: tuple[Platform, str, Optional[str]],
+        resolve_url: Callable[[], Awaitable[Optional[str]]],
+    ):
+        url = await resolve_url()
+
+        if url is None:
+            return None
+
+        expiration_timestamp = get_signed_url_expiration_timestamp(url)
+        expires_at = (
+            expiration_timestamp - self.expiration_margin_seconds
+            if expiration_timestamp is not None
+            else time.time() + self.default_ttl_seconds
+        )
+
+        logger.info(
+            "Resolved audio file url of %s track %s, cached for %s seconds",
+            key[0].value,
+            key[1],
+            round(expires_at - time.time()),
+        )
+
+        self._entries[key] = (url, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return url
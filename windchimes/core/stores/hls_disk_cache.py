@@ -0,0 +1,332 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+import urllib.parse
+import uuid
+from typing import BinaryIO, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+_IDENTITY_PARAMS = ("id", "itag", "sq", "range")
+"""Youtube CDN url params that define the content. Others (signature, expiration,
+client ip, etc.) differ between listeners of the same track
+"""
+
+_SEGMENT_FILE_EXTENSION = ".ts"
+_MANIFEST_FILE_EXTENSION = ".m3u8"
+_TEMPORARY_FILE_EXTENSION = ".tmp"
+
+_EVICTION_TARGET_RATIO = 0.9
+"""Eviction removes files until cache size is this part of the budget, so it
+doesn't run again right after the next write
+"""
+
+_EVICTION_SCAN_INTERVAL_RATIO = 0.05
+"""Part of the budget that has to be written before checking the size again"""
+
+_ABANDONED_TEMPORARY_FILE_AGE_SECONDS = 60 * 60
+
+
+def get_youtube_cdn_resource_cache_key(url: str) -> Optional[str]:
+    """Builds a cache key from Youtube CDN url params that identify its content
+
+    Params can be in the query or in the path (`/id/VALUE/itag/VALUE/...`)
+
+    Returns:
+        Hex digest of the content identity or `None` if url does not identify
+        the content well enough to be cached
+    """
+
+    parsed_url = urllib.parse.urlparse(url)
+    path_segments = [segment for segment in parsed_url.path.split("/") if segment]
+
+    if len(path_segments) == 0:
+        return None
+
+    identity_params = {
+        param_name: param_values[0]
+        for param_name, param_values in urllib.parse.parse_qs(parsed_url.query).items()
+        if param_name in _IDENTITY_PARAMS
+    }
+
+    for path_segment, next_path_segment in zip(path_segments, path_segments[1:]):
+        if path_segment in _IDENTITY_PARAMS:
+            identity_params.setdefault(path_segment, next_path_segment)
+
+    if "id" not in identity_params or "itag" not in identity_params:
+        return None
+
+    # e.g. `videoplayback` for segments or `api/manifest/hls_playlist` for manifests
+    resource_kind = (
+        "/".join(path_segments[:3]) if path_segments[0] == "api" else path_segments[0]
+    )
+
+    identity = "|".join(
+        [
+            resource_kind,
+            path_segments[-1],
+            *[
+                f"{param_name}={identity_params[param_name]}"
+                for param_name in sorted(identity_params)
+            ],
+        ]
+    )
+
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+class HlsSegmentCacheWriter:
+    """Writes a segment into a temporary file, which becomes visible in the cache
+    only after `commit`
+    """
+
+    def __init__(self, cache: "HlsDiskCache", key: str):
+        self._cache = cache
+        self._path = cache.get_file_path(key, _SEGMENT_FILE_EXTENSION)
+        self._temporary_path = (
+            f"{self._path}.{os.getpid()}.{uuid.uuid4().hex}{_TEMPORARY_FILE_EXTENSION}"
+        )
+        self._file: Optional[BinaryIO] = None
+
+        self.size_bytes = 0
+
+    async def write(self, chunk: bytes):
+        if self._file is None:
+            self._file = await asyncio.to_thread(self._open)
+
+        await asyncio.to_thread(self._file.write, chunk)
+        self.size_bytes += len(chunk)
+
+    async def commit(self):
+        if self._file is None:
+            return
+
+        await asyncio.to_thread(self._close_and_replace, self._file)
+        await self._cache.on_file_written(self.size_bytes)
+
+    async def discard(self):
+        if self._file is None:
+            return
+
+        await asyncio.to_thread(self._close_and_remove, self._file)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        return open(self._temporary_path, "wb")
+
+    def _close_and_replace(self, file: BinaryIO):
+        file.close()
+        # atomic, so other workers never see partially written segments
+        os.replace(self._temporary_path, self._path)
+
+    def _close_and_remove(self, file: BinaryIO):
+        file.close()
+
+        try:
+            os.remove(self._temporary_path)
+        except FileNotFoundError:
+            pass
+
+
+class HlsDiskCache:
+    """Size-bounded disk cache of proxied Youtube HLS segments and manifests
+
+    Files are addressed by the content identity of their urls (see
+    `get_youtube_cdn_resource_cache_key`), so listeners of the same track share
+    them. Writes are atomic, so the directory can be shared by multiple app
+    processes. Least recently used files are evicted when cache size exceeds the
+    budget. File modification time is used as the last access time, because
+    `atime` updates are often disabled on the filesystem level
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size_bytes: int,
+        manifest_max_ttl_seconds: float,
+        expiration_margin_seconds: float,
+    ):
+        """
+        Args:
+            manifest_max_ttl_seconds: how long to store manifests. They contain
+                signed segment urls, so they are also dropped before the
+                expiration of their own url
+            expiration_margin_seconds: manifest is dropped this much time before
+                its url expires
+        """
+
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+        self.manifest_max_ttl_seconds = manifest_max_ttl_seconds
+        self.expiration_margin_seconds = expiration_margin_seconds
+
+        self._bytes_written_since_eviction_scan = 0
+        self._eviction_task: Optional[asyncio.Task] = None
+
+    async def prepare(self):
+        """Creates cache directory and evicts files over the budget left from
+        previous runs
+        """
+
+        await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        await asyncio.to_thread(self._evict_least_recently_used_files)
+
+    def get_file_path(self, key: str, extension: str):
+        # files are spread across subdirectories to keep directories small
+        return os.path.join(self.directory, key[:2], key + extension)
+
+    async def get_segment_file(self, key: str):
+        """
+        Returns:
+            Path and stat result of the cached segment file or `None` if it's not
+            cached
+        """
+
+        path = self.get_file_path(key, _SEGMENT_FILE_EXTENSION)
+
+        try:
+            stat_result = await asyncio.to_thread(self._touch_and_stat, path)
+        except FileNotFoundError:
+            return None
+
+        return path, stat_result
+
+    def open_segment_writer(self, key: str):
+        return HlsSegmentCacheWriter(self, key)
+
+    async def get_manifest(self, key: str) -> Optional[str]:
+        path = self.get_file_path(key, _MANIFEST_FILE_EXTENSION)
+
+        try:
+            file_content = await asyncio.to_thread(self._touch_and_read, path)
+        except FileNotFoundError:
+            return None
+
+        expires_at, _, manifest = file_content.partition("\n")
+
+        if not expires_at.isdigit() or int(expires_at) <= time.time():
+            return None
+
+        return manifest
+
+    async def save_manifest(
+        self, key: str, manifest: str, url_expiration_timestamp: Optional[int]
+    ):
+        """
+        Args:
+            url_expiration_timestamp: expiration of the manifest url, which
+                usually matches the expiration of segment urls inside it
+        """
+
+        expires_at = time.time() + self.manifest_max_ttl_seconds
+
+        if url_expiration_timestamp is not None:
+            expires_at = min(
+                expires_at, url_expiration_timestamp - self.expiration_margin_seconds
+            )
+
+        if expires_at <= time.time():
+            return
+
+        file_content = f"{int(expires_at)}\n{manifest}"
+
+        await asyncio.to_thread(
+            self._write_atomically,
+            self.get_file_path(key, _MANIFEST_FILE_EXTENSION),
+            file_content.encode(),
+        )
+        await self.on_file_written(len(file_content))
+
+    async def on_file_written(self, size_bytes: int):
+        self._bytes_written_since_eviction_scan += size_bytes
+
+        if (
+            self._bytes_written_since_eviction_scan
+            < self.max_size_bytes * _EVICTION_SCAN_INTERVAL_RATIO
+        ):
+            return
+
+        if self._eviction_task is None or self._eviction_task.done():
+            self._bytes_written_since_eviction_scan = 0
+            self._eviction_task = asyncio.create_task(
+                asyncio.to_thread(self._evict_least_recently_used_files)
+            )
+
+    def _touch_and_stat(self, path: str):
+        os.utime(path)
+        return os.stat(path)
+
+    def _touch_and_read(self, path: str):
+        os.utime(path)
+
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+    def _write_atomically(self, path: str, content: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temporary_path = (
+            f"{path}.{os.getpid()}.{uuid.uuid4().hex}{_TEMPORARY_FILE_EXTENSION}"
+        )
+
+        with open(temporary_path, "wb") as file:
+            file.write(content)
+
+        os.replace(temporary_path, path)
+
+    def _evict_least_recently_used_files(self):
+        now = time.time()
+        files: list[tuple[float, int, str]] = []
+        total_size_bytes = 0
+
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+
+            for file in os.scandir(subdirectory.path):
+                try:
+                    stat_result = file.stat()
+                except FileNotFoundError:
+                    continue
+
+                # files left by crashed writers
+                if file.name.endswith(_TEMPORARY_FILE_EXTENSION):
+                    if (
+                        now - stat_result.st_mtime
+                        > _ABANDONED_TEMPORARY_FILE_AGE_SECONDS
+                    ):
+                        self._remove_file(file.path)
+                    continue
+
+                files.append((stat_result.st_mtime, stat_result.st_size, file.path))
+                total_size_bytes += stat_result.st_size
+
+        if total_size_bytes <= self.max_size_bytes:
+            return
+
+        target_size_bytes = self.max_size_bytes * _EVICTION_TARGET_RATIO
+        evicted_files_count = 0
+
+        for _, size_bytes, path in sorted(files):
+            if total_size_bytes <= target_size_bytes:
+                break
+
+            self._remove_file(path)
+            total_size_bytes -= size_bytes
+            evicted_files_count += 1
+
+        logger.info(
+            "Evicted %s files from HLS disk cache, its size is %s bytes now",
+            evicted_files_count,
+            total_size_bytes,
+        )
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,266 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from windchimes.core.database import Database
+from windchimes.core.database.models.loaded_track_cache_entry import (
+    LoadedTrackCacheEntry,
+)
+from windchimes.core.models.platform import Platform
+from windchimes.core.models.track import LoadedTrack, TrackReferenceSchema
+
+
+logger = logging.getLogger(__name__)
+
+
+_ENTRY_SIZE_OVERHEAD_BYTES = 200
+"""Rough size of a cache entry without track data itself (dict slot, key, etc.)"""
+
+
+@dataclass()
+class LoadedTrackToCache:
+    track_id: str
+
+    loaded_track: Optional[LoadedTrack]
+    """`None` if the track is not available on the platform (negative entry)"""
+
+    ttl_seconds: float
+
+
+class LoadedTracksCacheBackend(ABC):
+    """Storage for loaded tracks cache entries"""
+
+    @abstractmethod
+    async def get_many(self, track_ids: list[str]) -> dict[str, Optional[LoadedTrack]]:
+        """
+        Returns:
+            Not expired entries found by track ids. Tracks cached as not available
+            are included with `None` value, missing ones are not included at all
+        """
+        pass
+
+    @abstractmethod
+    async def set_many(self, tracks_to_cache: Sequence[LoadedTrackToCache]):
+        pass
+
+
+class InMemoryLoadedTracksCacheBackend(LoadedTracksCacheBackend):
+    """Process-local LRU cache, bounded by approximate memory size of the entries"""
+
+    def __init__(self, max_size_bytes: int):
+        self.max_size_bytes = max_size_bytes
+        self.size_bytes = 0
+
+        # track id -> (track, expiration monotonic time, entry size)
+        self._entries: OrderedDict[str, tuple[Optional[LoadedTrack], float, int]] = (
+            OrderedDict()
+        )
+
+    async def get_many(self, track_ids):
+        now = time.monotonic()
+        found_tracks: dict[str, Optional[LoadedTrack]] = {}
+
+        for track_id in track_ids:
+            entry = self._entries.get(track_id)
+
+            if entry is None:
+                continue
+
+            loaded_track, expires_at, _ = entry
+
+            if expires_at <= now:
+                self._remove(track_id)
+                continue
+
+            self._entries.move_to_end(track_id)
+            found_tracks[track_id] = loaded_track
+
+        return found_tracks
+
+    async def set_many(self, tracks_to_cache):
+        now = time.monotonic()
+
+        for track_to_cache in tracks_to_cache:
+            self._remove(track_to_cache.track_id)
+
+            entry_size = _ENTRY_SIZE_OVERHEAD_BYTES + (
+                len(track_to_cache.loaded_track.model_dump_json())
+                if track_to_cache.loaded_track is not None
+                else 0
+            )
+
+            self._entries[track_to_cache.track_id] = (
+                track_to_cache.loaded_track,
+                now + track_to_cache.ttl_seconds,
+                entry_size,
+            )
+            self.size_bytes += entry_size
+
+        # evicts least recently used entries
+        while self.size_bytes > self.max_size_bytes and len(self._entries) > 0:
+            least_recently_used_track_id = next(iter(self._entries))
+            self._remove(least_recently_used_track_id)
+
+    def _remove(self, track_id: str):
+        entry = self._entries.pop(track_id, None)
+
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+
+class DatabaseLoadedTracksCacheBackend(LoadedTracksCacheBackend):
+    """Cache shared between all app processes, stored in the database
+
+    Expired entries are ignored on reads and have to be removed
+    with `delete_expired_entries` regularly
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+
+    async def get_many(self, track_ids):
+        if len(track_ids) == 0:
+            return {}
+
+        async with self.database.create_session() as database_session:
+            statement = select(LoadedTrackCacheEntry).where(
+                LoadedTrackCacheEntry.track_id.in_(track_ids),
+                LoadedTrackCacheEntry.expires_at > datetime.now(),
+            )
+
+            result = await database_session.execute(statement)
+
+            return {
+                entry.track_id: (
+                    LoadedTrack.model_validate(entry.loaded_track)
+                    if entry.loaded_track is not None
+                    else None
+                )
+                for entry in result.scalars().all()
+            }
+
+    async def set_many(self, tracks_to_cache):
+        if len(tracks_to_cache) == 0:
+            return
+
+        now = datetime.now()
+
+        # the same track can't be upserted twice in one statement
+        entries_by_track_id = {
+            track_to_cache.track_id: {
+                "track_id": track_to_cache.track_id,
+                "loaded_track": (
+                    track_to_cache.loaded_track.model_dump(mode="json")
+                    if track_to_cache.loaded_track is not None
+                    else None
+                ),
+                "expires_at": now + timedelta(seconds=track_to_cache.ttl_seconds),
+            }
+            for track_to_cache in tracks_to_cache
+        }
+
+        async with self.database.create_session() as database_session:
+            statement = insert(LoadedTrackCacheEntry).values(
+                list(entries_by_track_id.values())
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[LoadedTrackCacheEntry.track_id],
+                set_={
+                    "loaded_track": statement.excluded.loaded_track,
+                    "expires_at": statement.excluded.expires_at,
+                },
+            )
+
+            await database_session.execute(statement)
+            await database_session.commit()
+
+    async def delete_expired_entries(self):
+        async with self.database.create_session() as database_session:
+            statement = delete(LoadedTrackCacheEntry).where(
+                LoadedTrackCacheEntry.expires_at <= datetime.now()
+            )
+
+            result = await database_session.execute(statement)
+            await database_session.commit()
+
+            logger.info(
+                "Deleted %s expired loaded tracks cache entries", result.rowcount
+            )
+
+
+class LoadedTracksCache:
+    """Cache of tracks loaded from external platforms, keyed by track reference id
+
+    Tracks that are not available on the platform (deleted, private, etc.) are
+    cached too, but for a shorter time
+    """
+
+    def __init__(
+        self,
+        backend: LoadedTracksCacheBackend,
+        ttls_seconds: dict[Platform, float],
+        not_available_track_ttl_seconds: float,
+    ):
+        """
+        Args:
+            ttls_seconds: how long loaded tracks of each platform are stored
+            not_available_track_ttl_seconds: how long to remember that the track
+                is not available on the platform
+        """
+
+        self.backend = backend
+        self.ttls_seconds = ttls_seconds
+        self.not_available_track_ttl_seconds = not_available_track_ttl_seconds
+
+    async def get_many(self, track_references: list[TrackReferenceSchema]):
+        """
+        Returns:
+            Cached tracks by track reference ids. Tracks cached as not available
+            are included with `None` value, not cached ones are not included at all
+        """
+
+        try:
+            return await self.backend.get_many(
+                [track_reference.id for track_reference in track_references]
+            )
+        except Exception as error:
+            logger.error("Failed to read loaded tracks cache: %s", error)
+            return {}
+
+    async def set_many(
+        self,
+        track_references: list[TrackReferenceSchema],
+        loaded_tracks: list[Optional[LoadedTrack]],
+    ):
+        """
+        Args:
+            loaded_tracks: tracks loaded for `track_references`, in the same order.
+                `None` marks a track that is not available on the platform
+        """
+
+        try:
+            await self.backend.set_many(
+                [
+                    LoadedTrackToCache(
+                        track_id=track_reference.id,
+                        loaded_track=loaded_track,
+                        ttl_seconds=(
+                            self.ttls_seconds[track_reference.platform]
+                            if loaded_track is not None
+                            else self.not_available_track_ttl_seconds
+                        ),
+                    )
+                    for track_reference, loaded_track in zip(
+                        track_references, loaded_tracks
+                    )
+                ]
+            )
+        except Exception as error:
+            logger.error("Failed to write loaded tracks cache: %s", error)
@@ -0,0 +1,243 @@
+"""Checks properties of `parse_iso8601_duration` and compares its speed with the
+slicing parser Youtube service used before:
+
+`python -m windchimes.seeding.benchmark_iso8601_durations`
+
+Durations are generated randomly with a fixed seed, benchmark sample is shaped
+like Youtube music videos durations, including the rarer forms the API returns:
+`P0D` for live streams, day components, hours-only and seconds-only durations.
+Exits with code 1 if some property check fails
+"""
+
+import random
+import re
+import sys
+import timeit
+from typing import Callable, Optional
+
+from windchimes.common.utils.durations import parse_iso8601_duration
+
+
+PROPERTY_CHECKS_COUNT = 100_000
+BENCHMARK_SAMPLE_SIZE = 100_000
+
+_COMPONENTS_DESIGNATORS = "YMWDHMS"
+_COMPONENTS_SECONDS = (
+    365 * 24 * 60 * 60,
+    30 * 24 * 60 * 60,
+    7 * 24 * 60 * 60,
+    24 * 60 * 60,
+    60 * 60,
+    60,
+    1,
+)
+
+_INVALID_DURATIONS = [
+    "",
+    "P",
+    "PT",
+    "T1H",
+    "1H",
+    "PT1H1H",
+    "PT1M1H",
+    "PT1.5H2M",
+    "PT-1S",
+    "P1S",
+    "PT1D",
+    "PTS",
+    "pt1s",
+    " PT1S",
+]
+
+
+def _parse_duration_by_slicing(duration: str):
+    """Previous Youtube service parser, reads at most 2 digits per component and
+    ignores days
+    """
+
+    def get_component(designator: str):
+        designator_index = duration.find(designator)
+
+        if designator_index == -1:
+            return 0
+
+        return int(
+            re.sub(r"[^0-9]", "", duration[designator_index - 2 : designator_index])
+        )
+
+    return get_component("S") + get_component("M") * 60 + get_component("H") * 3600
+
+
+def _create_random_duration(random_generator: random.Random):
+    """
+    Returns:
+        Duration with random components and its length in seconds
+    """
+
+    components: list[Optional[int]] = [
+        random_generator.choice(
+            [
+                None,
+                None,
+                random_generator.randint(0, 10 ** random_generator.randint(0, 4)),
+            ]
+        )
+        for _ in _COMPONENTS_DESIGNATORS
+    ]
+
+    if all(component is None for component in components):
+        components[-1] = random_generator.randint(0, 100)
+
+    def format_components(first_index: int, last_index: int):
+        return "".join(
+            f"{component}{designator}"
+            for component, designator in zip(
+                components[first_index:last_index],
+                _COMPONENTS_DESIGNATORS[first_index:last_index],
+            )
+            if component is not None
+        )
+
+    time_part = format_components(4, 7)
+    duration = "P" + format_components(0, 4) + ("T" + time_part if time_part else "")
+
+    return duration, sum(
+        component * component_seconds
+        for component, component_seconds in zip(components, _COMPONENTS_SECONDS)
+        if component is not None
+    )
+
+
+def check_properties(random_generator: random.Random):
+    failed_checks: list[str] = []
+
+    for _ in range(PROPERTY_CHECKS_COUNT):
+        duration, expected_seconds = _create_random_duration(random_generator)
+
+        if parse_iso8601_duration(duration) != expected_seconds:
+            failed_checks.append(f"{duration} is not {expected_seconds} seconds")
+
+        # short durations are the only ones the previous parser read correctly
+        hours, minutes, seconds = (
+            random_generator.randint(0, 99),
+            random_generator.randint(0, 59),
+            random_generator.randint(0, 59),
+        )
+        short_duration = (
+            "PT"
+            + (f"{hours}H" if hours else "")
+            + (f"{minutes}M" if minutes else "")
+            + (f"{seconds}S" if seconds or not (hours or minutes) else "")
+        )
+
+        if parse_iso8601_duration(short_duration) != _parse_duration_by_slicing(
+            short_duration
+        ):
+            failed_checks.append(f"{short_duration} differs from the previous parser")
+
+        fraction_separator = random_generator.choice(".,")
+        fraction = random_generator.randint(0, 999)
+        fractional_duration = (
+            f"PT{minutes}M{seconds}{fraction_separator}{fraction:03d}S"
+        )
+
+        if (
+            abs(
+                parse_iso8601_duration(fractional_duration)
+                - (minutes * 60 + seconds + fraction / 1000)
+            )
+            > 1e-6
+        ):
+            failed_checks.append(f"{fractional_duration} fraction is lost")
+
+    for invalid_duration in _INVALID_DURATIONS:
+        try:
+            parse_iso8601_duration(invalid_duration)
+            failed_checks.append(f"{invalid_duration!r} is accepted")
+        except ValueError:
+            pass
+
+    for failed_check in failed_checks[:20]:
+        print(f"[FAIL] {failed_check}")
+
+    print(
+        f"[{'FAIL' if failed_checks else 'OK'}] {PROPERTY_CHECKS_COUNT} random "
+        + "durations checked"
+    )
+
+    return len(failed_checks) == 0
+
+
+def _create_benchmark_sample(random_generator: random.Random):
+    sample: list[str] = []
+
+    for _ in range(BENCHMARK_SAMPLE_SIZE):
+        duration_kind = random_generator.random()
+
+        if duration_kind < 0.01:
+            # live streams and upcoming premieres
+            sample.append("P0D")
+        elif duration_kind < 0.015:
+            # streams recordings longer than a day
+            sample.append(
+                f"P{random_generator.randint(1, 3)}DT"
+                + f"{random_generator.randint(0, 23)}H"
+                + f"{random_generator.randint(0, 59)}M"
+                + f"{random_generator.randint(1, 59)}S"
+            )
+        elif duration_kind < 0.02:
+            sample.append(f"PT{random_generator.randint(1, 11)}H")
+        elif duration_kind < 0.05:
+            sample.append(
+                f"PT{random_generator.randint(1, 11)}H"
+                + f"{random_generator.randint(0, 59)}M"
+                + f"{random_generator.randint(1, 59)}S"
+            )
+        elif duration_kind < 0.1:
+            sample.append(f"PT{random_generator.randint(1, 59)}S")
+        elif duration_kind < 0.13:
+            sample.append(f"PT{random_generator.randint(1, 59)}M")
+        else:
+            sample.append(
+                f"PT{random_generator.randint(1, 15)}M"
+                + f"{random_generator.randint(1, 59)}S"
+            )
+
+    return sample
+
+
+def _measure_nanoseconds_per_duration(parse: Callable[[str], float], sample: list[str]):
+    return (
+        min(timeit.repeat(lambda: [parse(duration) for duration in sample], number=1))
+        / len(sample)
+        * 1e9
+    )
+
+
+def benchmark(random_generator: random.Random):
+    sample = _create_benchmark_sample(random_generator)
+
+    slicing_nanoseconds = _measure_nanoseconds_per_duration(
+        _parse_duration_by_slicing, sample
+    )
+    regex_nanoseconds = _measure_nanoseconds_per_duration(
+        parse_iso8601_duration, sample
+    )
+
+    print(
+        f"slicing parser {slicing_nanoseconds:.0f} ns/duration, "
+        + f"parse_iso8601_duration {regex_nanoseconds:.0f} ns/duration"
+    )
+
+
+def start_benchmarking():
+    random_generator = random.Random(0)
+
+    properties_hold = check_properties(random_generator)
+    benchmark(random_generator)
+
+    if not properties_hold:
+        sys.exit(1)
+
+
+start_benchmarking()
@@ -0,0 +1,82 @@
+"""Compares `set_items_order` with the per-key `find_item` scan it replaced:
+
+`python -m windchimes.seeding.benchmark_set_items_order`
+
+Items are track-like dicts reordered by shuffled keys, with a few keys that
+don't match any item. Exits with code 1 if the two implementations return
+different lists
+"""
+
+import random
+import sys
+import timeit
+from typing import Any, Callable
+
+from windchimes.common.utils.lists import find_item, set_items_order
+
+
+ITEMS_COUNTS = [50, 500, 5000]
+MISSING_KEYS_COUNT = 5
+
+
+def _set_items_order_by_scan(
+    items: list[Any], keys_in_needed_order: list, get_item_key: Callable[[Any], Any]
+):
+    """Previous implementation, scans the items for each key, O(n^2)"""
+
+    return [
+        find_item(items, lambda item: get_item_key(item) == key)
+        for key in keys_in_needed_order
+    ]
+
+
+def _get_track_id(track: dict):
+    return track["id"]
+
+
+def _measure_milliseconds(function: Callable[[], Any]):
+    timer = timeit.Timer(function)
+    repeats_count, _ = timer.autorange()
+
+    return min(timer.repeat(repeat=3, number=repeats_count)) / repeats_count * 1000
+
+
+def benchmark_set_items_order():
+    random_generator = random.Random(0)
+    results_match = True
+
+    for items_count in ITEMS_COUNTS:
+        tracks = [
+            {"id": f"track-{track_index}", "platform": "YOUTUBE"}
+            for track_index in range(items_count)
+        ]
+        keys = [
+            *[_get_track_id(track) for track in tracks],
+            *[f"missing-{key_index}" for key_index in range(MISSING_KEYS_COUNT)],
+        ]
+        random_generator.shuffle(keys)
+
+        results_match = results_match and set_items_order(
+            tracks, keys, _get_track_id
+        ) == _set_items_order_by_scan(tracks, keys, _get_track_id)
+
+        scan_milliseconds = _measure_milliseconds(
+            lambda: _set_items_order_by_scan(tracks, keys, _get_track_id)
+        )
+        index_milliseconds = _measure_milliseconds(
+            lambda: set_items_order(tracks, keys, _get_track_id)
+        )
+
+        print(
+            f"{items_count:>5} items: find_item scan {scan_milliseconds:>10.3f} ms, "
+            + f"dict index {index_milliseconds:>8.3f} ms"
+        )
+
+    if not results_match:
+        print("[FAIL] implementations returned different orders")
+
+    return results_match
+
+
+if not benchmark_set_items_order():
+    sys.exit(1)
@@ -0,0 +1,169 @@
+"""Checks that hot queries are served by indexes, run on a seeded database:
+
+`python -m windchimes.seeding.explain_hot_queries`
+
+Sequential scans are disabled for the check, so the planner picks an index
+whenever one can serve the query, even on small seeded tables. Exits with
+code 1 if some query doesn't use the expected index
+"""
+
+import asyncio
+from datetime import datetime
+import json
+import sys
+
+from sqlalchemy import Select, select, text
+from sqlalchemy.dialects import postgresql
+
+from windchimes.core.database import database
+from windchimes.core.database.models.external_playlist_reference import (
+    ExternalPlaylistReference,
+)
+from windchimes.core.database.models.playlist import Playlist, PlaylistTrack
+from windchimes.core.services.playlists import (
+    PlaylistsFilters,
+    PlaylistsViewer,
+    build_playlists_statement,
+)
+from windchimes.core.services.playlists.pagination import encode_playlists_cursor
+
+
+FEED_PAGE_SIZE = 20
+
+
+def _get_used_indexes(plan: dict) -> set[str]:
+    used_indexes = set()
+
+    if "Index Name" in plan:
+        used_indexes.add(plan["Index Name"])
+
+    for subplan in plan.get("Plans", []):
+        used_indexes |= _get_used_indexes(subplan)
+
+    return used_indexes
+
+
+async def explain_hot_queries():
+    async with database.create_session() as database_session:
+        sample_playlist_track = (
+            await database_session.execute(select(PlaylistTrack).limit(1))
+        ).scalar()
+        sample_playlist = (
+            await database_session.execute(select(Playlist).limit(1))
+        ).scalar()
+
+        if sample_playlist_track is None or sample_playlist is None:
+            print("The database is empty, seed it first")
+            return False
+
+        queries_and_expected_indexes: list[tuple[str, Select, str]] = [
+            (
+                "user playlists feed",
+                build_playlists_statement(
+                    PlaylistsFilters(owner_user_id=sample_playlist.owner_user_id),
+                    FEED_PAGE_SIZE,
+                ),
+                "ix_playlist_owner_user_id_created_at_id",
+            ),
+            (
+                "feed page after cursor",
+                build_playlists_statement(
+                    PlaylistsFilters(
+                        after_cursor=encode_playlists_cursor(
+                            sample_playlist.created_at, sample_playlist.id
+                        ),
+                        viewable_by=PlaylistsViewer(
+                            user_id=sample_playlist.owner_user_id
+                        ),
+                    ),
+                    FEED_PAGE_SIZE,
+                ),
+                "ix_playlist_created_at_id",
+            ),
+            (
+                "playlists containing the track",
+                build_playlists_statement(
+                    PlaylistsFilters(
+                        containing_track_reference_id=sample_playlist_track.track_id
+                    ),
+                    FEED_PAGE_SIZE,
+                ),
+                "ix_playlist_track_track_id_playlist_id",
+            ),
+            (
+                "playlists not containing the track",
+                build_playlists_statement(
+                    PlaylistsFilters(
+                        exclude_containing_track_reference_id=(
+                            sample_playlist_track.track_id
+                        )
+                    ),
+                    FEED_PAGE_SIZE,
+                ),
+                "ix_playlist_track_track_id_playlist_id",
+            ),
+            (
+                "playlist tracks window",
+                select(PlaylistTrack.track_id)
+                .where(PlaylistTrack.playlist_id == sample_playlist_track.playlist_id)
+                .order_by(PlaylistTrack.position, PlaylistTrack.track_id)
+                .limit(FEED_PAGE_SIZE),
+                "ix_playlist_track_playlist_id_position",
+            ),
+            (
+                "external playlist linked to the playlist",
+                select(ExternalPlaylistReference).where(
+                    ExternalPlaylistReference.parent_playlist_id == sample_playlist.id
+                ),
+                "ix_external_playlist_reference_parent_playlist_id",
+            ),
+            (
+                "stale external playlists",
+                select(ExternalPlaylistReference.id)
+                .where(ExternalPlaylistReference.last_sync_attempt_at < datetime.now())
+                .order_by(ExternalPlaylistReference.last_sync_attempt_at)
+                .limit(FEED_PAGE_SIZE),
+                "ix_external_playlist_reference_last_sync_attempt_at",
+            ),
+        ]
+
+        await database_session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        all_queries_use_indexes = True
+
+        for query_name, statement, expected_index in queries_and_expected_indexes:
+            compiled_statement = statement.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={"literal_binds": True},
+            )
+
+            result = await database_session.execute(
+                text(f"EXPLAIN (FORMAT JSON) {compiled_statement}")
+            )
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            used_indexes = _get_used_indexes(plan[0]["Plan"])
+            uses_expected_index = expected_index in used_indexes
+            all_queries_use_indexes = all_queries_use_indexes and uses_expected_index
+
+            print(
+                f"[{'OK' if uses_expected_index else 'FAIL'}] {query_name}: "
+                + f"expected {expected_index}, used {sorted(used_indexes) or 'none'}"
+            )
+
+        return all_queries_use_indexes
+
+
+async def start_explaining():
+    try:
+        all_queries_use_indexes = await explain_hot_queries()
+    finally:
+        await database.close()
+
+    if not all_queries_use_indexes:
+        sys.exit(1)
+
+
+asyncio.run(start_explaining())
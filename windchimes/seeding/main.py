@@ -3,6 +3,7 @@ import asyncio
 import json
 import random
 
+import aiohttp
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -53,9 +54,13 @@ async def add_playlists(database_session: AsyncSession):
         ]
 
     await obtain_soundcloud_client_id()
-    soundcloud_api_client = SoundcloudApiClient(get_soundcloud_api_client_id())
 
-    playlists = await soundcloud_api_client.search_playlists("jazz")
+    async with aiohttp.ClientSession() as aiohttp_session:
+        soundcloud_api_client = SoundcloudApiClient(
+            get_soundcloud_api_client_id(), aiohttp_session
+        )
+
+        playlists = await soundcloud_api_client.search_playlists("jazz")
 
     database_track_references = [
         TrackReference(
@@ -84,6 +89,9 @@ async def add_playlists(database_session: AsyncSession):
         for playlist in playlists
     ]
 
+    for playlist_to_add in playlists_to_add_to_database:
+        playlist_to_add.track_count = len(playlist_to_add.track_references)
+
     database_session.add_all(playlists_to_add_to_database)
     await database_session.commit()
 